@@ -0,0 +1,190 @@
+# Benchmark of the telemetry detectors: nodes visited per second over a large generated script, for the
+# single traversal detector against the former implementation
+# Usage: python -m benchmarks.bench_detector [--functions N] [--repeat N] [--presence]
+
+import ast
+import time
+import argparse
+
+from typing import Dict
+from typing import Optional
+
+from ast import Call
+from ast import Expr
+from ast import Constant
+from ast import NodeVisitor
+
+from spanalyzer.python.hunters import ast_extractor
+from spanalyzer.python.detector import PythonTelemetryDetector
+from spanalyzer.python.constants.keywords import PythonTelemetryKeywords
+
+from spanalyzer.utils.operations import remove_call_duplicates
+
+from spanalyzer.constants.telemetry import TelemetryCall
+
+
+class LegacyPythonTelemetryDetector(NodeVisitor):
+    """
+    Former implementation of `PythonTelemetryDetector`: matches every node against the operations in a
+    chain of cases, and re-walks the subtree of every call it dispatches (through `generic_visit`).
+    """
+
+    def __init__(self):
+        self.output = PythonTelemetryKeywords.get_attributes_structure()
+
+        self.span_operations = {
+            PythonTelemetryKeywords.START_SPAN,
+            PythonTelemetryKeywords.START_AS_CURRENT_SPAN,
+            PythonTelemetryKeywords.USE_SPAN,
+        }
+        self.attribute_operations = {
+            PythonTelemetryKeywords.SET_ATTRIBUTE,
+            PythonTelemetryKeywords.SET_ATTRIBUTES,
+        }
+        self.event_operations = {
+            PythonTelemetryKeywords.ADD_EVENT,
+            PythonTelemetryKeywords.ADD_EVENTS,
+        }
+
+    def _extract_name_from_args(self, node: Call) -> Optional[str]:
+        if not node.args:
+            return None
+
+        arg = node.args[0]
+
+        return arg.value if isinstance(arg, Constant) else arg.id
+
+    def call_switcher(self, call_type: str, node: Call):
+        match call_type:
+            case PythonTelemetryKeywords.GET_TRACER:
+                if name := self._extract_name_from_args(node):
+                    self.output["tracers"].append(TelemetryCall(func=name, line_number=node.lineno))
+
+            case _ if call_type in self.span_operations:
+                if name := self._extract_name_from_args(node):
+                    self.output["spans"].append(TelemetryCall(func=name, line_number=node.lineno))
+
+            case _ if call_type in self.attribute_operations:
+                self.output["attributes"].append(
+                    TelemetryCall(func=call_type, line_number=node.lineno, args=ast_extractor(node))
+                )
+
+            case _ if call_type in self.event_operations:
+                args = ast_extractor(node) if isinstance(node, Expr) else ast_extractor(node.args)
+
+                self.output["events"].append(
+                    TelemetryCall(func=call_type, line_number=node.lineno, args=args)
+                )
+
+            case PythonTelemetryKeywords.ADD_COUNTER:
+                self.output["counter"].append(
+                    TelemetryCall(func=call_type, line_number=node.lineno, args=ast_extractor(node))
+                )
+
+        self.generic_visit(node)
+
+    def run(self, node: Call) -> Dict:
+        for node in ast.walk(node):
+            try:
+                if isinstance(node, Call):
+                    self.call_switcher(node.func.attr, node)
+
+                if isinstance(node, Expr):
+                    self.call_switcher(node.value.func.attr, node)
+
+            except Exception:
+                pass
+
+        return {
+            key: (
+                remove_call_duplicates(val)
+                if isinstance(val, list) and any(isinstance(item, TelemetryCall) for item in val)
+                else []
+            )
+            for key, val in self.output.items()
+        }
+
+
+def generate_script(functions: int) -> str:
+    """
+    Generate a python script with the amount of functions provided, where every other function is
+    instrumented with spans, attributes, events and counters.
+    """
+
+    lines = [
+        "from opentelemetry import trace",
+        "",
+        "tracer = trace.get_tracer(__name__)",
+        "",
+    ]
+
+    for idx in range(functions):
+        lines.append(f"def function_{idx}(values, factor={idx}):")
+        lines.append(f'    """Function number {idx}."""')
+
+        if idx % 2 == 0:
+            lines.append(f"    with tracer.start_as_current_span('function_{idx}') as span:")
+            lines.append(f"        span.set_attribute('index', {idx})")
+            lines.append("        result = [value * factor for value in values if value > 0]")
+            lines.append("        span.add_event('computed', {'size': len(result)})")
+            lines.append("        counter.add(1, {'function': 'function_%d'} )" % idx)
+            lines.append("        return sorted(result, key=lambda value: -value)")
+        else:
+            lines.append("    result = {key: str(value) for key, value in enumerate(values)}")
+            lines.append("    if len(result) > factor:")
+            lines.append("        result = dict(list(result.items())[:factor])")
+            lines.append("    return helper(result, factor=factor, verbose=False)")
+
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def best_of(func, repeat: int) -> float:
+    """
+    Run the function provided `repeat` times and return the best wall time.
+    """
+
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the telemetry detectors")
+    parser.add_argument("--functions", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--presence",
+        action="store_true",
+        help="only look for the categories used, as the basic report does",
+    )
+    args = parser.parse_args()
+
+    tree = ast.parse(generate_script(args.functions))
+    nodes = sum(1 for _ in ast.walk(tree))
+
+    method = "run_presence" if args.presence else "run"
+
+    # both implementations must detect the same calls for the comparison to hold
+    assert LegacyPythonTelemetryDetector().run(tree) == PythonTelemetryDetector().run(tree)
+
+    # the former implementation had no presence only detection, the basic report used the full one
+    legacy = best_of(lambda: LegacyPythonTelemetryDetector().run(tree), args.repeat)
+    current = best_of(lambda: getattr(PythonTelemetryDetector(), method)(tree), args.repeat)
+
+    print(f"functions: {args.functions}, nodes: {nodes}")
+    print(f"legacy detector.run: {legacy * 1000:.1f} ms ({nodes / legacy:,.0f} nodes/s)")
+    print(
+        f"PythonTelemetryDetector.{method}: {current * 1000:.1f} ms "
+        f"({nodes / current:,.0f} nodes/s, {legacy / current:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
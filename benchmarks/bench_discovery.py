@@ -0,0 +1,93 @@
+# Benchmark of the script discovery: the scandir-based walker against the former os.walk implementation
+# Usage: python -m benchmarks.bench_discovery [--source-files N] [--excluded-files N]
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+
+from typing import List
+
+from spanalyzer.utils.operations import walk_scripts
+from spanalyzer.constants.exceptions import ExcludedPaths
+
+
+def legacy_list_scripts(folder_path: str, file_extensions: str = ".py") -> List[str]:
+    """
+    Former implementation of `Engine._list_scripts`: walks every folder (excluded ones included) and
+    matches the excluded paths as substrings of the full path of every file.
+    """
+
+    return [
+        os.path.join(root, file)
+        for root, dirs, files in os.walk(folder_path)
+        for file in files
+        if file.endswith(file_extensions)
+        and not any(
+            excluded_path in os.path.join(root, file)
+            for excluded_path in ExcludedPaths.values()
+        )
+    ]
+
+
+def build_tree(folder_path: str, source_files: int, excluded_files: int):
+    """
+    Build a folder structure with source files spread over nested packages, along with excluded
+    folders (node_modules, venv, .git) holding a much larger amount of files.
+    """
+
+    for idx in range(source_files):
+        package = os.path.join(folder_path, "src", f"package_{idx % 20}", f"module_{idx % 7}")
+        os.makedirs(package, exist_ok=True)
+        open(os.path.join(package, f"script_{idx}.py"), "w").close()
+
+    for excluded in ["node_modules", "venv", ".git"]:
+        for idx in range(excluded_files // 3):
+            package = os.path.join(folder_path, excluded, f"dependency_{idx % 50}", "lib")
+            os.makedirs(package, exist_ok=True)
+            open(os.path.join(package, f"file_{idx}.py"), "w").close()
+
+
+def best_of(func, repeat: int) -> float:
+    """
+    Run the function provided `repeat` times and return the best wall time.
+    """
+
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the script discovery")
+    parser.add_argument("--source-files", type=int, default=2000)
+    parser.add_argument("--excluded-files", type=int, default=30000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    folder_path = tempfile.mkdtemp()
+
+    try:
+        build_tree(folder_path, args.source_files, args.excluded_files)
+
+        legacy = best_of(lambda: legacy_list_scripts(folder_path), args.repeat)
+        walker = best_of(lambda: list(walk_scripts(folder_path, ".py")), args.repeat)
+
+        assert sorted(legacy_list_scripts(folder_path)) == sorted(walk_scripts(folder_path, ".py"))
+
+        print(f"source files: {args.source_files}, excluded files: {args.excluded_files}")
+        print(f"os.walk (legacy): {legacy * 1000:.1f} ms")
+        print(f"walk_scripts:     {walker * 1000:.1f} ms ({legacy / walker:.1f}x)")
+
+    finally:
+        shutil.rmtree(folder_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Benchmark of the java sniffer: time spent tokenizing, parsing and sniffing a large generated class
+# Usage: python -m benchmarks.bench_java_sniffer [--methods N] [--repeat N] [--fast]
+
+import time
+import argparse
+
+from spanalyzer.backends import load_backend
+
+
+def generate_class(methods: int) -> str:
+    """
+    Generate a java class with the amount of methods provided, each one documented and containing braces
+    within string and char literals, where every other method is instrumented with a span.
+    """
+
+    lines = [
+        "import io.opentelemetry.api.trace.Span;",
+        "",
+        "public class Generated {",
+    ]
+
+    for idx in range(methods):
+        lines.append("    /**")
+        lines.append(f"     * Method number {idx}.")
+        lines.append("     */")
+        lines.append(f"    public int method{idx}(int value) {{")
+        lines.append('        String text = "{ not a block }";')
+        lines.append("        char brace = '}';")
+
+        if idx % 2 == 0:
+            lines.append(f'        Span span = tracer.spanBuilder("method{idx}").startSpan();')
+            lines.append(f"        if (value > {idx}) {{")
+            lines.append('            span.setAttribute("value", value);')
+            lines.append("        }")
+            lines.append("        span.end();")
+        else:
+            lines.append(f"        for (int i = 0; i < {idx}; i++) {{")
+            lines.append("            value = helper.compute(value, text.length(), brace);")
+            lines.append("        }")
+
+        lines.append("        return value;")
+        lines.append("    }")
+        lines.append("")
+
+    lines.append("}")
+
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the java sniffer")
+    parser.add_argument("--methods", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fast", action="store_true", help="leave the bodies without telemetry out")
+    args = parser.parse_args()
+
+    source_code = generate_class(args.methods)
+    backend = load_backend("java")
+
+    timings = []
+
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        lexed = backend.tokenize(source_code)
+        tree = backend.parse(source_code, lexed, fast=args.fast)
+        backend.build_sniffer("Generated.java", source_code, lexed).run(tree)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+
+    print(f"methods: {args.methods}, lines: {source_code.count(chr(10)) + 1}")
+    print(f"tokenize + parse + JavaScriptSniffer.run: {best * 1000:.1f} ms ({args.methods / best:,.0f} methods/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+# Benchmark of the memory of the cli: peak RSS of a run against the size of the corpus (see
+# benchmarks.corpus), so the scaling regressions show up, optionally compared against a stored baseline
+# Usage: python -m benchmarks.bench_memory [--sizes N ...] [--language python|java|both] [--seed N]
+#        [--file-size BYTES] [--functions N] [--report-type basic|detailed] [--format json|jsonl] [--jobs N]
+#        [--output PATH] [--baseline PATH] [--threshold FRACTION] [--save-baseline PATH]
+# The stored baseline (benchmarks/baseline_memory.json) was measured with the default options; refresh it
+# with --save-baseline wherever the comparisons are run
+
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from dataclasses import asdict
+from dataclasses import replace
+
+from benchmarks.corpus import CorpusSpecs
+from benchmarks.corpus import generate_corpus
+
+MB = 1024 * 1024
+
+# default fraction of peak memory that can be gained before a run is considered a regression
+DEFAULT_THRESHOLD = 0.2
+
+
+def peak_rss_of_cli(arguments: List[str]) -> int:
+    """
+    Run the cli in a process of its own, returning its peak resident set size (and the one of its workers,
+    the largest of both) in bytes.
+    """
+
+    process = subprocess.Popen(
+        [sys.executable, "-c", "from spanalyzer.cli import main; main()", *arguments],
+        stdout=subprocess.DEVNULL,
+    )
+    # the process is waited for by hand, as that's the only way to get its resource usage alone
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    if process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, process.args)
+
+    # the peak is given in kilobytes, except on macOS
+    return rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+
+def fit_slope(points: List[Tuple[float, float]]) -> float:
+    """
+    Fit the slope of a line through the points provided, by least squares.
+    """
+
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    variance = sum((x - mean_x) ** 2 for x, _ in points)
+
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / variance if variance else 0.0
+
+
+def run_benchmark(
+    specs: CorpusSpecs, sizes: List[int], report_type: str, output_format: str, jobs: int
+) -> Dict[str, Any]:
+    """
+    Measure the peak RSS of a cli run over a corpus of each size provided (in number of scripts).
+
+    Returns:
+        [Dict[str, Any]]: the peak RSS per corpus size, along with how much it grows per MB of corpus
+    """
+
+    folder_path = tempfile.mkdtemp()
+    language = "auto" if specs.language == "both" else specs.language
+    runs = []
+
+    try:
+        for files in sizes:
+            corpus_path = os.path.join(folder_path, f"corpus_{files}")
+            scripts_lst = generate_corpus(corpus_path, replace(specs, files=files))
+            megabytes = sum(os.path.getsize(script) for script in scripts_lst) / MB
+
+            peak = peak_rss_of_cli(
+                [
+                    report_type,
+                    "-p", corpus_path,
+                    "-l", language,
+                    "-o", os.path.join(folder_path, f"report_{files}.{output_format}"),
+                    "-f", output_format,
+                    "-j", str(jobs),
+                    "--no-cache",
+                    "--no-daemon",
+                ]
+            )
+            runs.append(
+                {"files": files, "megabytes": round(megabytes, 3), "peak_rss_mb": round(peak / MB, 1)}
+            )
+
+    finally:
+        shutil.rmtree(folder_path)
+
+    return {
+        "corpus": {key: value for key, value in asdict(specs).items() if key != "files"},
+        "run": {"report_type": report_type, "format": output_format, "jobs": jobs},
+        "runs": runs,
+        "mb_per_corpus_mb": round(
+            fit_slope([(run["megabytes"], run["peak_rss_mb"]) for run in runs]), 2
+        ),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare the peak RSS of every corpus size, and its growth per MB of corpus, against the baseline.
+
+    Returns:
+        [List[str]]: the measures that regressed
+    """
+
+    if (results["corpus"], results["run"]) != (baseline["corpus"], baseline["run"]):
+        raise ValueError(
+            f"The corpus of the baseline differs from the one benchmarked: {baseline['corpus']}, "
+            f"{baseline['run']}"
+        )
+
+    reference = {run["files"]: run["peak_rss_mb"] for run in baseline["runs"]}
+    regressions = [
+        f"{run['files']} files"
+        for run in results["runs"]
+        if run["files"] in reference and run["peak_rss_mb"] > reference[run["files"]] * (1 + threshold)
+    ]
+
+    # the growth is compared on its own, as it's what runs the largest codebases out of memory
+    if results["mb_per_corpus_mb"] > max(baseline["mb_per_corpus_mb"], 0.1) * (1 + threshold):
+        regressions.append("growth per MB of corpus")
+
+    return regressions
+
+
+def main():
+    defaults = CorpusSpecs(language="both")
+
+    parser = argparse.ArgumentParser(description="Benchmark of the memory of the cli")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 200, 400, 800])
+    parser.add_argument("--language", choices=["python", "java", "both"], default=defaults.language)
+    parser.add_argument("--file-size", type=int, default=defaults.file_size)
+    parser.add_argument("--functions", type=int, default=defaults.functions)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--report-type", choices=["basic", "detailed"], default="detailed")
+    parser.add_argument("--format", choices=["json", "jsonl"], default="json")
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--output", type=str, default=None, help="where the results are saved (json)")
+    parser.add_argument("--baseline", type=str, default=None, help="results to compare against (json)")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help=f"fraction of peak memory that can be gained (defaults to the baseline's, {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--save-baseline", type=str, default=None, help="where the results are saved as the new baseline"
+    )
+    args = parser.parse_args()
+
+    specs = replace(
+        defaults,
+        language=args.language,
+        file_size=args.file_size,
+        functions=args.functions,
+        seed=args.seed,
+    )
+    results = run_benchmark(specs, sorted(args.sizes), args.report_type, args.format, args.jobs)
+
+    baseline = None
+    regressions = []
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+
+        threshold = (
+            args.threshold
+            if args.threshold is not None
+            else baseline.get("threshold", DEFAULT_THRESHOLD)
+        )
+
+        try:
+            regressions = compare(results, baseline, threshold)
+        except ValueError as e:
+            parser.error(str(e))
+
+    reference = {run["files"]: run["peak_rss_mb"] for run in (baseline or {}).get("runs", [])}
+
+    print(f"{args.report_type} report ({args.format}), {specs.language} scripts, jobs: {args.jobs}")
+    print(f"{'files':>8}{'corpus (MB)':>14}{'peak RSS (MB)':>16}{'baseline':>12}")
+
+    for run in results["runs"]:
+        ratio = f"{run['peak_rss_mb'] / reference[run['files']]:.0%}" if run["files"] in reference else "-"
+        print(f"{run['files']:>8}{run['megabytes']:>14.2f}{run['peak_rss_mb']:>16.1f}{ratio:>12}")
+
+    print(f"peak RSS growth: {results['mb_per_corpus_mb']} MB per MB of corpus")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(
+                {**results, "threshold": (baseline or {}).get("threshold", DEFAULT_THRESHOLD)},
+                file,
+                indent=4,
+            )
+
+    if regressions:
+        print(f"\n{len(regressions)} measures regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+# Benchmark suite of the whole analysis: throughput of each stage, of the engine and of the cli over a
+# synthetic project (see benchmarks.corpus), optionally compared against a stored baseline
+# Usage: python -m benchmarks.bench_suite [--language python|java|both] [--files N] [--file-size BYTES]
+#        [--functions N] [--depth N] [--density FRACTION] [--seed N] [--repeat N] [--jobs N]
+#        [--output PATH] [--baseline PATH] [--threshold FRACTION] [--thresholds NAME=FRACTION ...]
+#        [--save-baseline PATH]
+# The stored baseline (benchmarks/baseline.json) was measured over the default corpus, on a single job; as
+# throughput depends on the machine, refresh it with --save-baseline wherever the comparisons are run
+
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Callable
+
+from contextlib import redirect_stdout
+
+from dataclasses import asdict
+
+from spanalyzer.engine import Engine
+
+from benchmarks.corpus import CorpusSpecs
+from benchmarks.corpus import generate_corpus
+
+# stages of the analysis measured, as named by the profiler of the engine (see spanalyzer.profiling)
+STAGES = ["list", "read", "parse", "detect", "sniff", "conciliate", "write"]
+
+# default fraction of throughput that can be lost before a benchmark is considered a regression
+DEFAULT_THRESHOLD = 0.15
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    """
+    Run the function provided `repeat` times and return the best wall time.
+    """
+
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings)
+
+
+def measure_stages(folder_path: str, language: str, output_path: str, repeat: int) -> Dict[str, float]:
+    """
+    Measure the best wall time of each stage of a serial detailed run, out of the profile of the engine.
+    """
+
+    timings = {}
+
+    for _ in range(repeat):
+        engine = Engine(
+            folder_path, "detailed", language=language, output_path=output_path, jobs=1, profile=True
+        )
+
+        with redirect_stdout(io.StringIO()):
+            engine.run()
+
+        for stage in STAGES:
+            wall = engine.profiler.phases.get(stage, [0.0, 0.0])[0]
+            timings[stage] = min(timings.get(stage, wall), wall)
+
+    return timings
+
+
+def run_engine(folder_path: str, report_type: str, language: str, output_path: str, jobs: int):
+    """
+    Run the engine, as the library users do.
+    """
+
+    with redirect_stdout(io.StringIO()):
+        Engine(folder_path, report_type, language=language, output_path=output_path, jobs=jobs).run()
+
+
+def run_cli(folder_path: str, report_type: str, language: str, output_path: str, jobs: int):
+    """
+    Run the cli in a process of its own, interpreter startup and imports included.
+    """
+
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "from spanalyzer.cli import main; main()",
+            report_type,
+            "-p", folder_path,
+            "-l", language,
+            "-o", output_path,
+            "-j", str(jobs),
+            "--no-cache",
+            "--no-daemon",
+        ],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def run_suite(specs: CorpusSpecs, repeat: int, jobs: int) -> Dict[str, Any]:
+    """
+    Generate the corpus and measure the throughput of every benchmark over it.
+
+    Returns:
+        [Dict[str, Any]]: the results, along with the corpus and environment they were measured with
+    """
+
+    folder_path = tempfile.mkdtemp()
+
+    try:
+        scripts_lst = generate_corpus(os.path.join(folder_path, "corpus"), specs)
+        corpus_path = os.path.join(folder_path, "corpus")
+        output_path = os.path.join(folder_path, "report.json")
+        language = "auto" if specs.language == "both" else specs.language
+
+        files = len(scripts_lst)
+        megabytes = sum(os.path.getsize(script) for script in scripts_lst) / 1024 / 1024
+
+        timings = {
+            f"stage.{stage}": wall
+            for stage, wall in measure_stages(corpus_path, language, output_path, repeat).items()
+        }
+
+        for report_type in ("basic", "detailed"):
+            timings[f"engine.{report_type}"] = best_of(
+                lambda: run_engine(corpus_path, report_type, language, output_path, jobs), repeat
+            )
+            timings[f"cli.{report_type}"] = best_of(
+                lambda: run_cli(corpus_path, report_type, language, output_path, jobs), repeat
+            )
+
+    finally:
+        shutil.rmtree(folder_path)
+
+    return {
+        "corpus": {**asdict(specs), "megabytes": round(megabytes, 3)},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "jobs": jobs,
+            "repeat": repeat,
+        },
+        "results": {
+            name: {
+                "seconds": round(wall, 6),
+                "files_per_s": round(files / wall, 1) if wall else None,
+                "mb_per_s": round(megabytes / wall, 3) if wall else None,
+            }
+            for name, wall in timings.items()
+        },
+    }
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    thresholds: Dict[str, float],
+    default_threshold: float,
+) -> List[str]:
+    """
+    Compare the throughput of every benchmark against the baseline.
+
+    A benchmark regresses when its throughput drops by more than its threshold (the fraction of the
+    baseline throughput that can be lost), e.g. with a threshold of 0.15, anything below 85% of the
+    baseline throughput is a regression.
+
+    Returns:
+        [List[str]]: the benchmarks that regressed
+    """
+
+    if results["corpus"] != baseline["corpus"]:
+        raise ValueError(
+            f"The corpus of the baseline differs from the one benchmarked: {baseline['corpus']}"
+        )
+
+    regressions = []
+
+    for name, result in results["results"].items():
+        reference = baseline["results"].get(name, {}).get("files_per_s")
+
+        if not reference or not result["files_per_s"]:
+            continue
+
+        threshold = thresholds.get(name, default_threshold)
+        ratio = result["files_per_s"] / reference
+        result["baseline_ratio"] = round(ratio, 3)
+
+        if ratio < 1 - threshold:
+            regressions.append(name)
+
+    return regressions
+
+
+def parse_thresholds(values: List[str]) -> Dict[str, float]:
+    """
+    Parse the thresholds per benchmark, provided as `name=fraction` (e.g. stage.parse=0.25).
+    """
+
+    thresholds = {}
+
+    for value in values:
+        name, _, fraction = value.partition("=")
+        thresholds[name] = float(fraction)
+
+    return thresholds
+
+
+def main():
+    defaults = CorpusSpecs(language="both")
+
+    parser = argparse.ArgumentParser(description="Benchmark suite of the whole analysis")
+    parser.add_argument("--language", choices=["python", "java", "both"], default=defaults.language)
+    parser.add_argument("--files", type=int, default=defaults.files)
+    parser.add_argument("--file-size", type=int, default=defaults.file_size)
+    parser.add_argument("--functions", type=int, default=defaults.functions)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--density", type=float, default=defaults.density)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--output", type=str, default=None, help="where the results are saved (json)")
+    parser.add_argument("--baseline", type=str, default=None, help="results to compare against (json)")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help=f"fraction of throughput that can be lost (defaults to the baseline's, or {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--thresholds",
+        type=str,
+        nargs="*",
+        default=[],
+        help="thresholds of specific benchmarks, e.g. stage.list=0.5 (override the ones of the baseline)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        type=str,
+        default=None,
+        help="where the results are saved as the new baseline, keeping the thresholds of --baseline",
+    )
+    args = parser.parse_args()
+
+    specs = CorpusSpecs(
+        language=args.language,
+        files=args.files,
+        file_size=args.file_size,
+        functions=args.functions,
+        depth=args.depth,
+        density=args.density,
+        seed=args.seed,
+    )
+    results = run_suite(specs, args.repeat, args.jobs)
+
+    baseline = None
+    regressions = []
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+
+        # the thresholds provided take precedence over the ones stored along with the baseline
+        thresholds = {**baseline.get("thresholds", {}), **parse_thresholds(args.thresholds)}
+        default_threshold = (
+            args.threshold
+            if args.threshold is not None
+            else baseline.get("default_threshold", DEFAULT_THRESHOLD)
+        )
+        try:
+            regressions = compare(results, baseline, thresholds, default_threshold)
+        except ValueError as e:
+            parser.error(str(e))
+
+    corpus = results["corpus"]
+    print(
+        f"corpus: {specs.files} {specs.language} scripts, {corpus['megabytes']} MB "
+        f"({specs.functions} functions, depth {specs.depth}, density {specs.density}), jobs: {args.jobs}"
+    )
+    print(f"{'benchmark':<20}{'seconds':>12}{'files/s':>12}{'MB/s':>10}{'baseline':>10}")
+
+    for name, result in results["results"].items():
+        ratio = f"{result['baseline_ratio']:.0%}" if "baseline_ratio" in result else "-"
+        flag = "  << regression" if name in regressions else ""
+        print(
+            f"{name:<20}{result['seconds']:>12.4f}{result['files_per_s'] or 0:>12,.0f}"
+            f"{result['mb_per_s'] or 0:>10.2f}{ratio:>10}{flag}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(
+                {
+                    **results,
+                    "default_threshold": (baseline or {}).get("default_threshold", DEFAULT_THRESHOLD),
+                    "thresholds": {
+                        **(baseline or {}).get("thresholds", {}),
+                        **parse_thresholds(args.thresholds),
+                    },
+                },
+                file,
+                indent=4,
+            )
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmarks regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+# Deterministic generator of synthetic python and java projects, used as the corpus of the benchmarks
+# Usage: python -m benchmarks.corpus PATH [--language python|java|both] [--files N] [--file-size BYTES]
+#        [--functions N] [--depth N] [--density FRACTION] [--seed N]
+
+import os
+import random
+import argparse
+
+from typing import List
+from typing import Callable
+
+from dataclasses import dataclass
+from dataclasses import asdict
+
+
+@dataclass(frozen=True)
+class CorpusSpecs:
+    """
+    Parameters of a synthetic project; the same parameters always generate the very same project.
+
+    Args:
+        language [str]: the language of the scripts ('python', 'java' or 'both', half of the scripts each)
+        files [int]: the number of scripts
+        file_size [int]: the approximate size of each script in bytes (filler statements are added to the
+        functions until it's reached; the scripts are never smaller than their functions though)
+        functions [int]: the number of functions (or methods) per script
+        depth [int]: the nesting depth of the blocks (loops and conditionals) within each function
+        density [float]: the fraction of the functions instrumented with spans, attributes, events and
+        counters
+        seed [int]: the seed of the random choices (which functions are instrumented, the names, ...)
+    """
+
+    language: str = "python"
+    files: int = 200
+    file_size: int = 8192
+    functions: int = 20
+    depth: int = 3
+    density: float = 0.5
+    seed: int = 0
+
+
+def _nested_block(rng: random.Random, depth: int, indent: str, step: str, java: bool) -> List[str]:
+    """
+    Generate a block of loops and conditionals nested `depth` levels deep.
+    """
+
+    lines = []
+
+    for level in range(depth):
+        prefix = indent + step * level
+        bound = rng.randint(1, 100)
+
+        if java:
+            lines.append(
+                f"{prefix}for (int i{level} = 0; i{level} < {bound}; i{level}++) {{"
+                if level % 2 == 0
+                else f"{prefix}if (value > {bound}) {{"
+            )
+        else:
+            lines.append(
+                f"{prefix}for item_{level} in range({bound}):"
+                if level % 2 == 0
+                else f"{prefix}if value > {bound}:"
+            )
+
+    prefix = indent + step * depth
+    lines.append(f"{prefix}value = helper.compute(value, {rng.randint(1, 100)}){';' if java else ''}")
+
+    if java:
+        lines.extend(f"{indent + step * level}}}" for level in reversed(range(depth)))
+
+    return lines
+
+
+def _python_function(rng: random.Random, index: int, specs: CorpusSpecs, fillers: int) -> List[str]:
+    """
+    Generate a python function, instrumented or not.
+    """
+
+    name = f"function_{index}_{rng.randint(0, 10 ** 6)}"
+    instrumented = rng.random() < specs.density
+
+    lines = [
+        f"def {name}(values, factor={index}):",
+        f'    """Compute the value number {index} out of the values provided."""',
+        "    value = len(values) * factor",
+    ]
+    indent = "    "
+
+    if instrumented:
+        lines.append(f"    with tracer.start_as_current_span('{name}') as span:")
+        lines.append("        span.set_attribute('factor', factor)")
+        indent = "        "
+
+    lines.extend(f"{indent}value_{idx} = helper.transform(values, {idx}, factor)" for idx in range(fillers))
+    lines.extend(_nested_block(rng, specs.depth, indent, "    ", java=False))
+
+    if instrumented:
+        lines.append(f"{indent}span.add_event('computed', {{'value': value}})")
+        lines.append(f"{indent}counter.add(1, {{'function': '{name}'}})")
+
+    lines.append(f"{indent}return value")
+    lines.append("")
+
+    return lines
+
+
+def _java_method(rng: random.Random, index: int, specs: CorpusSpecs, fillers: int) -> List[str]:
+    """
+    Generate a java method, instrumented or not.
+    """
+
+    name = f"method{index}x{rng.randint(0, 10 ** 6)}"
+    instrumented = rng.random() < specs.density
+
+    lines = [
+        "    /**",
+        f"     * Compute the value number {index} out of the values provided.",
+        "     */",
+        f"    public int {name}(int[] values, int factor) {{",
+        "        int value = values.length * factor;",
+    ]
+
+    if instrumented:
+        lines.append(f'        Span span = tracer.spanBuilder("{name}").startSpan();')
+        lines.append('        span.setAttribute("factor", factor);')
+
+    lines.extend(
+        f"        int value{idx} = helper.transform(values, {idx}, factor);" for idx in range(fillers)
+    )
+    lines.extend(_nested_block(rng, specs.depth, "        ", "    ", java=True))
+
+    if instrumented:
+        lines.append('        span.addEvent("computed");')
+        lines.append("        counter.add(1);")
+        lines.append("        span.end();")
+
+    lines.append("        return value;")
+    lines.append("    }")
+    lines.append("")
+
+    return lines
+
+
+def _python_script(rng: random.Random, index: int, specs: CorpusSpecs, fillers: int) -> str:
+    """
+    Generate a python script, with its tracer and functions.
+    """
+
+    lines = [
+        "from opentelemetry import trace",
+        "",
+        f"tracer = trace.get_tracer('module_{index}')",
+        "",
+    ]
+
+    for idx in range(specs.functions):
+        lines.extend(_python_function(rng, idx, specs, fillers))
+
+    return "\n".join(lines)
+
+
+def _java_script(rng: random.Random, index: int, specs: CorpusSpecs, fillers: int) -> str:
+    """
+    Generate a java script, with a single class holding its tracer and methods.
+    """
+
+    lines = [
+        "import io.opentelemetry.api.trace.Span;",
+        "import io.opentelemetry.api.trace.Tracer;",
+        "import io.opentelemetry.api.OpenTelemetry;",
+        "",
+        f"public class Module{index} {{",
+        f'    private static final Tracer tracer = OpenTelemetry.getGlobalTracer("module_{index}");',
+        "",
+    ]
+
+    for idx in range(specs.functions):
+        lines.extend(_java_method(rng, idx, specs, fillers))
+
+    lines.append("}")
+
+    return "\n".join(lines)
+
+
+def _generate_script(
+    generator: Callable[[random.Random, int, CorpusSpecs, int], str],
+    seed: str,
+    index: int,
+    specs: CorpusSpecs,
+) -> str:
+    """
+    Generate a script as close as possible to the file size of the specs, by working out the number of
+    filler statements per function out of the sizes of the script without and with a single one of them.
+    """
+
+    def generate(fillers: int) -> str:
+        return generator(random.Random(seed), index, specs, fillers)
+
+    empty_size = len(generate(0))
+    filler_size = max(1, len(generate(1)) - empty_size)
+    fillers = max(0, round((specs.file_size - empty_size) / filler_size))
+
+    return generate(fillers)
+
+
+def generate_corpus(folder_path: str, specs: CorpusSpecs) -> List[str]:
+    """
+    Generate a synthetic project into the folder provided, spread over nested packages.
+
+    Args:
+        folder_path [str]: the path to the folder where the project is generated
+        specs [CorpusSpecs]: the parameters of the project
+
+    Returns:
+        [List[str]]: the paths to the scripts generated
+    """
+
+    scripts_lst = []
+
+    for index in range(specs.files):
+        language = (
+            specs.language if specs.language != "both" else ("python", "java")[index % 2]
+        )
+        package = os.path.join(
+            folder_path, "src", f"package_{index % 10}", f"module_{index % 3}"
+        )
+        os.makedirs(package, exist_ok=True)
+
+        # every script has a seed of its own, so it doesn't depend on the ones generated before
+        if language == "python":
+            path = os.path.join(package, f"module_{index}.py")
+            source_code = _generate_script(_python_script, f"{specs.seed}:{index}", index, specs)
+        else:
+            path = os.path.join(package, f"Module{index}.java")
+            source_code = _generate_script(_java_script, f"{specs.seed}:{index}", index, specs)
+
+        with open(path, "w") as file:
+            file.write(source_code)
+
+        scripts_lst.append(path)
+
+    return scripts_lst
+
+
+def main():
+    defaults = CorpusSpecs()
+
+    parser = argparse.ArgumentParser(description="Generator of synthetic python and java projects")
+    parser.add_argument("path", type=str)
+    parser.add_argument("--language", choices=["python", "java", "both"], default=defaults.language)
+    parser.add_argument("--files", type=int, default=defaults.files)
+    parser.add_argument("--file-size", type=int, default=defaults.file_size)
+    parser.add_argument("--functions", type=int, default=defaults.functions)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--density", type=float, default=defaults.density)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    specs = CorpusSpecs(
+        language=args.language,
+        files=args.files,
+        file_size=args.file_size,
+        functions=args.functions,
+        depth=args.depth,
+        density=args.density,
+        seed=args.seed,
+    )
+    scripts_lst = generate_corpus(args.path, specs)
+    size = sum(os.path.getsize(script) for script in scripts_lst)
+
+    print(f"{len(scripts_lst)} scripts generated ({size / 1024 / 1024:.1f} MB): {asdict(specs)}")
+
+
+if __name__ == "__main__":
+    main()
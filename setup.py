@@ -7,6 +7,9 @@ setup(
     install_requires=[
         "javalang",
     ],
+    extras_require={
+        "telemetry": ["opentelemetry-sdk"],
+    },
     entry_points={
         'console_scripts': [
             'spanalyzer=spanalyzer.cli:main',
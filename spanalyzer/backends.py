@@ -0,0 +1,94 @@
+# Registry of the language backends supported by the engine.
+#
+# Each backend is a module exposing the same interface - `tokenize`, `parse`, `build_sniffer`, `Detector`
+# and `Keywords` -, which is only imported when its language is first requested, so a run over a single
+# language never pays for the import of the others (e.g. javalang for a python only run).
+
+from importlib import import_module
+
+from types import ModuleType
+
+from typing import Tuple
+
+from collections import namedtuple
+
+BackendSpecs = namedtuple("BackendSpecs", ["extension", "module"])
+
+BACKENDS = {
+    "python": BackendSpecs(extension=".py", module="spanalyzer.python.backend"),
+    "java": BackendSpecs(extension=".java", module="spanalyzer.java.backend"),
+}
+
+
+def _backend_specs(language: str) -> BackendSpecs:
+    """
+    Get the registry entry of the language provided.
+
+    Args:
+        language [str]: the language of the scripts (the options are the keys of `BACKENDS`)
+
+    Returns:
+        [BackendSpecs]: the file extension and the module of the backend
+    """
+
+    try:
+        return BACKENDS[language]
+    except KeyError:
+        raise ValueError(f"Invalid language: {language}") from None
+
+
+def file_extension(language: str) -> str:
+    """
+    Get the file extension of the scripts of the language provided, without loading its backend.
+
+    Args:
+        language [str]: the language of the scripts
+
+    Returns:
+        [str]: the file extension
+    """
+
+    return _backend_specs(language).extension
+
+
+def resolve_languages(language: str) -> Tuple[str, ...]:
+    """
+    Resolve the language option into the languages to be analyzed.
+
+    Args:
+        language [str]: a single language, a comma separated list of languages, or 'auto' (every
+        language supported)
+
+    Returns:
+        [Tuple[str, ...]]: the languages to be analyzed, without duplicates
+
+    _Example_:
+    >>> resolve_languages("java, python")
+    ('java', 'python')
+    >>> resolve_languages("auto")
+    ('python', 'java')
+    """
+
+    if language == "auto":
+        return tuple(BACKENDS)
+
+    languages = tuple(dict.fromkeys(lang.strip() for lang in language.split(",")))
+
+    for lang in languages:
+        _backend_specs(lang)
+
+    return languages
+
+
+def load_backend(language: str) -> ModuleType:
+    """
+    Load the backend of the language provided, importing it on the first call.
+
+    Args:
+        language [str]: the language of the scripts
+
+    Returns:
+        [ModuleType]: the backend module
+    """
+
+    return import_module(_backend_specs(language).module)
@@ -0,0 +1,148 @@
+# Script containing the on-disk cache of the per script analysis results
+
+import os
+import json
+import hashlib
+
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from spanalyzer import __version__
+
+
+class ResultCache:
+    """
+    On-disk cache of the analysis results of each script.
+
+    Every entry is keyed by the hash of the script content, the spanalyzer version and the language of
+    the script, and stores the output of the detector and - when available - the output of the sniffer.
+    That way, a script whose content didn't change since the last run doesn't need to be parsed again.
+
+    The cache is capped in size: once it grows past `max_size`, the least recently used entries are
+    evicted (an entry is marked as used every time it is read).
+
+    Args:
+        cache_dir [str]: the path to the folder where the cache entries are stored
+        max_size [int]: the maximum size of the cache in bytes
+    """
+
+    DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "spanalyzer")
+    DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+    def __init__(self, cache_dir: str = DEFAULT_DIR, max_size: int = DEFAULT_MAX_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(source_code: str, language: str) -> str:
+        """
+        Compute the key of the cache entry of a script.
+
+        Args:
+            source_code [str]: the content of the script
+            language [str]: the language of the script
+
+        Returns:
+            [str]: the key of the cache entry
+        """
+
+        digest = hashlib.sha256(f"{__version__}\0{language}\0".encode())
+        digest.update(source_code.encode("utf-8", "surrogatepass"))
+
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        """
+        Get the path of the file holding the cache entry.
+
+        Args:
+            key [str]: the key of the cache entry
+
+        Returns:
+            [str]: the path to the cache entry
+        """
+
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cache entry, marking it as recently used.
+
+        Args:
+            key [str]: the key of the cache entry
+
+        Returns:
+            [Optional[Dict[str, Any]]]: the cache entry, None if there's no entry for the key
+        """
+
+        path = self._entry_path(key)
+
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+
+            os.utime(path)
+
+        except (OSError, ValueError):
+            return None
+
+        return entry
+
+    def set(self, key: str, entry: Dict[str, Any]):
+        """
+        Store a cache entry.
+
+        The entry is written to a temporary file first and then moved into place, so concurrent workers
+        never read a partially written entry. Entries that can't be serialized are silently skipped.
+
+        Args:
+            key [str]: the key of the cache entry
+            entry [Dict[str, Any]]: the cache entry
+        """
+
+        path = self._entry_path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            with open(temp_path, "w") as f:
+                json.dump(entry, f)
+
+            os.replace(temp_path, path)
+
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def prune(self):
+        """
+        Evict the least recently used entries until the cache fits within its maximum size.
+        """
+
+        entries = []
+
+        for root, dirs, files in os.walk(self.cache_dir):
+            for file in files:
+                path = os.path.join(root, file)
+
+                try:
+                    entries.append((path, os.stat(path)))
+                except OSError:
+                    continue
+
+        total_size = sum(stat.st_size for _, stat in entries)
+
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime_ns):
+            if total_size <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+
+            total_size -= stat.st_size
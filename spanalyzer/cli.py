@@ -2,7 +2,38 @@
 
 import argparse
 
-from spanalyzer.engine import Engine
+from typing import Tuple
+
+from spanalyzer.cache import ResultCache
+from spanalyzer.client import run_report
+from spanalyzer.client import UNIX_SOCKETS
+from spanalyzer.client import default_socket_path
+
+from spanalyzer.backends import resolve_languages
+
+from spanalyzer.profiling import RESOURCE_AVAILABLE
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse the shard option, provided as `i/N` (the i-th out of N shards, starting from 1).
+
+    Args:
+        value [str]: the value of the option
+
+    Returns:
+        [Tuple[int, int]]: the shard and the number of shards
+    """
+
+    try:
+        index, shards_count = map(int, value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid shard: {value} (expected i/N, e.g. 1/4)")
+
+    if not 1 <= index <= shards_count:
+        raise argparse.ArgumentTypeError(f"Invalid shard: {value} (i must be between 1 and N)")
+
+    return index, shards_count
 
 
 def main():
@@ -24,6 +55,18 @@ def main():
     The tool provides two report types:
     - basic: A terminal-based overview of telemetry coverage
     - detailed: A comprehensive JSON report of all telemetry operations
+
+    Along with the watch mode, which keeps the detailed report (and a terminal summary) up to date while
+    the scripts are edited, analyzing only the scripts that changed.
+
+    The serve mode starts a resident daemon that keeps the analysis results warm; while it's running, the
+    reports are transparently generated by it.
+
+    The analysis can be spread across several machines with --shard, and the partial reports put back
+    together with the merge mode.
+
+    The diff mode compares two detailed reports, listing the telemetry added and removed per script and
+    function (regardless of the lines that moved), and the functions that lost all instrumentation.
     """
 
     parser = argparse.ArgumentParser(
@@ -34,8 +77,21 @@ def main():
     parser.add_argument(
         "report_type",
         type=str,
-        help="Type of report to generate",
-        choices=["basic", "detailed"],
+        help=(
+            "Type of report to generate (or watch, to keep the detailed report up to date, serve, to "
+            "start the resident daemon, merge, to merge the partial reports of a sharded run, or diff, "
+            "to compare two detailed reports)"
+        ),
+        choices=["basic", "detailed", "watch", "serve", "merge", "diff"],
+    )
+    parser.add_argument(
+        "reports",
+        type=str,
+        nargs="*",
+        help=(
+            "Partial reports to be merged into the output file (merge mode), or the old and new detailed "
+            "reports to be compared (diff mode)"
+        ),
     )
     parser.add_argument(
         "-p",
@@ -54,15 +110,301 @@ def main():
         "-l",
         "--language",
         type=str,
-        help="Language of the scripts to be analyzed",
-        choices=["python", "java"],
+        help=(
+            "Language of the scripts to be analyzed: python, java, a comma separated list of both "
+            "(e.g. python,java) or auto; when several languages are analyzed, each script is routed by "
+            "its extension and tagged with its language in the report"
+        ),
         default="python",
     )
+    parser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        help="Format of the detailed report: a single json document, or one json record per script (jsonl)",
+        choices=["json", "jsonl"],
+        default="json",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of worker processes used to analyze the scripts (defaults to the CPU count)",
+        default=None,
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help=(
+            "Path to the folder where the analysis results are cached between runs "
+            f"(defaults to {ResultCache.DEFAULT_DIR})"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        help=(
+            "Maximum size of the results cache in megabytes "
+            f"(defaults to {ResultCache.DEFAULT_MAX_SIZE // (1024 * 1024)})"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Analyze every script from scratch, without reading nor writing the results cache",
+    )
+
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help=(
+            "Skip parsing the scripts whose raw content doesn't mention any telemetry keyword "
+            "(no telemetry call is ever missed)"
+        ),
+    )
+    parser.add_argument(
+        "--file-timeout",
+        type=float,
+        help=(
+            "Number of seconds each script can be analyzed for; the scripts are analyzed by workers that are "
+            "killed when overrunning it, and the scripts abandoned are reported as timed out"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--file-memory",
+        type=int,
+        help=(
+            "Maximum memory (MB) of each worker analyzing the scripts; the scripts exhausting it are "
+            "abandoned and reported as such, instead of bringing the run down"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--since",
+        type=str,
+        help=(
+            "Git reference (e.g. origin/main); only the scripts that changed since then are analyzed and, "
+            "for the detailed report, merged into the previous report found at the output path"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        help=(
+            "Only analyze the i-th out of N shards of the scripts (e.g. 1/4), assigned by a stable hash of "
+            "their path; the basic rows are also written into the output file, to be merged later on"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Print the wall time and CPU time spent on each phase of the run (listing, parsing, detecting, "
+            "sniffing, conciliating, writing, ...), followed by the slowest scripts"
+        ),
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        help="Number of slowest scripts printed along with the profile",
+        default=10,
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help=(
+            "Trace the memory allocations of the run, printing the peak RSS, the peak memory of each phase, "
+            "the memory held by the report before writing it and its largest allocations (slows the run down)"
+        ),
+    )
+    parser.add_argument(
+        "--profile-stats",
+        type=str,
+        help=(
+            "Path to the file where the cProfile stats of the run are dumped (to be read with pstats or "
+            "snakeviz); only the main process is covered, so use it along with --jobs 1"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--self-telemetry",
+        type=str,
+        help=(
+            "Emit the spans and metrics of the run itself (per phase and per script) into the console "
+            "(console) or a local file (path), provided the OpenTelemetry SDK is installed"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        help="Number of seconds between two polls of the folder in watch mode",
+        default=1.0,
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        help="Path to the unix domain socket of the resident daemon (defaults to one per user)",
+        default=None,
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Generate the report in this process, even if the resident daemon is running",
+    )
 
     args = parser.parse_args()
 
+    try:
+        resolve_languages(args.language)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.report_type == "watch" and args.since:
+        parser.error("--since can't be used in watch mode")
+
+    if args.report_type == "watch" and args.shard:
+        parser.error("--shard can't be used in watch mode")
+
+    profiling = args.profile or args.profile_stats or args.memory
+
+    if args.report_type not in ("basic", "detailed") and profiling:
+        parser.error("--profile, --profile-stats and --memory only apply to the basic and detailed reports")
+
+    if (args.memory or args.file_memory) and not RESOURCE_AVAILABLE:
+        parser.error("--memory and --file-memory are not supported on this platform (no resource module)")
+
+    if args.report_type not in ("merge", "diff") and args.reports:
+        parser.error("reports can only be provided in merge and diff modes")
+
+    if args.report_type == "merge" and not args.reports:
+        parser.error("the reports to be merged must be provided in merge mode")
+
+    if args.report_type == "diff" and len(args.reports) != 2:
+        parser.error("the old and new reports must be provided in diff mode")
+
+    watch = args.report_type == "watch"
+    supervised = args.file_timeout or args.file_memory
+    cache_dir = None if args.no_cache else (args.cache_dir or ResultCache.DEFAULT_DIR)
+    cache_size = (
+        args.cache_size * 1024 * 1024 if args.cache_size is not None else ResultCache.DEFAULT_MAX_SIZE
+    )
+
+    # the daemon analyzes the scripts with the jobs and cache it was started with, so the runs asking for
+    # other ones are run locally
+    local_options = (
+        args.jobs is not None or args.cache_dir is not None or args.cache_size is not None or args.no_cache
+    )
+
+    if args.report_type == "serve" and not UNIX_SOCKETS:
+        parser.error("the daemon listens on a unix domain socket, which this platform doesn't support")
+
+    if args.report_type == "serve":
+        # imported here, as the daemon is the only one needing the server machinery
+        from spanalyzer.server import serve
+
+        try:
+            return serve(
+                args.socket or default_socket_path(),
+                jobs=args.jobs,
+                cache_dir=cache_dir,
+                cache_size=cache_size,
+            )
+        except (ValueError, OSError) as e:
+            parser.error(str(e))
+
+    if args.report_type == "merge":
+        # imported here, as merging the reports doesn't need the engine
+        from spanalyzer.merge import merge_reports
+
+        try:
+            merge_reports(args.reports, args.output, output_format=args.format)
+        except ValueError as e:
+            parser.error(str(e))
+
+        return
+
+    if args.report_type == "diff":
+        # imported here, as comparing the reports doesn't need the engine
+        from spanalyzer.diff import run_diff
+
+        try:
+            run_diff(*args.reports)
+        except ValueError as e:
+            parser.error(str(e))
+
+        return
+
+    if (
+        not watch
+        and not args.no_daemon
+        and not args.since
+        and not args.shard
+        and not profiling
+        and not args.self_telemetry
+        and not supervised
+        and not local_options
+        and args.format == "json"
+        and run_report(
+            args.path,
+            args.report_type,
+            language=args.language,
+            output_path=args.output,
+            fast=args.fast,
+            socket_path=args.socket,
+        )
+    ):
+        return
+
+    # imported here, so the reports answered by the daemon don't pay for the import of the engine
+    from spanalyzer.engine import Engine
+    from spanalyzer.watch import Watcher
+    from spanalyzer.instrumentation import Instrumentation
+
+    instrumentation = Instrumentation(args.self_telemetry) if args.self_telemetry else None
+
+    if instrumentation is not None and not instrumentation.enabled:
+        print("[!] The OpenTelemetry SDK is not installed (see opentelemetry-sdk), nothing is emitted")
+
     engine = Engine(
-        args.path, args.report_type, language=args.language, output_path=args.output
+        args.path,
+        "detailed" if watch else args.report_type,
+        language=args.language,
+        output_path=args.output,
+        jobs=args.jobs,
+        cache_dir=cache_dir,
+        cache_size=cache_size,
+        since=args.since,
+        output_format=args.format,
+        fast=args.fast,
+        shard=args.shard,
+        profile=args.profile,
+        profile_top=args.profile_top,
+        memory=args.memory,
+        instrumentation=instrumentation,
+        file_timeout=args.file_timeout,
+        file_memory=args.file_memory * 1024 * 1024 if args.file_memory else None,
     )
 
-    engine.run()
+    try:
+        if watch:
+            Watcher(engine, interval=args.interval).run()
+        elif args.profile_stats:
+            # imported here, as the stats are seldom dumped
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.runcall(engine.run)
+            profiler.dump_stats(args.profile_stats)
+
+            print(f"[i] Profile stats dumped into {args.profile_stats}")
+        else:
+            engine.run()
+    finally:
+        if instrumentation is not None:
+            instrumentation.shutdown()
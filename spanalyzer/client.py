@@ -0,0 +1,162 @@
+# Script containing the thin client of the resident daemon (see `spanalyzer.server`).
+
+import os
+import json
+import socket
+import tempfile
+
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from spanalyzer import __version__
+
+from spanalyzer.reports import terminal_report
+
+from spanalyzer.utils.operations import write_json
+from spanalyzer.utils.operations import folder_trim
+
+# whether the platform supports unix domain sockets, which the daemon listens on (e.g. not on Windows)
+UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+
+def default_socket_path() -> Optional[str]:
+    """
+    Get the default path to the unix domain socket of the daemon, one per user.
+
+    Returns:
+        [Optional[str]]: the path to the socket, None if the platform doesn't support unix domain sockets
+    """
+
+    if not UNIX_SOCKETS:
+        return None
+
+    return os.path.join(
+        os.environ.get("XDG_RUNTIME_DIR", tempfile.gettempdir()),
+        f"spanalyzer-{os.getuid()}.sock",
+    )
+
+
+def owned_socket(socket_path: str) -> bool:
+    """
+    Check if the socket belongs to the current user.
+
+    The default path falls back on the temporary folder, which is shared by every user, so a socket
+    found there could be served by anyone else (with forged reports).
+
+    Args:
+        socket_path [str]: the path to the unix domain socket
+
+    Returns:
+        [bool]: True if the socket exists and belongs to the current user, False otherwise
+    """
+
+    try:
+        return os.stat(socket_path).st_uid == os.getuid()
+    except OSError:
+        return False
+
+
+def request(payload: Dict[str, Any], socket_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Send a request to the daemon and wait for its response.
+
+    Args:
+        payload [Dict[str, Any]]: the request
+        socket_path [Optional[str]]: the path to the unix domain socket the daemon listens on (defaults to
+        `default_socket_path`)
+
+    Returns:
+        [Dict[str, Any]]: the response
+
+    Raises:
+        OSError: if the daemon can't be reached
+    """
+
+    socket_path = socket_path or default_socket_path()
+
+    if socket_path is None:
+        raise OSError("Unix domain sockets are not supported on this platform")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+
+        with sock.makefile("rb") as file:
+            line = file.readline()
+
+    if not line:
+        raise ConnectionError("The daemon closed the connection without answering")
+
+    return json.loads(line)
+
+
+def run_report(
+    folder_path: str,
+    report_type: str,
+    language: str = "python",
+    output_path: str = "spanalyzer_report.json",
+    fast: bool = False,
+    socket_path: Optional[str] = None,
+) -> bool:
+    """
+    Generate the report through the daemon, producing the same output as `Engine.run`.
+
+    The daemon receives the absolute path of the folder, and the scripts are mapped back into paths
+    relative to the folder provided, so the report is the same as the one of a local run.
+
+    Args:
+        folder_path [str]: the path to the folder containing the scripts to be analyzed
+        report_type [str]: the type of report to be generated (the options are 'basic' and 'detailed')
+        language [str]: the language of the scripts to be analyzed
+        output_path [str]: the path to the output file
+        fast [bool]: whether to skip parsing the scripts that can't contain telemetry calls
+        socket_path [Optional[str]]: the path to the unix domain socket the daemon listens on (defaults to
+        `default_socket_path`)
+
+    Returns:
+        [bool]: True if the report was generated by the daemon, False if there's no daemon available (of
+        the same version, and run by the current user) to generate it
+    """
+
+    socket_path = socket_path or default_socket_path()
+
+    if folder_path is None or socket_path is None or not owned_socket(socket_path):
+        return False
+
+    absolute_folder_path = os.path.abspath(folder_path)
+
+    try:
+        if request({"command": "ping"}, socket_path).get("version") != __version__:
+            return False
+
+        response = request(
+            {
+                "command": "report",
+                "path": absolute_folder_path,
+                "report_type": report_type,
+                "language": language,
+                "fast": fast,
+            },
+            socket_path,
+        )
+    except (OSError, ValueError):
+        return False
+
+    if not response.get("ok"):
+        return False
+
+    entries = [
+        (os.path.join(folder_path, os.path.relpath(script, absolute_folder_path)), entry)
+        for script, entry in response["entries"]
+        if entry is not None
+    ]
+
+    if report_type == "basic":
+        print(terminal_report(folder_trim([{"script": script, **entry} for script, entry in entries])))
+    else:
+        write_json(dict(entries), output_path)
+
+    print(f"[i] Cache: {response['cache_hits']} hits, {response['cache_misses']} misses")
+
+    return True
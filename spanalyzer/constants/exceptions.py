@@ -7,8 +7,16 @@ class ExcludedPaths(str, Enum):
     """
     Default paths to exclude from code analysis.
 
+    The paths are matched against whole path components, so the usual names of the virtual environments are
+    listed one by one; the packages installed into a virtual environment of any other name are still left
+    out through their site-packages folder.
+
     Args:
         VENV [str]: the path to the virtual environment
+        DOT_VENV [str]: the path to the (hidden) virtual environment
+        VIRTUALENV [str]: the path to the virtual environment created by virtualenv
+        DOT_VIRTUALENV [str]: the path to the (hidden) virtual environment created by virtualenv
+        SITE_PACKAGES [str]: the path to the packages installed into a virtual environment
         TESTS [str]: the path to the tests
         NODE_MODULES [str]: the path to the node modules
         PYCACHE [str]: the path to the pycache
@@ -17,6 +25,10 @@ class ExcludedPaths(str, Enum):
     """
 
     VENV = "venv"
+    DOT_VENV = ".venv"
+    VIRTUALENV = "virtualenv"
+    DOT_VIRTUALENV = ".virtualenv"
+    SITE_PACKAGES = "site-packages"
     TESTS = "tests"
     NODE_MODULES = "node_modules"
     PYCACHE = "__pycache__"
@@ -0,0 +1,331 @@
+# Script containing the comparison of two detailed reports, e.g. before and after a change to the codebase.
+
+import json
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Iterator
+from typing import Optional
+
+from collections import Counter
+from collections import namedtuple
+
+from spanalyzer.utils.streams import is_basic_report
+from spanalyzer.utils.streams import iter_report_records
+
+from spanalyzer.utils.operations import script_sort_key
+
+# telemetry item added or removed, along with the function it belongs to (None at the script level)
+ItemChange = namedtuple("ItemChange", ["function", "category", "item"])
+
+# changes of a single script; its status is either 'added', 'removed' or 'modified'
+ScriptDiff = namedtuple(
+    "ScriptDiff", ["script", "status", "added", "removed", "uninstrumented"]
+)
+
+
+def _item_key(item: Dict[str, Any]) -> str:
+    """
+    Identify a telemetry item regardless of its line, so the items that only moved are matched.
+
+    Args:
+        item [Dict[str, Any]]: the telemetry item
+
+    Returns:
+        [str]: the identity of the item
+    """
+
+    return json.dumps(
+        {key: value for key, value in item.items() if key != "line_number"},
+        sort_keys=True,
+    )
+
+
+def _telemetry_items(record: Dict[str, Any]) -> Dict[Tuple[Optional[str], str], List[Dict]]:
+    """
+    Collect the telemetry items of a detailed report record, per function and category.
+
+    Args:
+        record [Dict[str, Any]]: the record of a script
+
+    Returns:
+        [Dict[Tuple[Optional[str], str], List[Dict]]]: the telemetry items of each (function, category)
+        pair, the function being None at the script level
+    """
+
+    items = {}
+
+    for key, value in record.items():
+        if key == "functions":
+            for function, function_entry in value.items():
+                for category, function_value in function_entry.items():
+                    if isinstance(function_value, list):
+                        items[(function, category)] = function_value
+
+        elif isinstance(value, list):
+            items[(None, key)] = value
+
+    return items
+
+
+def diff_records(
+    script: str,
+    old_record: Optional[Dict[str, Any]],
+    new_record: Optional[Dict[str, Any]],
+) -> Optional[ScriptDiff]:
+    """
+    Compare the records of a script in two detailed reports.
+
+    The items of each function and category are compared as multisets of their identity (see `_item_key`),
+    so an item that only moved to another line is neither added nor removed.
+
+    Args:
+        script [str]: the path to the script
+        old_record [Optional[Dict[str, Any]]]: the record in the old report (None if the script is new)
+        new_record [Optional[Dict[str, Any]]]: the record in the new report (None if the script is gone)
+
+    Returns:
+        [Optional[ScriptDiff]]: the changes of the script, None if there's none
+    """
+
+    # most scripts don't change at all in between two reports
+    if old_record == new_record:
+        return None
+
+    old_items = _telemetry_items(old_record or {})
+    new_items = _telemetry_items(new_record or {})
+
+    added, removed = [], []
+
+    for function, category in dict.fromkeys([*old_items, *new_items]):
+        old_lst = old_items.get((function, category), [])
+        new_lst = new_items.get((function, category), [])
+
+        if old_lst == new_lst:
+            continue
+
+        old_keys = list(map(_item_key, old_lst))
+        new_keys = list(map(_item_key, new_lst))
+
+        old_counts = Counter(old_keys)
+        new_counts = Counter(new_keys)
+
+        for item, key in zip(old_lst, old_keys):
+            if new_counts[key] > 0:
+                new_counts[key] -= 1
+            else:
+                removed.append(ItemChange(function, category, item))
+
+        for item, key in zip(new_lst, new_keys):
+            if old_counts[key] > 0:
+                old_counts[key] -= 1
+            else:
+                added.append(ItemChange(function, category, item))
+
+    def instrumented(items: Dict[Tuple[Optional[str], str], List[Dict]]) -> Dict[str, None]:
+        return dict.fromkeys(
+            function for (function, _), lst in items.items() if function is not None and lst
+        )
+
+    # only the functions that are still there (in a script that is still there) can lose their
+    # instrumentation, the deleted ones are just gone
+    new_functions = instrumented(new_items)
+    present_functions = (new_record or {}).get("functions", {})
+    uninstrumented = (
+        [
+            function
+            for function in instrumented(old_items)
+            if function not in new_functions and function in present_functions
+        ]
+        if old_record is not None and new_record is not None
+        else []
+    )
+
+    if not added and not removed:
+        return None
+
+    status = (
+        "added" if old_record is None else "removed" if new_record is None else "modified"
+    )
+
+    return ScriptDiff(script, status, added, removed, uninstrumented)
+
+
+def _is_sorted(path: str) -> bool:
+    """
+    Check if the records of a report come in the order the scripts are analyzed (see `script_sort_key`).
+
+    Args:
+        path [str]: the path to the report
+
+    Returns:
+        [bool]: True if the scripts are sorted (and listed once), False otherwise
+    """
+
+    previous_key = None
+
+    for record in iter_report_records(path):
+        key = script_sort_key(record["script"])
+
+        if previous_key is not None and key <= previous_key:
+            return False
+
+        previous_key = key
+
+    return True
+
+
+def _sorted_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the records of a detailed report, in the order the scripts are analyzed.
+
+    The reports are written in that order, so their records are streamed as they come. The ones that are
+    not (e.g. written by an older version, or edited by hand) are loaded into memory and sorted instead.
+
+    Args:
+        path [str]: the path to the report
+
+    Returns:
+        [Iterator[Dict[str, Any]]]: the records of the report
+    """
+
+    if is_basic_report(path):
+        raise ValueError(f"Only detailed reports can be compared: {path}")
+
+    if _is_sorted(path):
+        yield from iter_report_records(path)
+        return
+
+    records = {record["script"]: record for record in iter_report_records(path)}
+
+    for script in sorted(records, key=script_sort_key):
+        yield records[script]
+
+
+def diff_reports(old_path: str, new_path: str) -> Iterator[ScriptDiff]:
+    """
+    Compare two detailed reports, script by script.
+
+    Both reports list the scripts in the order they are analyzed (see `script_sort_key`), so they are
+    streamed side by side, as in a merge join: only the record of the script being compared of each report
+    is held in memory, regardless of the size of the reports (unless a report isn't sorted, see
+    `_sorted_records`).
+
+    Args:
+        old_path [str]: the path to the old report (json or jsonl)
+        new_path [str]: the path to the new report (json or jsonl)
+
+    Returns:
+        [Iterator[ScriptDiff]]: the changes of each script that changed, in the order of the reports
+    """
+
+    old_records = _sorted_records(old_path)
+    new_records = _sorted_records(new_path)
+
+    old_record = next(old_records, None)
+    new_record = next(new_records, None)
+
+    while old_record is not None or new_record is not None:
+        old_key = script_sort_key(old_record["script"]) if old_record else None
+        new_key = script_sort_key(new_record["script"]) if new_record else None
+
+        if new_key is None or (old_key is not None and old_key < new_key):
+            script_diff = diff_records(old_record["script"], old_record, None)
+            old_record = next(old_records, None)
+
+        elif old_key is None or new_key < old_key:
+            script_diff = diff_records(new_record["script"], None, new_record)
+            new_record = next(new_records, None)
+
+        else:
+            script_diff = diff_records(new_record["script"], old_record, new_record)
+            old_record = next(old_records, None)
+            new_record = next(new_records, None)
+
+        if script_diff is not None:
+            yield script_diff
+
+
+def _describe_item(item: Dict[str, Any]) -> str:
+    """
+    Describe a telemetry item in a single line.
+
+    Args:
+        item [Dict[str, Any]]: the telemetry item
+
+    Returns:
+        [str]: the description of the item
+    """
+
+    details = "".join(
+        f" {json.dumps(item[key])}" for key in ("args", "keywords") if item.get(key) is not None
+    )
+
+    return f"{item['func']}{details} (line {item['line_number']})"
+
+
+def format_script_diff(script_diff: ScriptDiff) -> str:
+    """
+    Format the changes of a script, grouped by function.
+
+    Args:
+        script_diff [ScriptDiff]: the changes of the script
+
+    Returns:
+        [str]: the changes of the script, with the removed items led by '-' and the added ones by '+'
+
+    _Example_:
+        ```
+        ~ path/to/script.py
+          <script>
+            + tracers: tracer (line 3)
+          process [lost all instrumentation]
+            - spans: process (line 12)
+        ```
+    """
+
+    marker = {"added": "+", "removed": "-", "modified": "~"}[script_diff.status]
+    lines = [f"{marker} {script_diff.script}"]
+
+    changes = [("-", change) for change in script_diff.removed] + [
+        ("+", change) for change in script_diff.added
+    ]
+
+    for function in dict.fromkeys(change.function for _, change in changes):
+        lost = " [lost all instrumentation]" if function in script_diff.uninstrumented else ""
+        lines.append(f"  {'<script>' if function is None else function}{lost}")
+
+        lines.extend(
+            f"    {sign} {change.category}: {_describe_item(change.item)}"
+            for sign, change in changes
+            if change.function == function
+        )
+
+    return "\n".join(lines)
+
+
+def run_diff(old_path: str, new_path: str):
+    """
+    Print the changes between two detailed reports, script by script, followed by a summary.
+
+    Args:
+        old_path [str]: the path to the old report (json or jsonl)
+        new_path [str]: the path to the new report (json or jsonl)
+    """
+
+    scripts_count = added_count = removed_count = uninstrumented_count = 0
+
+    for script_diff in diff_reports(old_path, new_path):
+        print(format_script_diff(script_diff))
+
+        scripts_count += 1
+        added_count += len(script_diff.added)
+        removed_count += len(script_diff.removed)
+        uninstrumented_count += len(script_diff.uninstrumented)
+
+    print(
+        f"\n[i] {scripts_count} scripts changed: {added_count} items added, {removed_count} items "
+        f"removed, {uninstrumented_count} functions lost all instrumentation"
+    )
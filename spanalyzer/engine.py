@@ -1,28 +1,119 @@
 # Script containing the engine that will be capturing all the functions in a certain folder.
 
 import os
-import ast
-import javalang
+import heapq
+import tracemalloc
 
+from typing import Any
 from typing import List
 from typing import Dict
+from typing import Tuple
+from typing import Callable
+from typing import Iterator
+from typing import Optional
+from typing import FrozenSet
+from typing import ContextManager
+from typing import TYPE_CHECKING
+
+from functools import partial
+
+from contextlib import ExitStack
+from contextlib import contextmanager
+
+from itertools import repeat
+
+from collections import deque
+from collections import namedtuple
+
+from dataclasses import dataclass
 
 from pathlib import Path
 
+from spanalyzer.cache import ResultCache
+
+from spanalyzer.backends import file_extension
+from spanalyzer.backends import load_backend
+from spanalyzer.backends import resolve_languages
+
 from spanalyzer.reports import terminal_report
 
+from spanalyzer.profiling import NO_PHASE
+from spanalyzer.profiling import Profiler
+from spanalyzer.profiling import ScriptProfile
+from spanalyzer.profiling import phase
+from spanalyzer.profiling import RESOURCE_AVAILABLE
+
+from spanalyzer.utils.git import changed_files
+
+from spanalyzer.utils.streams import JsonlWriter
+from spanalyzer.utils.streams import iter_jsonl
+
+from spanalyzer.utils.operations import read_json
+from spanalyzer.utils.operations import is_excluded
+from spanalyzer.utils.operations import walk_scripts
+from spanalyzer.utils.operations import script_sort_key
+from spanalyzer.utils.operations import contains_keywords
 from spanalyzer.utils.operations import write_json
 from spanalyzer.utils.operations import folder_trim
 from spanalyzer.utils.operations import conciliation
+from spanalyzer.utils.operations import shard_index
 
-from spanalyzer.python.script import PythonScriptSniffer as PySniffer
-from spanalyzer.python.detector import PythonTelemetryDetector as PyDetector
-
-from spanalyzer.java.script import JavaScriptSniffer as JsSniffer
-from spanalyzer.java.detector import JavaTelemetryDetector as JsDetector
+from spanalyzer.python.script import FunctionSpecs
 
 from spanalyzer.constants.exceptions import ExcludedPaths
 
+# only needed by the annotations, so the runs without self-telemetry don't import the instrumentation
+if TYPE_CHECKING:
+    from spanalyzer.instrumentation import Instrumentation
+
+ParsedScript = namedtuple("ParsedScript", ["script", "source_code", "tree", "lexed"])
+
+# maximum number of scripts handed over to a worker of the process pool at once
+MAX_CHUNKSIZE = 64
+
+# number of chunks in flight per worker of the process pool, so the workers never wait for the next one
+CHUNKS_PER_JOB = 2
+
+
+@dataclass
+class ScriptResult:
+    """
+    Represents the analysis result of a single script.
+
+    Args:
+        script [str]: the path to the script
+        language [str]: the language of the script
+        telemetry [Dict[str, Any]]: for the basic report, whether each telemetry category is used in the
+        script; for the detailed report, the telemetry calls found outside of any function, per category
+        (the empty categories are left out)
+        functions [Optional[Dict[str, Dict]]]: the functions of the script, along with their docstring and
+        the telemetry calls found within them (None for the basic report)
+        error [Optional[str]]: why the analysis of the script was abandoned, if it was ('timeout', 'memory'
+        or 'crashed', see `SupervisedPool`); the telemetry is then empty
+    """
+
+    script: str
+    language: str
+    telemetry: Dict[str, Any]
+    functions: Optional[Dict[str, Dict]] = None
+    error: Optional[str] = None
+
+    def report_entry(self) -> Dict[str, Any]:
+        """
+        Convert the result into the entry of the script in the report.
+
+        Returns:
+            Dict[str, Any]: the report entry of the script
+        """
+
+        if self.error is not None:
+            return {"error": self.error}
+
+        if not self.functions:
+            return dict(self.telemetry)
+
+        return {**self.telemetry, "functions": self.functions}
+
 
 class Engine:
     """
@@ -37,8 +128,36 @@ class Engine:
     Args:
         folder_path [str]: the path to the folder containing the scripts to be analyzed
         report_type [str]: the type of report to be generated (the options are 'basic' and 'detailed')
-        language [str]: the language of the scripts to be analyzed (the options are 'python' and 'java')
+        language [str]: the language of the scripts to be analyzed (the options are 'python', 'java', a
+        comma separated list of both, or 'auto'); when more than one language is analyzed, each script
+        is routed to its language by extension, and the report entries carry their language
         output_path [str]: the path to the output file
+        jobs [Optional[int]]: the number of worker processes to use (defaults to the CPU count)
+        cache_dir [Optional[str]]: the path to the results cache folder (no cache is used if not provided)
+        cache_size [int]: the maximum size of the results cache in bytes
+        since [Optional[str]]: a git reference; when provided, only the scripts that changed since then
+        are analyzed, and the detailed results are merged into the previous report (if there's one)
+        output_format [str]: the format of the detailed report (the options are 'json' and 'jsonl')
+        fast [bool]: whether to skip parsing the scripts that can't contain telemetry calls (see
+        `contains_keywords` for the guarantee that no telemetry call is missed)
+        shard [Optional[Tuple[int, int]]]: the shard to be analyzed and the number of shards (e.g. (1, 4));
+        only the scripts assigned to that shard (see `shard_index`) are analyzed, and the basic report
+        rows are also written into the output file, so the partial reports can be merged later on
+        profile [bool]: whether to measure the wall time and CPU time spent on each phase of the run and on
+        each script, printed once the report is generated (see `Profiler`)
+        profile_top [int]: the number of slowest scripts (and largest allocations) to be printed along with
+        the profile
+        memory [bool]: whether to trace the memory allocations of the run (and of the worker processes), to
+        print the peak memory of each phase of the run, the memory held by the report and the largest
+        allocations holding it, once the report is generated (see `Profiler.memory_summary`)
+        instrumentation [Optional[Instrumentation]]: where the spans and metrics of the run itself are
+        emitted (see `Instrumentation`); the caller is in charge of shutting it down
+        file_timeout [Optional[float]]: the time budget of the analysis of each script in seconds; when
+        provided, the scripts are analyzed by supervised workers (see `SupervisedPool`), and the ones
+        overrunning it are abandoned and reported as such
+        file_memory [Optional[int]]: the maximum memory (address space) of each worker in bytes; when
+        provided, the scripts are analyzed by supervised workers as well, and the ones exhausting it are
+        abandoned and reported as such
     """
 
     def __init__(
@@ -47,17 +166,146 @@ class Engine:
         report_type: str,
         language: str = "python",
         output_path: str = "spanalyzer_report.json",
+        jobs: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        cache_size: int = ResultCache.DEFAULT_MAX_SIZE,
+        since: Optional[str] = None,
+        output_format: str = "json",
+        fast: bool = False,
+        shard: Optional[Tuple[int, int]] = None,
+        profile: bool = False,
+        profile_top: int = 10,
+        memory: bool = False,
+        instrumentation: Optional["Instrumentation"] = None,
+        file_timeout: Optional[float] = None,
+        file_memory: Optional[int] = None,
     ):
         """
         Initialize the engine.
         """
 
+        if (memory or file_memory) and not RESOURCE_AVAILABLE:
+            raise ValueError("The memory accounting and limits are not supported on this platform")
+
         self.folder_path = folder_path
         self.report_type = report_type
         self.language = language
+        self.languages = resolve_languages(language)
         self.output_path = output_path
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache = ResultCache(cache_dir, cache_size) if cache_dir else None
+        self.since = since
+        self.output_format = output_format
+        self.fast = fast
+        self.shard = shard
+        self.profile = profile
+        self.memory = memory
+        self.profiler = Profiler(top=profile_top) if profile or memory else None
+        self.instrumentation = (
+            instrumentation if instrumentation is not None and instrumentation.enabled else None
+        )
+
+        self.file_timeout = file_timeout
+        self.file_memory = file_memory
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.abandoned: List[Tuple[str, str]] = []
+
+        # TODO. validate the report type
+
+    def _is_script(
+        self, path: str, excluded_paths: set[str] = ExcludedPaths.values()
+    ) -> bool:
+        """
+        Check if the path provided is a script that should be analyzed.
+
+        Args:
+            path [str]: the path to be checked
+            excluded_paths [set[str]]: the paths to be excluded from the search
+
+        Returns:
+            [bool]: True if the path is a script of the language under analysis, False otherwise
+        """
+
+        return path.endswith(self._file_extensions()) and not is_excluded(
+            os.path.relpath(path, self.folder_path), excluded_paths
+        )
+
+    def _file_extensions(self) -> Tuple[str, ...]:
+        """
+        Get the file extensions of the scripts of the languages under analysis.
+
+        Returns:
+            [Tuple[str, ...]]: the file extensions
+        """
+
+        return tuple(file_extension(language) for language in self.languages)
+
+    def _script_language(self, script: str) -> str:
+        """
+        Get the language of a script, based on its extension.
+
+        Args:
+            script [str]: the path to the script
+
+        Returns:
+            [str]: the language of the script
+        """
+
+        return next(
+            language
+            for language in self.languages
+            if script.endswith(file_extension(language))
+        )
+
+    def _report_entry(self, script: str, script_report: Dict) -> Dict:
+        """
+        Tag the report entry of a script with its language, when more than one language is analyzed.
+
+        Args:
+            script [str]: the path to the script
+            script_report [Dict]: the report entry of the script
+
+        Returns:
+            [Dict]: the report entry, led by the language of the script if it was tagged
+        """
+
+        if len(self.languages) == 1:
+            return script_report
+
+        return {"language": self._script_language(script), **script_report}
 
-        # TODO. validate the language and report type
+    def _in_shard(self, script: str) -> bool:
+        """
+        Check if the script belongs to the shard under analysis.
+
+        Args:
+            script [str]: the path to the script
+
+        Returns:
+            [bool]: True if the script belongs to the shard (or no shard was provided), False otherwise
+        """
+
+        if self.shard is None:
+            return True
+
+        index, shards_count = self.shard
+
+        return shard_index(os.path.relpath(script, self.folder_path), shards_count) == index
+
+    def _result_entry(self, result: ScriptResult) -> Dict:
+        """
+        Build the report entry of a script out of its result.
+
+        Args:
+            result [ScriptResult]: the result of the script
+
+        Returns:
+            [Dict]: the report entry, led by the language of the script if it was tagged
+        """
+
+        return self._report_entry(result.script, result.report_entry())
 
     def _list_scripts(
         self, folder_path: Path, excluded_paths: set[str] = ExcludedPaths.values()
@@ -65,6 +313,8 @@ class Engine:
         """
         List all the scripts in the folder.
 
+        The excluded folders are pruned without being descended into (see `walk_scripts`).
+
         Args:
             folder_path [Path]: the path to the folder containing the scripts to be analyzed
             excluded_paths [set[str]]: the paths to be excluded from the search
@@ -73,20 +323,55 @@ class Engine:
             [List[str]]: the list of python scripts in the folder
         """
 
-        file_extensions = ".py" if self.language == "python" else ".java"
+        return list(
+            walk_scripts(str(folder_path), self._file_extensions(), excluded_paths)
+        )
 
-        return [
-            os.path.join(root, file)
-            for root, dirs, files in os.walk(folder_path)
-            for file in files
-            if file.endswith(file_extensions)
-            and not any(
-                excluded_path in os.path.join(root, file)
-                for excluded_path in excluded_paths
-            )
+    def _list_changed_scripts(
+        self, folder_path: Path, excluded_paths: set[str] = ExcludedPaths.values()
+    ) -> Tuple[List[str], List[str]]:
+        """
+        List the scripts in the folder that changed since the git reference `since`.
+
+        The paths are built in the same way as the ones produced by `_list_scripts`, so they can be
+        matched against the entries of a previous report.
+
+        Args:
+            folder_path [Path]: the path to the folder containing the scripts to be analyzed
+            excluded_paths [set[str]]: the paths to be excluded from the search
+
+        Returns:
+            [Tuple[List[str], List[str]]]: the scripts that were added or modified, and the scripts that
+            were deleted (or renamed into a different path)
+        """
+
+        real_folder_path = os.path.realpath(folder_path)
+
+        def to_script_path(path: str) -> Optional[str]:
+            relative_path = os.path.relpath(os.path.realpath(path), real_folder_path)
+
+            if relative_path.startswith(os.pardir + os.sep):
+                return None
+
+            script = os.path.join(folder_path, relative_path)
+
+            return script if self._is_script(script, excluded_paths) else None
+
+        changed, deleted = changed_files(str(folder_path), self.since)
+
+        changed_scripts = [
+            script
+            for script in map(to_script_path, changed)
+            if script is not None and os.path.isfile(script)
+        ]
+        deleted_scripts = [
+            script for script in map(to_script_path, deleted) if script is not None
         ]
 
-    def _has_telemetry_attrs(self, data: Dict) -> Dict:
+        return changed_scripts, deleted_scripts
+
+    @staticmethod
+    def _has_telemetry_attrs(data: Dict) -> Dict:
         """
         Check if the telemetry attributes are empty.
 
@@ -118,6 +403,304 @@ class Engine:
 
         return {key: True if len(val) > 0 else False for key, val in data.items()}
 
+    def _map_scripts(self, scripts_lst: List[str]) -> Iterator[Optional[Dict]]:
+        """
+        Analyze the scripts, fanning the work out to a process pool when more than one job is allowed.
+
+        The results are yielded in the same order as the scripts provided, regardless of the order in
+        which the workers finish, so the report is the same as the one produced by a serial run.
+
+        Args:
+            scripts_lst [List[str]]: the list of scripts to be analyzed
+
+        Returns:
+            [Iterator[Optional[Dict]]]: the report entry of each script (None if it couldn't be processed)
+        """
+
+        profiled = self.profiler is not None or self.instrumentation is not None
+        worker = (
+            partial(_profile_script, cache=self.cache, fast=self.fast, memory=self.memory)
+            if profiled
+            else partial(_analyze_script, cache=self.cache, fast=self.fast)
+        )
+        languages_lst = [self._script_language(script) for script in scripts_lst]
+
+        # a parse can't be interrupted from within, so the scripts are analyzed by workers that can be killed
+        if self.file_timeout or self.file_memory:
+            # imported here since the supervision machinery is only needed along with these options
+            from spanalyzer.supervisor import Abandoned
+            from spanalyzer.supervisor import SupervisedPool
+
+            with SupervisedPool(
+                worker, workers=self.jobs, timeout=self.file_timeout, memory_limit=self.file_memory
+            ) as pool:
+                yield from self._tally_cache(
+                    (
+                        ({"error": result.reason}, None) if isinstance(result, Abandoned) else result
+                        for result in pool.map(scripts_lst, repeat(self.report_type), languages_lst)
+                    ),
+                    languages_lst,
+                )
+            return
+
+        if self.jobs <= 1 or len(scripts_lst) <= 1:
+            yield from self._tally_cache(
+                map(worker, scripts_lst, repeat(self.report_type), languages_lst),
+                languages_lst,
+            )
+            return
+
+        # imported here since the process pool machinery is not needed by serial runs
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = min(MAX_CHUNKSIZE, max(1, len(scripts_lst) // (self.jobs * 4)))
+        chunks = (
+            (scripts_lst[start : start + chunksize], languages_lst[start : start + chunksize])
+            for start in range(0, len(scripts_lst), chunksize)
+        )
+
+        # unlike `executor.map`, which submits every script at once, only a few chunks per worker are in
+        # flight at any time, so the results waiting to be consumed don't grow with the codebase
+        def results() -> Iterator[Tuple]:
+            pending = deque()
+
+            for chunk_scripts, chunk_languages in chunks:
+                pending.append(
+                    executor.submit(
+                        _analyze_chunk, worker, chunk_scripts, self.report_type, chunk_languages
+                    )
+                )
+
+                if len(pending) >= self.jobs * CHUNKS_PER_JOB:
+                    yield from pending.popleft().result()
+
+            while pending:
+                yield from pending.popleft().result()
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            yield from self._tally_cache(results(), languages_lst)
+
+    def _tally_cache(
+        self,
+        results: Iterator[Tuple[Optional[Dict], Optional[bool]]],
+        languages_lst: List[str],
+    ) -> Iterator[Optional[Dict]]:
+        """
+        Tally the cache hits and misses of the results, while passing the report entries through.
+
+        When profiling (or instrumenting), the results also carry the profile of their script, which is
+        handed to the profiler (and recorded by the instrumentation).
+
+        Args:
+            results [Iterator[Tuple[Optional[Dict], Optional[bool]]]]: the report entries along with
+            whether they were a cache hit (and the profile of the script, when profiling)
+            languages_lst [List[str]]: the language of each script
+
+        Returns:
+            [Iterator[Optional[Dict]]]: the report entries
+        """
+
+        for (script_report, cache_hit, *profile), language in zip(results, languages_lst):
+            if profile and self.profiler is not None:
+                self.profiler.record(profile[0])
+
+            if profile and self.instrumentation is not None:
+                self.instrumentation.record_script(
+                    profile[0], language, failed=script_report is None, cache_hit=cache_hit
+                )
+
+            if cache_hit is not None:
+                self.cache_hits += cache_hit
+                self.cache_misses += not cache_hit
+
+            yield script_report
+
+    def _cache_summary(self):
+        """
+        Print the cache hits and misses of the run.
+        """
+
+        if self.cache is None:
+            return
+
+        print(f"[i] Cache: {self.cache_hits} hits, {self.cache_misses} misses")
+
+    def _abandoned_summary(self):
+        """
+        Print the scripts whose analysis was abandoned during the run, along with why.
+        """
+
+        if not self.abandoned:
+            return
+
+        print(f"[!] Abandoned {len(self.abandoned)} scripts (see --file-timeout and --file-memory):")
+
+        for script, error in self.abandoned:
+            print(f"    {script}: {error}")
+
+    def _phase(self, name: str, span: bool = True) -> ContextManager[None]:
+        """
+        Measure a phase of the run, if it's being profiled, and trace it, if it's being instrumented.
+
+        Args:
+            name [str]: the name of the phase
+            span [bool]: whether the phase is traced (the phases repeated for every script are not)
+
+        Returns:
+            [ContextManager[None]]: the context manager measuring the phase
+        """
+
+        contexts = []
+
+        if self.profiler is not None:
+            contexts.append(self.profiler.phase(name))
+
+        if span and self.instrumentation is not None:
+            contexts.append(self.instrumentation.span(name))
+
+        return _nested(contexts) if contexts else NO_PHASE
+
+    def _scripts(self) -> Tuple[List[str], List[str]]:
+        """
+        List the scripts to be analyzed, taking the `since` and `shard` options into account.
+
+        Returns:
+            [Tuple[List[str], List[str]]]: the scripts to be analyzed, and the scripts deleted since the git
+            reference `since` (to be dropped from the previous report)
+        """
+
+        if self.since:
+            scripts_lst, deleted_lst = self._list_changed_scripts(self.folder_path)
+        else:
+            scripts_lst, deleted_lst = self._list_scripts(self.folder_path), []
+
+        if self.shard:
+            scripts_lst = [script for script in scripts_lst if self._in_shard(script)]
+            deleted_lst = [script for script in deleted_lst if self._in_shard(script)]
+
+        return scripts_lst, deleted_lst
+
+    def _iter_results(self, scripts_lst: List[str]) -> Iterator[ScriptResult]:
+        """
+        Analyze the scripts provided, yielding the result of each one of them as soon as it's available.
+
+        The scripts that couldn't be processed are left out. Once every script is analyzed, the stale cache
+        entries are evicted.
+
+        Args:
+            scripts_lst [List[str]]: the list of scripts to be analyzed
+
+        Returns:
+            [Iterator[ScriptResult]]: the result of each script, in the order of the scripts provided
+        """
+
+        if self.report_type not in ("basic", "detailed"):
+            raise ValueError(f"Invalid report type: {self.report_type}")
+
+        for script, script_report in zip(scripts_lst, self._map_scripts(scripts_lst)):
+            if script_report is None:
+                continue
+
+            language = self._script_language(script)
+
+            if "error" in script_report:
+                self.abandoned.append((script, script_report["error"]))
+                yield ScriptResult(
+                    script=script, language=language, telemetry={}, error=script_report["error"]
+                )
+            elif self.report_type == "basic":
+                yield ScriptResult(script=script, language=language, telemetry=script_report)
+            else:
+                yield ScriptResult(
+                    script=script,
+                    language=language,
+                    telemetry={
+                        key: value for key, value in script_report.items() if key != "functions"
+                    },
+                    functions=script_report.get("functions", {}),
+                )
+
+        if self.cache is not None and self.cache_misses:
+            self.cache.prune()
+
+    def iter_results(self) -> Iterator[ScriptResult]:
+        """
+        Analyze the folder, yielding the result of each script one at a time.
+
+        This is the library counterpart of `run`: nothing is printed nor written, and the results are
+        yielded as soon as they're available, so the callers can stream, filter or aggregate the results
+        of codebases of any size. A single result is held at once by a serial run; when more than one
+        job is used, no more than `CHUNKS_PER_JOB` chunks (of up to `MAX_CHUNKSIZE` scripts) per job are
+        in flight. The scripts are analyzed in the same order (and with the same `since`, `shard`, `jobs`,
+        `cache`, `fast`, `file_timeout` and `file_memory` options) as in `run`. The scripts that couldn't
+        be processed are left out, while the ones abandoned by the supervised workers are yielded with
+        their `error` (and no telemetry).
+
+        Returns:
+            [Iterator[ScriptResult]]: the result of each script
+
+        _Example_:
+        >>> for result in Engine('path/to/codebase', 'basic').iter_results():
+        ...     if not any(result.telemetry.values()):
+        ...         print(result.script)
+        path/to/codebase/script_3.py
+        """
+
+        scripts_lst, _ = self._scripts()
+
+        yield from self._iter_results(scripts_lst)
+
+    def _write_jsonl_report(self, scripts_lst: List[str], deleted_lst: List[str]):
+        """
+        Stream the detailed report into a jsonl file, one record per script.
+
+        Each record is written as soon as its script is processed, so the report is never held in memory.
+
+        When `since` is provided, the fresh records (only the changed scripts) are merged into the previous
+        report instead: the previous records are streamed into a temporary file, replacing the ones of the
+        changed scripts and dropping the ones of the deleted scripts, which then takes the place of the report.
+        The records are kept in the same order as the one of a full run.
+
+        Args:
+            scripts_lst [List[str]]: the list of scripts to be analyzed
+            deleted_lst [List[str]]: the list of scripts to be dropped from the previous report
+        """
+
+        if not self.since or not os.path.isfile(self.output_path):
+            with JsonlWriter(self.output_path) as writer:
+                for result in self._iter_results(scripts_lst):
+                    with self._phase("write", span=False):
+                        writer.write({"script": result.script, **self._result_entry(result)})
+
+            return
+
+        fresh_records = {
+            result.script: {"script": result.script, **self._result_entry(result)}
+            for result in self._iter_results(scripts_lst)
+        }
+        stale_scripts = set(scripts_lst) | set(deleted_lst)
+        temp_path = f"{self.output_path}.tmp"
+
+        previous_records = (
+            record
+            for record in iter_jsonl(self.output_path)
+            if record["script"] not in stale_scripts
+        )
+        sorted_fresh_records = (
+            fresh_records[script]
+            for script in sorted(fresh_records, key=script_sort_key)
+        )
+
+        with self._phase("write"), JsonlWriter(temp_path) as writer:
+            for record in heapq.merge(
+                previous_records,
+                sorted_fresh_records,
+                key=lambda record: script_sort_key(record["script"]),
+            ):
+                writer.write(record)
+
+        os.replace(temp_path, self.output_path)
+
     def run(self):
         """
         Spanalyzer engine.
@@ -129,64 +712,473 @@ class Engine:
         4. Sniff function definitions;
         5. Conciliate results;
         6. Generate the report.
+
+        Steps 2 to 5 are executed per script and distributed across `jobs` worker processes.
+
+        When `since` is provided, only the scripts that changed since that git reference are analyzed, and
+        the detailed results are merged into the previous report found at the output path.
+
+        When `shard` is provided, only the scripts of that shard are analyzed (see `spanalyzer.merge` to
+        put the partial reports back together).
+
+        The report is built out of the results yielded by `iter_results`.
+
+        When `profile` is provided, the time spent on each of these steps is printed at the end (and the
+        memory, when `memory` is provided).
+
+        When `file_timeout` (or `file_memory`) is provided, the scripts overrunning it are abandoned rather
+        than stalling the run: they're reported with the reason why, and listed at the end.
         """
-        
-        telemetry_report = [] if self.report_type == "basic" else {}
-        scripts_lst = self._list_scripts(self.folder_path)
 
-        detector_class = JsDetector if self.language == "java" else PyDetector
-        sniffer_class = JsSniffer if self.language == "java" else PySniffer
-        parser_func = (
-            lambda path: javalang.parse.parse(open(path).read())
-            if self.language == "java"
-            else ast.parse(open(path).read())
-        )
+        # tracing the allocations slows the run down, so it's only done for the runs that ask for it
+        tracing = self.memory and not tracemalloc.is_tracing()
+
+        if tracing:
+            tracemalloc.start()
+
+        try:
+            with (
+                self.profiler.measure() if self.profiler is not None else NO_PHASE,
+                self.instrumentation.span(
+                    "run",
+                    {"report_type": self.report_type, "language": self.language, "jobs": self.jobs},
+                )
+                if self.instrumentation is not None
+                else NO_PHASE,
+            ):
+                self._run()
+
+            self._cache_summary()
+            self._abandoned_summary()
+
+            if self.profile:
+                print(self.profiler.summary())
+
+            if self.memory:
+                print(self.profiler.memory_summary())
+
+        finally:
+            if tracing:
+                tracemalloc.stop()
+
+    def _run(self):
+        """
+        Generate the report (see `run`).
+        """
+
+        with self._phase("list"):
+            scripts_lst, deleted_lst = self._scripts()
 
         match self.report_type:
             case "basic":
-                for script in scripts_lst:
-                    try:
-                        script_code = parser_func(script)
-                        detector = detector_class()
-                        telemetry = self._has_telemetry_attrs(detector.run(script_code))
+                # the abandoned scripts are left out of the table (they're listed underneath it instead)
+                telemetry_report = [
+                    {"script": result.script, **self._result_entry(result)}
+                    for result in self._iter_results(scripts_lst)
+                    if result.error is None
+                ]
 
-                        telemetry_report.append({
-                            "script": script,
-                            **telemetry
-                        })
+                if self.profiler is not None:
+                    self.profiler.take_snapshot()
 
-                    except Exception as e:
-                        # TODO. find out later how to handle this
-                        # print(f"[!] Error parsing script {script}: {e}")
-                        continue
+                with self._phase("write"):
+                    print(terminal_report(folder_trim(telemetry_report)))
 
-                print(terminal_report(folder_trim(telemetry_report)))
+                    # the paths are trimmed by the merge, once the rows of every shard are put together
+                    if self.shard:
+                        write_json(telemetry_report, self.output_path)
+
+            case "detailed" if self.output_format == "jsonl":
+                self._write_jsonl_report(scripts_lst, deleted_lst)
 
             case "detailed":
-                for script in scripts_lst:
-                    try:
-                        script_code = parser_func(script)
-                        detector = detector_class()
-                        detector_output = detector.run(script_code)
+                telemetry_report = (
+                    read_json(self.output_path)
+                    if self.since and os.path.isfile(self.output_path)
+                    else {}
+                )
 
-                        # Build telemetry entries
-                        telemetry_data = {
-                            key: [attr.__dict__() for attr in val]
-                            for key, val in detector_output.items()
-                        }
+                # the scripts analyzed again (or that can't be processed anymore) and the deleted ones
+                # are dropped from the previous report
+                for script in scripts_lst + deleted_lst:
+                    telemetry_report.pop(script, None)
 
-                        sniffer = sniffer_class(script)
-                        sniffer.run()
-                        script_data = sniffer.functions_list
+                for result in self._iter_results(scripts_lst):
+                    telemetry_report[result.script] = self._result_entry(result)
 
-                        telemetry_report[script] = conciliation(script_data, telemetry_data)
+                if self.since:
+                    telemetry_report = dict(
+                        sorted(
+                            telemetry_report.items(),
+                            key=lambda item: script_sort_key(item[0]),
+                        )
+                    )
 
-                    except Exception as e:
-                        # TODO. find out later how to handle this
-                        # print(f"[!] Error processing script {script}: {e}")
-                        continue
+                if self.profiler is not None:
+                    self.profiler.take_snapshot()
 
-                write_json(telemetry_report, self.output_path)
+                with self._phase("write"):
+                    write_json(telemetry_report, self.output_path)
 
             case _:
-                raise ValueError(f"Invalid report type: {self.report_type}")
\ No newline at end of file
+                raise ValueError(f"Invalid report type: {self.report_type}")
+
+
+@contextmanager
+def _nested(contexts: List[ContextManager[Any]]) -> Iterator[None]:
+    """
+    Enter several context managers at once, in the order provided.
+
+    Args:
+        contexts [List[ContextManager[Any]]]: the context managers
+    """
+
+    with ExitStack() as stack:
+        for context in contexts:
+            stack.enter_context(context)
+
+        yield
+
+
+def _read_script(script: str) -> str:
+    """
+    Read the content of the script.
+
+    Args:
+        script [str]: the path to the script to be read
+
+    Returns:
+        [str]: the source code of the script
+    """
+
+    with open(script, "r") as file:
+        return file.read()
+
+
+def _parse_script(
+    script: str, language: str, source_code: Optional[str] = None, fast: bool = False
+) -> ParsedScript:
+    """
+    Read and parse the script into the AST of the language provided.
+
+    This is the only place where a script is tokenized and parsed; the source buffer, the tokens and
+    the tree are then shared by the detector and the sniffer.
+
+    Args:
+        script [str]: the path to the script to be parsed
+        language [str]: the language of the script (the options are 'python' and 'java')
+        source_code [Optional[str]]: the content of the script, if it was already read
+        fast [bool]: whether to leave out of the parse the parts of the script that can't contain any
+        telemetry call (only supported by some backends, see their `parse`)
+
+    Returns:
+        [ParsedScript]: the path, the source code, the parsed tree and the tokens of the script
+    """
+
+    if source_code is None:
+        source_code = _read_script(script)
+
+    backend = load_backend(language)
+    lexed = backend.tokenize(source_code)
+    tree = backend.parse(source_code, lexed, fast=fast)
+
+    return ParsedScript(script=script, source_code=source_code, tree=tree, lexed=lexed)
+
+
+def _build_sniffer(parsed_script: ParsedScript, language: str):
+    """
+    Build the sniffer of the language provided on top of an already read script.
+
+    Args:
+        parsed_script [ParsedScript]: the script already read and parsed
+        language [str]: the language of the script (the options are 'python' and 'java')
+
+    Returns:
+        the sniffer for the script
+    """
+
+    return load_backend(language).build_sniffer(
+        parsed_script.script,
+        source_code=parsed_script.source_code,
+        lexed=parsed_script.lexed,
+    )
+
+
+def _telemetry_keywords(language: str) -> FrozenSet[str]:
+    """
+    Get the telemetry keywords of the language provided.
+
+    Args:
+        language [str]: the language of the script (the options are 'python' and 'java')
+
+    Returns:
+        [FrozenSet[str]]: the telemetry keywords
+    """
+
+    return frozenset(load_backend(language).Keywords.values())
+
+
+def _no_telemetry(language: str) -> Dict[str, List[Dict]]:
+    """
+    Get the detector output of a script without any telemetry call.
+
+    Args:
+        language [str]: the language of the script (the options are 'python' and 'java')
+
+    Returns:
+        [Dict[str, List[Dict]]]: the empty telemetry calls per category
+    """
+
+    return load_backend(language).Keywords.get_attributes_structure()
+
+
+def _detect(parsed_script: ParsedScript, language: str) -> Dict[str, List[Dict]]:
+    """
+    Detect the telemetry calls of the script.
+
+    Args:
+        parsed_script [ParsedScript]: the script already read and parsed
+        language [str]: the language of the script (the options are 'python' and 'java')
+
+    Returns:
+        [Dict[str, List[Dict]]]: the telemetry calls found per category
+    """
+
+    detector_output = load_backend(language).Detector().run(parsed_script.tree)
+
+    return {
+        key: [attr.__dict__() for attr in val]
+        for key, val in detector_output.items()
+    }
+
+
+def _detect_presence(parsed_script: ParsedScript, language: str) -> List[str]:
+    """
+    Detect which telemetry categories are used in the script, as needed by the basic report.
+
+    Args:
+        parsed_script [ParsedScript]: the script already read and parsed
+        language [str]: the language of the script (the options are 'python' and 'java')
+
+    Returns:
+        [List[str]]: the telemetry categories used in the script, sorted
+    """
+
+    return sorted(load_backend(language).Detector().run_presence(parsed_script.tree))
+
+
+def _presence_attrs(presence: List[str], language: str) -> Dict:
+    """
+    Build the basic report entry out of the telemetry categories used in the script.
+
+    Args:
+        presence [List[str]]: the telemetry categories used in the script
+        language [str]: the language of the script (the options are 'python' and 'java')
+
+    Returns:
+        [Dict]: whether each telemetry category is present in the script
+    """
+
+    return {key: key in presence for key in _no_telemetry(language)}
+
+
+def _sniff(parsed_script: ParsedScript, language: str) -> List[FunctionSpecs]:
+    """
+    Sniff the function definitions of the script.
+
+    Args:
+        parsed_script [ParsedScript]: the script already read and parsed
+        language [str]: the language of the script (the options are 'python' and 'java')
+
+    Returns:
+        [List[FunctionSpecs]]: the functions defined in the script
+    """
+
+    sniffer = _build_sniffer(parsed_script, language)
+    sniffer.run(parsed_script.tree)
+
+    return sniffer.functions_list
+
+
+def _analyze_script(
+    script: str,
+    report_type: str,
+    language: str,
+    cache: Optional[ResultCache] = None,
+    fast: bool = False,
+    profile: Optional[ScriptProfile] = None,
+) -> Tuple[Optional[Dict], Optional[bool]]:
+    """
+    Analyze a single script.
+
+    This is the unit of work handed over to the process pool, hence being defined at module level
+    (so that it can be pickled).
+
+    When a cache is provided, the script is only parsed if there's no entry for its content yet;
+    otherwise, the detector and sniffer outputs stored in the cache are used instead.
+
+    For the basic report, the detector only looks for the telemetry categories used in the script (see
+    `run_presence` in the detectors), so the calls found are neither captured nor stored.
+
+    In fast mode, the raw script is firstly scanned for the telemetry keywords: when none shows up, the
+    script is reported without any telemetry straight away for the basic report, while for the detailed
+    report only the sniffer runs (the function definitions are still needed). The java method bodies
+    without telemetry keywords are also left out of the parse.
+
+    Args:
+        script [str]: the path to the script to be analyzed
+        report_type [str]: the type of report being generated (the options are 'basic' and 'detailed')
+        language [str]: the language of the script (the options are 'python' and 'java')
+        cache [Optional[ResultCache]]: the cache of the analysis results
+        fast [bool]: whether to skip the scripts without any telemetry keyword
+        profile [Optional[ScriptProfile]]: the profile where the time spent on each phase is recorded (the
+        phases are not measured if not provided)
+
+    Returns:
+        [Tuple[Optional[Dict], Optional[bool]]]: the report entry of the script (None if the script
+        couldn't be processed), and whether it was a cache hit (None if no cache is used)
+    """
+
+    with phase(profile, "scan") if fast else NO_PHASE:
+        has_telemetry = not fast or contains_keywords(script, _telemetry_keywords(language))
+
+    if not has_telemetry and report_type == "basic":
+        return Engine._has_telemetry_attrs(_no_telemetry(language)), None
+
+    try:
+        with phase(profile, "read"):
+            source_code = _read_script(script)
+    except Exception:
+        return None, None
+
+    if profile is not None:
+        profile.bytes_read = os.path.getsize(script)
+
+    with phase(profile, "cache") if cache else NO_PHASE:
+        cache_key = ResultCache.key(source_code, language) if cache else None
+        entry = cache.get(cache_key) if cache else None
+
+    cache_hit = (
+        entry is not None
+        and (report_type == "basic" or "functions" in entry or "failed" in entry)
+    )
+
+    if not cache_hit:
+        entry = {}
+
+        try:
+            with phase(profile, "parse"):
+                parsed_script = _parse_script(script, language, source_code, fast=fast)
+
+            # the basic report only needs to know which categories are used in the script
+            with phase(profile, "detect"):
+                if report_type == "basic":
+                    entry["presence"] = (
+                        _detect_presence(parsed_script, language) if has_telemetry else []
+                    )
+                else:
+                    entry["telemetry"] = (
+                        _detect(parsed_script, language)
+                        if has_telemetry
+                        else _no_telemetry(language)
+                    )
+
+            if report_type == "detailed":
+                with phase(profile, "sniff"):
+                    entry["functions"] = [
+                        list(func) for func in _sniff(parsed_script, language)
+                    ]
+
+        except MemoryError:
+            # running out of memory says nothing about the script itself, so it's not cached as a failure
+            raise
+
+        except Exception as e:
+            # TODO. find out later how to handle this
+            # print(f"[!] Error processing script {script}: {e}")
+            if "telemetry" not in entry and "presence" not in entry:
+                entry["failed"] = True
+
+        if cache:
+            with phase(profile, "cache"):
+                cache.set(cache_key, entry)
+
+    cache_hit = cache_hit if cache else None
+
+    if entry.get("failed") or (report_type == "detailed" and "functions" not in entry):
+        return None, cache_hit
+
+    if report_type == "basic":
+        return (
+            Engine._has_telemetry_attrs(entry["telemetry"])
+            if "telemetry" in entry
+            else _presence_attrs(entry["presence"], language)
+        ), cache_hit
+
+    try:
+        with phase(profile, "conciliate"):
+            functions_lst = [FunctionSpecs(*func) for func in entry["functions"]]
+            return conciliation(functions_lst, entry["telemetry"]), cache_hit
+
+    except Exception:
+        return None, cache_hit
+
+
+def _analyze_chunk(
+    worker: Callable[..., Tuple], scripts_lst: List[str], report_type: str, languages_lst: List[str]
+) -> List[Tuple]:
+    """
+    Analyze a chunk of scripts, as a single unit of work of the process pool.
+
+    Args:
+        worker [Callable[..., Tuple]]: the function analyzing each script (see `_analyze_script`)
+        scripts_lst [List[str]]: the scripts of the chunk
+        report_type [str]: the type of report being generated (the options are 'basic' and 'detailed')
+        languages_lst [List[str]]: the language of each script
+
+    Returns:
+        [List[Tuple]]: the result of each script, in the order of the chunk
+    """
+
+    return [worker(script, report_type, language) for script, language in zip(scripts_lst, languages_lst)]
+
+
+def _profile_script(
+    script: str,
+    report_type: str,
+    language: str,
+    cache: Optional[ResultCache] = None,
+    fast: bool = False,
+    memory: bool = False,
+) -> Tuple[Optional[Dict], Optional[bool], ScriptProfile]:
+    """
+    Analyze a single script, measuring the time spent on it (see `_analyze_script`).
+
+    Just like `_analyze_script`, this is a unit of work of the process pool, so the profile of the script
+    is measured by the process analyzing it and handed back along with its result. When the memory is
+    measured, the worker processes start tracing their allocations along with their first script.
+
+    Args:
+        script [str]: the path to the script to be analyzed
+        report_type [str]: the type of report being generated (the options are 'basic' and 'detailed')
+        language [str]: the language of the script (the options are 'python' and 'java')
+        cache [Optional[ResultCache]]: the cache of the analysis results
+        fast [bool]: whether to skip the scripts without any telemetry keyword
+        memory [bool]: whether to measure the peak of memory of each phase as well
+
+    Returns:
+        [Tuple[Optional[Dict], Optional[bool], ScriptProfile]]: the report entry of the script, whether it
+        was a cache hit, and the time spent on each phase of its analysis
+    """
+
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    profile = ScriptProfile(script)
+
+    with profile.measure():
+        script_report, cache_hit = _analyze_script(
+            script, report_type, language, cache=cache, fast=fast, profile=profile
+        )
+
+    return script_report, cache_hit, profile
@@ -0,0 +1,201 @@
+# Script containing the self-instrumentation of the spanalyzer, which emits its own OpenTelemetry spans and
+# metrics when the OpenTelemetry SDK is installed (and does nothing otherwise).
+
+import sys
+
+from importlib.util import find_spec
+
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import ContextManager
+
+from spanalyzer.profiling import NO_PHASE
+from spanalyzer.profiling import ScriptProfile
+
+# the sdk is only looked up here, and imported along with the first instrumentation, so the runs without one
+# (and their worker processes) don't pay for its import
+try:
+    OTEL_AVAILABLE = find_spec("opentelemetry.sdk") is not None
+except ImportError:
+    OTEL_AVAILABLE = False
+
+# prefix of the names of the spans and metrics emitted
+PREFIX = "spanalyzer"
+
+
+class Instrumentation:
+    """
+    Class emitting the spans and metrics of the spanalyzer runs.
+
+    Each run is traced as a `spanalyzer.run` span, with a child span per phase of the run (e.g. listing the
+    scripts, writing the report) and per script analyzed, the latter having a child span per phase of its
+    analysis (e.g. parsing, detecting, sniffing). The scripts are analyzed by the worker processes, so their
+    spans are rebuilt out of their profile (see `ScriptProfile`) once their results reach the main process.
+
+    Along with the spans, the following counters are recorded (per language):
+    - spanalyzer.files: the scripts analyzed;
+    - spanalyzer.bytes_read: the bytes of the scripts read;
+    - spanalyzer.parse_failures: the scripts that couldn't be read or parsed;
+    - spanalyzer.cache_hits: the scripts whose results were found in the cache.
+
+    The spans and metrics are exported as json, either into the console (stderr, so they don't get mixed
+    with the basic report) or into a local file (one span or metrics export per line), to be loaded into any
+    other tooling. When the OpenTelemetry SDK is not installed, nothing is recorded nor exported.
+
+    Args:
+        target [str]: where the spans and metrics are exported ('console' or the path to a file)
+    """
+
+    def __init__(self, target: str = "console"):
+        self.target = target
+        self.enabled = OTEL_AVAILABLE
+        self._stream = None
+
+        if not self.enabled:
+            return
+
+        from opentelemetry import trace
+
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import ConsoleMetricExporter
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+
+        self._trace = trace
+
+        if target == "console":
+            self._stream = sys.stderr
+            span_exporter = ConsoleSpanExporter(out=self._stream)
+            metric_exporter = ConsoleMetricExporter(out=self._stream)
+        else:
+            self._stream = open(target, "w")
+            span_exporter = ConsoleSpanExporter(
+                out=self._stream, formatter=lambda span: span.to_json(indent=None) + "\n"
+            )
+            metric_exporter = ConsoleMetricExporter(
+                out=self._stream, formatter=lambda metrics: metrics.to_json(indent=None) + "\n"
+            )
+
+        resource = Resource.create({"service.name": PREFIX})
+
+        # the providers are kept to the spanalyzer, rather than set globally, so the ones of an application
+        # using the spanalyzer as a library are left alone
+        self._tracer_provider = TracerProvider(resource=resource)
+        self._tracer_provider.add_span_processor(BatchSpanProcessor(span_exporter))
+
+        # the metrics are only exported once, at shutdown (see `shutdown`)
+        self._meter_provider = MeterProvider(
+            resource=resource,
+            metric_readers=[
+                PeriodicExportingMetricReader(metric_exporter, export_interval_millis=float("inf"))
+            ],
+        )
+
+        self.tracer = self._tracer_provider.get_tracer(PREFIX)
+        meter = self._meter_provider.get_meter(PREFIX)
+
+        self.files = meter.create_counter(
+            f"{PREFIX}.files", unit="{file}", description="Scripts analyzed"
+        )
+        self.bytes_read = meter.create_counter(
+            f"{PREFIX}.bytes_read", unit="By", description="Bytes of the scripts read"
+        )
+        self.parse_failures = meter.create_counter(
+            f"{PREFIX}.parse_failures", unit="{file}", description="Scripts that couldn't be read or parsed"
+        )
+        self.cache_hits = meter.create_counter(
+            f"{PREFIX}.cache_hits", unit="{file}", description="Scripts whose results were found in the cache"
+        )
+
+    def span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> ContextManager[Any]:
+        """
+        Trace a phase of the run as a span, child of the current one.
+
+        Args:
+            name [str]: the name of the phase (prefixed with 'spanalyzer.')
+            attributes [Optional[Dict[str, Any]]]: the attributes of the span
+
+        Returns:
+            [ContextManager[Any]]: the context manager tracing the phase
+        """
+
+        if not self.enabled:
+            return NO_PHASE
+
+        return self.tracer.start_as_current_span(f"{PREFIX}.{name}", attributes=attributes)
+
+    def record_script(
+        self,
+        profile: ScriptProfile,
+        language: str,
+        failed: bool,
+        cache_hit: Optional[bool],
+    ):
+        """
+        Record the analysis of a script, as a span (with a child span per phase) and on the counters.
+
+        Args:
+            profile [ScriptProfile]: the profile of the script
+            language [str]: the language of the script
+            failed [bool]: whether the script couldn't be processed
+            cache_hit [Optional[bool]]: whether the results of the script were found in the cache (None if
+            no cache is used)
+        """
+
+        if not self.enabled:
+            return
+
+        attributes = {"language": language}
+
+        self.files.add(1, attributes)
+        self.bytes_read.add(profile.bytes_read, attributes)
+
+        if failed:
+            self.parse_failures.add(1, attributes)
+
+        if cache_hit:
+            self.cache_hits.add(1, attributes)
+
+        # the interval of the whole script is the last one to be closed
+        *phases, (_, start, end) = profile.intervals
+
+        script_span = self.tracer.start_span(
+            f"{PREFIX}.script",
+            attributes={
+                "script": profile.script,
+                "language": language,
+                "bytes_read": profile.bytes_read,
+                "failed": failed,
+                **({"cache_hit": cache_hit} if cache_hit is not None else {}),
+            },
+            start_time=start,
+        )
+        script_context = self._trace.set_span_in_context(script_span)
+
+        for name, phase_start, phase_end in phases:
+            self.tracer.start_span(
+                f"{PREFIX}.{name}", context=script_context, start_time=phase_start
+            ).end(end_time=phase_end)
+
+        script_span.end(end_time=end)
+
+    def shutdown(self):
+        """
+        Export whatever spans and metrics are left, and close the output file (if any).
+        """
+
+        if not self.enabled:
+            return
+
+        self._tracer_provider.shutdown()
+
+        # the metrics are not collected periodically, so they must be collected before shutting down
+        self._meter_provider.force_flush()
+        self._meter_provider.shutdown()
+
+        if self._stream is not sys.stderr:
+            self._stream.close()
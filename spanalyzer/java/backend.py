@@ -0,0 +1,70 @@
+# Java backend of the engine (see `spanalyzer.backends`)
+
+from typing import Any
+from typing import Optional
+
+from spanalyzer.java.script import JavaScriptSniffer
+from spanalyzer.java.detector import JavaTelemetryDetector as Detector
+from spanalyzer.java.tokenizer import LexedSource
+from spanalyzer.java.tokenizer import parse_tokens
+from spanalyzer.java.tokenizer import elide_method_bodies
+from spanalyzer.java.tokenizer import tokenize as _tokenize
+from spanalyzer.java.constants.keywords import JavaTelemetryKeywords as Keywords
+
+
+def tokenize(source_code: str) -> LexedSource:
+    """
+    Tokenize the source code of a java script, once for both the parser and the sniffer.
+
+    Args:
+        source_code [str]: the content of the script
+
+    Returns:
+        [LexedSource]: the tokens and comments of the script
+    """
+
+    return _tokenize(source_code)
+
+
+def parse(source_code: str, lexed: Optional[LexedSource] = None, fast: bool = False) -> Any:
+    """
+    Parse the source code of a java script.
+
+    In fast mode, the method bodies that can't contain any telemetry call are left out of the parse (see
+    `elide_method_bodies`), which doesn't change the telemetry calls nor the methods found in the tree.
+
+    Args:
+        source_code [str]: the content of the script
+        lexed [Optional[LexedSource]]: the tokens of the script, if it was already tokenized
+        fast [bool]: whether to leave out the method bodies without telemetry keywords
+
+    Returns:
+        [Any]: the parsed tree (a javalang compilation unit)
+    """
+
+    if lexed is None:
+        lexed = tokenize(source_code)
+
+    tokens = (
+        elide_method_bodies(lexed.tokens, Keywords.values()) if fast else lexed.tokens
+    )
+
+    return parse_tokens(tokens)
+
+
+def build_sniffer(
+    script: str, source_code: Optional[str] = None, lexed: Optional[LexedSource] = None
+) -> JavaScriptSniffer:
+    """
+    Build the sniffer of a java script.
+
+    Args:
+        script [str]: the path to the script
+        source_code [Optional[str]]: the content of the script, if it was already read
+        lexed [Optional[LexedSource]]: the tokens and comments of the script, if it was already tokenized
+
+    Returns:
+        [JavaScriptSniffer]: the sniffer for the script
+    """
+
+    return JavaScriptSniffer(script, source_code=source_code, lexed=lexed)
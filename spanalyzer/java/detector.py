@@ -1,6 +1,7 @@
 # Script containing the logic behind the java script feature extraction
 
 from typing import Any
+from typing import Set
 from typing import Dict
 from typing import Optional
 
@@ -54,6 +55,15 @@ class JavaTelemetryDetector:
             JavaTelemetryKeywords.ADD_EVENTS,
         }
 
+        # category filled in by each telemetry call
+        self.categories: Dict[str, str] = {
+            **{operation.value: "tracers" for operation in self.tracer_operations},
+            **{operation.value: "spans" for operation in self.span_operations},
+            **{operation.value: "attributes" for operation in self.attribute_operations},
+            **{operation.value: "events" for operation in self.event_operations},
+            JavaTelemetryKeywords.COUNTER_ADD.value: "counter",
+        }
+
     def _extract_name_from_args(self, node: MethodInvocation) -> Optional[str]:
         """
         Extract name from first argument of a Java method call.
@@ -66,66 +76,54 @@ class JavaTelemetryDetector:
 
         return arg.value if hasattr(arg, "value") else str(arg)
 
-    def call_switcher(self, method_name: str, node: MethodInvocation | ClassCreator):
+    def _line_number(self, node: MethodInvocation) -> int:
         """
-        Route method call to correct handler based on OpenTelemetry keyword.
+        Line of a Java method call (-1 if its position is unknown).
         """
 
-        match method_name:
-            case _ if method_name in self.tracer_operations:
-                if name := self._extract_name_from_args(node):
-                    self.output["tracers"].append(
-                        TelemetryCall(
-                            func=name,
-                            line_number=getattr(node, "position", None).line
-                            if node.position
-                            else -1,
-                        )
-                    )
+        return node.position.line if node.position else -1
 
-            case _ if method_name in self.span_operations:
-                if name := self._extract_name_from_args(node):
-                    self.output["spans"].append(
-                        TelemetryCall(
-                            func=name,
-                            line_number=getattr(node, "position", None).line
-                            if node.position
-                            else -1,
-                        )
-                    )
+    def _capture(self, method_name: str, node: MethodInvocation) -> Optional[TelemetryCall]:
+        """
+        Capture the details of a telemetry call, according to its OpenTelemetry keyword.
 
-            case _ if method_name in self.attribute_operations:
-                self.output["attributes"].append(
-                    TelemetryCall(
-                        func=method_name,
-                        line_number=getattr(node, "position", None).line
-                        if node.position
-                        else -1,
-                        args=java_ast_extractor(node),
-                    )
-                )
+        Both `run` and `run_presence` go through this method, so a call is either captured by both or by
+        none of them.
 
-            case _ if method_name in self.event_operations:
-                self.output["events"].append(
-                    TelemetryCall(
-                        func=method_name,
-                        line_number=getattr(node, "position", None).line
-                        if node.position
-                        else -1,
-                        args=java_ast_extractor(node),
-                    )
-                )
+        Args:
+            method_name [str]: name of the method being called
+            node [MethodInvocation]: code node to be evaluated
+
+        Returns:
+            Optional[TelemetryCall]: the telemetry call (None if it isn't captured)
+        """
 
-            case JavaTelemetryKeywords.COUNTER_ADD:
-                self.output["counter"].append(
-                    TelemetryCall(
+        try:
+            match method_name:
+                case _ if method_name in self.tracer_operations or method_name in self.span_operations:
+                    if name := self._extract_name_from_args(node):
+                        return TelemetryCall(func=name, line_number=self._line_number(node))
+
+                case _ if method_name in self.categories:
+                    return TelemetryCall(
                         func=method_name,
-                        line_number=getattr(node, "position", None).line
-                        if node.position
-                        else -1,
+                        line_number=self._line_number(node),
                         args=java_ast_extractor(node),
                     )
-                )
+
+        # a call whose details can't be extracted is skipped, rather than the whole script
+        except Exception:
+            pass
+
+        return None
+
+    def call_switcher(self, method_name: str, node: MethodInvocation | ClassCreator):
+        """
+        Route method call to correct handler based on OpenTelemetry keyword.
+        """
+
+        if method_name in self.categories and (call := self._capture(method_name, node)) is not None:
+            self.output[self.categories[method_name]].append(call)
 
     def run(self, tree: Any) -> Dict:
         """
@@ -139,17 +137,13 @@ class JavaTelemetryDetector:
         """
 
         for path, node in tree:
-            try:
-                if isinstance(node, MethodInvocation):
-                    self.call_switcher(node.member, node)
-
-                elif isinstance(node, ClassCreator) and node.body:
-                    for body_expr in node.body:
-                        if isinstance(body_expr, MethodInvocation):
-                            self.call_switcher(body_expr.member, body_expr)
+            if isinstance(node, MethodInvocation):
+                self.call_switcher(node.member, node)
 
-            except Exception:
-                pass
+            elif isinstance(node, ClassCreator) and node.body:
+                for body_expr in node.body:
+                    if isinstance(body_expr, MethodInvocation):
+                        self.call_switcher(body_expr.member, body_expr)
 
         return {
             key: (
@@ -160,3 +154,48 @@ class JavaTelemetryDetector:
             )
             for key, val in self.output.items()
         }
+
+    def run_presence(self, tree: Any) -> Set[str]:
+        """
+        Find which telemetry categories are used in the Java AST, without capturing the details of the calls.
+
+        The tree is walked until every category has been seen, and the details of a category are only
+        captured until a first call of it is (through `_capture`, as `run` does). A category is present if
+        and only if `run` would capture at least one call of it.
+
+        Args:
+            tree (javalang parser tree): Parsed Java source tree
+
+        Returns:
+            Set[str]: the telemetry categories used in the code
+        """
+
+        found = set()
+
+        def visit(node: MethodInvocation) -> bool:
+            category = self.categories.get(node.member)
+
+            if category is None or category in found:
+                return False
+
+            if self._capture(node.member, node) is None:
+                return False
+
+            found.add(category)
+
+            return len(found) == len(self.output)
+
+        for path, node in tree:
+            if isinstance(node, MethodInvocation):
+                if visit(node):
+                    break
+
+            elif isinstance(node, ClassCreator) and node.body:
+                if any(
+                    visit(body_expr)
+                    for body_expr in node.body
+                    if isinstance(body_expr, MethodInvocation)
+                ):
+                    break
+
+        return found
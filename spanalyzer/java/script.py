@@ -2,16 +2,27 @@
 
 import javalang
 
+from bisect import bisect_left
+
+from typing import Any
+from typing import List
+from typing import Tuple
 from typing import Union
+from typing import Optional
 
 from collections import namedtuple
 
+from javalang.tokenizer import Separator
+
+from spanalyzer.java.tokenizer import LexedSource
+from spanalyzer.java.tokenizer import tokenize
+from spanalyzer.java.tokenizer import parse_tokens
+
 # TODO. if these are the same than the ones in python, we should move them to a shared module
 FunctionSpecs = namedtuple(
     "FunctionSpecs", ["name", "docstring", "start_lineno", "end_lineno"]
 )
 
-
 class JavaScriptSniffer:
     """
     This class will scrape all the code from a Java source file and return the list of functions (methods).
@@ -21,17 +32,46 @@ class JavaScriptSniffer:
 
     This will be used later on to determine the amount of telemetry calls in a script.
 
+    The source file is tokenized only once: the same tokens are used to parse the source file (when it
+    isn't parsed yet), to extract the JavaDoc comments and to find where each method ends.
+
     Args:
         filename [str]: the Java source file to be sniffed
+        source_code [Optional[str]]: the content of the source file, if it was already read
+        lexed [Optional[LexedSource]]: the tokens and comments of the source file, if it was already tokenized
     """
 
-    def __init__(self, filename: str):
+    def __init__(
+        self,
+        filename: str,
+        source_code: Optional[str] = None,
+        lexed: Optional[LexedSource] = None,
+    ):
         self.filename = filename
         self.functions_list = []
 
-        with open(self.filename, "r") as f:
-            self.source_code = f.read()
-            self.lines = self.source_code.splitlines()
+        if source_code is None:
+            with open(self.filename, "r") as f:
+                source_code = f.read()
+
+        self.source_code = source_code
+        self.lines = self.source_code.splitlines()
+
+        self.lexed = lexed
+        self._braces = None
+
+    def _lex(self) -> LexedSource:
+        """
+        Get the tokens and comments of the source file, tokenizing it on the first call.
+
+        Returns:
+            LexedSource: the tokens and comments of the source file
+        """
+
+        if self.lexed is None:
+            self.lexed = tokenize(self.source_code)
+
+        return self.lexed
 
     def _get_javadoc_for_method(self, method_node, comments):
         """
@@ -62,11 +102,12 @@ class JavaScriptSniffer:
         if method_line is None:
             return None
 
-        preceding_comments = [c for c in comments if c[0] < method_line]
-        if not preceding_comments:
+        # the comments are sorted by line, so the closest one preceding the method is found by bisection
+        idx = bisect_left(comments, method_line, key=lambda c: c[0])
+        if idx == 0:
             return None
 
-        closest_comment_line, comment_text = max(preceding_comments, key=lambda c: c[0])
+        closest_comment_line, comment_text = comments[idx - 1]
 
         if comment_text.strip().startswith("/**") and comment_text.strip().endswith(
             "*/"
@@ -76,35 +117,64 @@ class JavaScriptSniffer:
 
         return None
 
-    def _estimate_method_end(self, start_line):
+    def _match_braces(self) -> Tuple[List[Tuple[int, int]], List[int]]:
         """
-        Estimate method end line by counting braces from start_line in the source file.
+        Match every opening brace of the source file with its closing brace.
+
+        This is done once per file, in a single pass over the tokens of the source file, so the braces
+        within string literals, char literals and comments are not taken into account.
+
+        Returns:
+            Tuple[List[Tuple[int, int]], List[int]]: the (line, column) positions of the opening braces,
+            sorted, and the line of the matching closing brace of each one of them (the last line of the
+            file if it's never closed)
+        """
+
+        if self._braces is None:
+            open_positions, close_lines, stack = [], [], []
+
+            for token in self._lex().tokens:
+                if token.__class__ is not Separator:
+                    continue
+
+                if token.value == "{":
+                    stack.append(len(open_positions))
+                    open_positions.append((token.position.line, token.position.column))
+                    close_lines.append(len(self.lines))
+
+                elif token.value == "}" and stack:
+                    close_lines[stack.pop()] = token.position.line
+
+            self._braces = (open_positions, close_lines)
+
+        return self._braces
+
+    def _estimate_method_end(self, start_line, start_column=0):
+        """
+        Estimate method end line, as the line closing the first brace opened from its start onwards.
+
+        The braces are matched once for the whole file (see `_match_braces`), so each method end is
+        obtained with a binary search over the opening braces.
 
         Args:
             start_line [int]: starting line of method
+            start_column [int]: starting column of method
 
         Returns:
             int: estimated end line number
 
         Example:
-            For method starting at line 10, counts braces until balanced,
-            returning e.g. line 15 if the closing brace is at line 15.
+            For method starting at line 10, finds the first brace opened from there and
+            returns e.g. line 15 if the matching closing brace is at line 15.
         """
 
         if start_line == -1:
             return -1
 
-        brace_count = 0
-        in_method = False
-        for i, line in enumerate(self.lines[start_line - 1 :], start=start_line):
-            brace_count += line.count("{")
-            brace_count -= line.count("}")
-            if brace_count > 0:
-                in_method = True
-            if in_method and brace_count == 0:
-                return i
+        open_positions, close_lines = self._match_braces()
+        idx = bisect_left(open_positions, (start_line, start_column))
 
-        return len(self.lines)
+        return close_lines[idx] if idx < len(open_positions) else len(self.lines)
 
     def _extract_comments(self):
         """
@@ -127,27 +197,16 @@ class JavaScriptSniffer:
         """
 
         comments = []
-        in_javadoc = False
-        javadoc_lines = []
-        javadoc_start_line = None
 
-        for idx, line in enumerate(self.lines, start=1):
-            stripped = line.strip()
+        for comment in self._lex().comments:
+            line = self.lines[comment.line - 1]
 
-            if stripped.startswith("/**"):
-                in_javadoc = True
-                javadoc_lines = [line]
-                javadoc_start_line = idx
+            # only the JavaDoc comments opening their line are taken into account
+            if not comment.text.startswith("/**") or line[: comment.column - 1].strip():
                 continue
 
-            if in_javadoc:
-                javadoc_lines.append(line)
-                if "*/" in line:
-                    in_javadoc = False
-                    comment_text = "\n".join(javadoc_lines)
-                    comments.append((javadoc_start_line, comment_text))
-                    javadoc_lines = []
-                    javadoc_start_line = None
+            comment_text = "\n".join(self.lines[comment.line - 1 : comment.end_line])
+            comments.append((comment.line, comment_text))
 
         return comments
 
@@ -169,7 +228,12 @@ class JavaScriptSniffer:
         for path, node in tree.filter(javalang.tree.MethodDeclaration):
             start_line = node.position.line if node.position else -1
 
-            end_line = self._estimate_method_end(start_line)
+            # abstract and interface methods have no body to be closed
+            end_line = (
+                self._estimate_method_end(start_line, node.position.column)
+                if node.body is not None and node.position
+                else start_line
+            )
             docstring = self._get_javadoc_for_method(node, comments)
 
             func_spec = FunctionSpecs(
@@ -181,12 +245,15 @@ class JavaScriptSniffer:
 
             self.functions_list.append(func_spec)
 
-    def run(self):
+    def run(self, tree: Optional[Any] = None):
         """
         Run the sniffer over the Java source file.
 
         This will parse the source file and then visit all method declarations to capture their specs.
 
+        Args:
+            tree [Optional[Any]]: the already parsed source file; when provided the source is not parsed again
+
         Example:
             ```
             sniffer = JavaScriptSniffer('Example.java')
@@ -194,6 +261,8 @@ class JavaScriptSniffer:
             print(sniffer.functions_list)
             ```
         """
-        tree = javalang.parse.parse(self.source_code)
+        if tree is None:
+            tree = parse_tokens(self._lex().tokens)
+
         comments = self._extract_comments()
         self.visit_methods(tree, comments)
@@ -0,0 +1,279 @@
+# Script containing the tokenizer of the Java source files, shared by the parser and the sniffer
+
+from typing import Any
+from typing import List
+from typing import AbstractSet
+
+from collections import namedtuple
+
+from javalang.parser import Parser
+from javalang.tokenizer import Keyword
+from javalang.tokenizer import Separator
+from javalang.tokenizer import Operator
+from javalang.tokenizer import Identifier
+from javalang.tokenizer import JavaToken
+from javalang.tokenizer import JavaTokenizer
+
+JavaComment = namedtuple("JavaComment", ["line", "column", "end_line", "text"])
+
+LexedSource = namedtuple("LexedSource", ["tokens", "comments"])
+
+TYPE_DECLARATIONS = {"class", "interface", "enum"}
+
+
+class CommentRecordingTokenizer(JavaTokenizer):
+    """
+    Java tokenizer that keeps the comments (along with their positions) it skips over.
+
+    The javalang tokenizer drops the comments, only attaching the last javadoc to the token that follows it;
+    keeping them allows the comments to be extracted from the same pass that produces the tokens.
+
+    Args:
+        data [str]: the content of the source file
+    """
+
+    def __init__(self, data: str):
+        super().__init__(data)
+        self.comments: List[JavaComment] = []
+
+    def read_comment(self) -> str:
+        """
+        Read the comment starting at the current position, recording it.
+
+        Returns:
+            str: the comment
+        """
+
+        line, column = self.current_line, self.i - self.start_of_line
+        comment = super().read_comment()
+
+        self.comments.append(
+            JavaComment(line=line, column=column, end_line=self.current_line, text=comment)
+        )
+
+        return comment
+
+
+def tokenize(source_code: str) -> LexedSource:
+    """
+    Tokenize a Java source file, keeping its comments.
+
+    Args:
+        source_code [str]: the content of the source file
+
+    Returns:
+        LexedSource: the tokens and the comments (both sorted by position) of the source file
+    """
+
+    tokenizer = CommentRecordingTokenizer(source_code)
+    tokens: List[JavaToken] = list(tokenizer.tokenize())
+
+    return LexedSource(tokens=tokens, comments=tokenizer.comments)
+
+
+def parse_tokens(tokens: List[JavaToken]) -> Any:
+    """
+    Parse the tokens of a Java source file, as `javalang.parse.parse` would do with its content.
+
+    Args:
+        tokens [List[JavaToken]]: the tokens of the source file
+
+    Returns:
+        Any: the parsed tree (a javalang compilation unit)
+    """
+
+    return Parser(tokens).parse()
+
+
+def _is_type_declaration(tokens: List[JavaToken], idx: int) -> bool:
+    """
+    Check if the token provided opens a type declaration (i.e. a class, interface or enum).
+
+    Args:
+        tokens [List[JavaToken]]: the tokens of the source file
+        idx [int]: the index of the token to be checked
+
+    Returns:
+        bool: True if the token is a class, interface or enum keyword (and not a class literal, as in
+        `Example.class`), False otherwise
+    """
+
+    token = tokens[idx]
+
+    return (
+        token.__class__ is Keyword
+        and token.value in TYPE_DECLARATIONS
+        and not (idx > 0 and tokens[idx - 1].value == ".")
+    )
+
+
+def _opens_anonymous_class(tokens: List[JavaToken], idx: int, end: int) -> bool:
+    """
+    Check if the `new` keyword provided creates an anonymous class (as in `new Runnable() { ... }`).
+
+    Args:
+        tokens [List[JavaToken]]: the tokens of the source file
+        idx [int]: the index of the `new` keyword
+        end [int]: the index where the search stops
+
+    Returns:
+        bool: True if the class creator is followed by a class body, False otherwise
+    """
+
+    # skip over the created type (qualified names, generics and annotations) up to its arguments
+    while idx < end and tokens[idx].value not in ("(", "[", "{", ";"):
+        idx += 1
+
+    if idx >= end or tokens[idx].value != "(":
+        return False
+
+    depth = 0
+
+    for idx in range(idx, end):
+        if tokens[idx].value == "(":
+            depth += 1
+        elif tokens[idx].value == ")":
+            depth -= 1
+
+            if depth == 0:
+                return idx + 1 < end and tokens[idx + 1].value == "{"
+
+    return False
+
+
+def _is_elidable_body(
+    tokens: List[JavaToken], start: int, end: int, keywords: AbstractSet[str]
+) -> bool:
+    """
+    Check if a method body can be left out of the parse without changing the telemetry calls nor the
+    methods found in the source file.
+
+    That's the case when the body neither mentions a telemetry keyword, nor declares a type of its own
+    (local or anonymous class), which could contain methods.
+
+    Args:
+        tokens [List[JavaToken]]: the tokens of the source file
+        start [int]: the index of the opening brace of the body
+        end [int]: the index of the closing brace of the body
+        keywords [AbstractSet[str]]: the telemetry keywords
+
+    Returns:
+        bool: True if the body can be left out, False otherwise
+    """
+
+    for idx in range(start + 1, end):
+        token = tokens[idx]
+
+        if token.__class__ is Identifier and token.value in keywords:
+            return False
+
+        if token.__class__ is Keyword and (
+            _is_type_declaration(tokens, idx)
+            or (token.value == "new" and _opens_anonymous_class(tokens, idx, end))
+        ):
+            return False
+
+    return True
+
+
+def _is_method_header(header: List[JavaToken]) -> bool:
+    """
+    Check if the tokens declaring a class member are the ones of a method (or constructor) declaration.
+
+    Args:
+        header [List[JavaToken]]: the tokens in between the previous member and the opening brace
+
+    Returns:
+        bool: True if the member is a method or a constructor, False otherwise (e.g. a field initialized
+        with an anonymous class, or an initializer block)
+    """
+
+    if not header or any(
+        token.__class__ is Operator and token.value in ("=", "->") for token in header
+    ):
+        return False
+
+    if header[-1].value == ")":
+        return True
+
+    # a method declaring the exceptions it throws
+    return any(
+        token.__class__ is Keyword and token.value == "throws" for token in header
+    ) and any(token.value == ")" for token in header)
+
+
+def elide_method_bodies(tokens: List[JavaToken], keywords: AbstractSet[str]) -> List[JavaToken]:
+    """
+    Leave out the tokens of the method bodies that can't contain any telemetry call.
+
+    The statements of a method body are by far the most expensive part of the parse, and most of them
+    don't contain any telemetry call; with their tokens left out (keeping the braces, so the method is
+    parsed with an empty body), only the class structure, the method signatures and the bodies that
+    mention a telemetry keyword are parsed. The positions of the remaining tokens are kept, hence the
+    telemetry calls and the methods found in the tree are the same as the ones of a full parse.
+
+    Only the bodies of the methods (and constructors) declared straight in a class, interface or enum are
+    considered, and a body is only left out when it neither mentions a telemetry keyword nor declares a
+    type of its own (see `_is_elidable_body`).
+
+    Args:
+        tokens [List[JavaToken]]: the tokens of the source file
+        keywords [AbstractSet[str]]: the telemetry keywords
+
+    Returns:
+        List[JavaToken]: the tokens to be parsed
+    """
+
+    # for every brace opened, whether it's a type body ("type"), the constants of an enum ("constants"),
+    # or any other block ("block")
+    scopes: List[str] = []
+    header_start, type_declaration = 0, None
+    bodies, close_stack = {}, []
+
+    for idx, token in enumerate(tokens):
+        if token.__class__ is Keyword and _is_type_declaration(tokens, idx):
+            type_declaration = token.value
+
+        if token.__class__ is not Separator or token.value not in ("{", "}", ";"):
+            continue
+
+        if token.value == "{":
+            header = tokens[header_start:idx]
+            scope = "block"
+
+            if type_declaration is not None:
+                scope = "constants" if type_declaration == "enum" else "type"
+
+            elif scopes and scopes[-1] == "type" and _is_method_header(header):
+                bodies[idx] = None
+
+            scopes.append(scope)
+            close_stack.append(idx)
+
+        elif token.value == "}":
+            if scopes:
+                scopes.pop()
+                opening = close_stack.pop()
+
+                if opening in bodies:
+                    bodies[opening] = idx
+
+        elif scopes and scopes[-1] == "constants":
+            # the constants of an enum end at the first semicolon, followed by the members of the enum
+            scopes[-1] = "type"
+
+        header_start, type_declaration = idx + 1, None
+
+    elided, last = [], 0
+
+    for start, end in bodies.items():
+        if end is None or start < last or not _is_elidable_body(tokens, start, end, keywords):
+            continue
+
+        elided.extend(tokens[last : start + 1])
+        last = end
+
+    elided.extend(tokens[last:])
+
+    return elided
+
@@ -0,0 +1,83 @@
+# Script containing the merge of the partial reports produced by sharded runs (see the `shard` option of the engine).
+
+import os
+import heapq
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Iterator
+
+from spanalyzer.reports import terminal_report
+
+from spanalyzer.utils.streams import JsonWriter
+from spanalyzer.utils.streams import JsonlWriter
+from spanalyzer.utils.streams import is_basic_report
+from spanalyzer.utils.streams import iter_report_records
+
+from spanalyzer.utils.operations import write_json
+from spanalyzer.utils.operations import folder_trim
+from spanalyzer.utils.operations import script_sort_key
+
+
+def merge_reports(
+    report_paths: List[str], output_path: str, output_format: str = "json"
+) -> str:
+    """
+    Merge the partial reports of a sharded run into the report a single run would have produced.
+
+    Each partial report is already sorted in the order in which the scripts are analyzed (see
+    `script_sort_key`), so the reports are streamed through a k-way merge: only the record being merged
+    of each report is held in memory. The basic rows are then trimmed all at once (see `folder_trim`),
+    as the common folder of the scripts of a single shard may be deeper than the one of the whole run.
+
+    Args:
+        report_paths [List[str]]: the paths to the partial reports (json or jsonl, basic or detailed)
+        output_path [str]: the path to the merged report
+        output_format [str]: the format of the merged detailed report (the options are 'json' and 'jsonl')
+
+    Returns:
+        [str]: the type of the reports merged ('basic' or 'detailed')
+    """
+
+    if os.path.abspath(output_path) in map(os.path.abspath, report_paths):
+        raise ValueError(f"The merged report would overwrite one of the reports: {output_path}")
+
+    report_types = {
+        "basic" if is_basic_report(path) else "detailed" for path in report_paths
+    }
+
+    if len(report_types) > 1:
+        raise ValueError("Basic and detailed reports can't be merged together")
+
+    report_type = report_types.pop()
+
+    def merged_records() -> Iterator[Dict[str, Any]]:
+        previous_script = None
+
+        for record in heapq.merge(
+            *map(iter_report_records, report_paths),
+            key=lambda record: script_sort_key(record["script"]),
+        ):
+            if record["script"] == previous_script:
+                raise ValueError(f"Script found in more than one report: {previous_script}")
+
+            previous_script = record["script"]
+
+            yield record
+
+    if report_type == "basic":
+        rows = list(merged_records())
+
+        write_json(rows, output_path)
+        print(terminal_report(folder_trim(rows)))
+
+        return report_type
+
+    writer_cls = JsonlWriter if output_format == "jsonl" else JsonWriter
+
+    with writer_cls(output_path) as writer:
+        for record in merged_records():
+            writer.write(record)
+
+    return report_type
@@ -0,0 +1,352 @@
+# Script containing the timing (and memory accounting) of the phases of a run, reported by the cli with
+# --profile (and --memory).
+
+import sys
+import time
+import tracemalloc
+
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Iterator
+from typing import Optional
+from typing import ContextManager
+
+from contextlib import contextmanager
+from contextlib import nullcontext
+
+from importlib.util import find_spec
+
+# phases of a run, in the order they take place (the ones in between 'list' and 'write' are per script)
+PHASES = ["list", "scan", "read", "cache", "parse", "detect", "sniff", "conciliate", "write"]
+
+# context manager used in place of a phase when nothing is being profiled, so it costs next to nothing
+NO_PHASE = nullcontext()
+
+# key of the peaks under which the peak of the whole process is kept, along with the ones of the phases
+PROCESS_PEAK = "process"
+
+MB = 1024 * 1024
+
+
+@contextmanager
+def _timed(
+    totals: List[float],
+    intervals: Optional[List[Tuple[str, int, int]]] = None,
+    name: Optional[str] = None,
+    peaks: Optional[Dict[str, int]] = None,
+) -> Iterator[None]:
+    """
+    Add the wall time and the CPU time (of the current process) spent within the context to the totals.
+
+    When the memory allocations are being traced (see `tracemalloc`), the peak of the memory allocated
+    within the context, on top of the one already allocated when it's entered, is kept as well.
+
+    Args:
+        totals [List[float]]: the wall time and the CPU time accumulated so far, in seconds
+        intervals [Optional[List[Tuple[str, int, int]]]]: where the name, start and end (epoch time, in
+        nanoseconds) of the context are appended, if provided
+        name [Optional[str]]: the name of the context
+        peaks [Optional[Dict[str, int]]]: the highest peak of memory of each context so far, in bytes
+    """
+
+    traced = peaks is not None and tracemalloc.is_tracing()
+
+    if traced:
+        # the peak is reset for every context, so the one of the process so far is kept beforehand
+        allocated, peak = tracemalloc.get_traced_memory()
+        peaks[PROCESS_PEAK] = max(peaks.get(PROCESS_PEAK, 0), peak)
+        tracemalloc.reset_peak()
+
+    start = time.time_ns() if intervals is not None else 0
+    wall, cpu = time.perf_counter(), time.process_time()
+
+    try:
+        yield
+    finally:
+        totals[0] += time.perf_counter() - wall
+        totals[1] += time.process_time() - cpu
+
+        if intervals is not None:
+            intervals.append((name, start, time.time_ns()))
+
+        if traced:
+            _, peak = tracemalloc.get_traced_memory()
+            peaks[name] = max(peaks.get(name, 0), peak - allocated)
+            peaks[PROCESS_PEAK] = max(peaks[PROCESS_PEAK], peak)
+
+
+# whether the resource usage of the processes can be read and limited (e.g. not on Windows), which the
+# memory accounting and the memory limits of the workers rely on
+RESOURCE_AVAILABLE = find_spec("resource") is not None
+
+
+def peak_rss() -> Tuple[int, int]:
+    """
+    Get the peak resident set size of the current process and of the largest of its child processes that
+    are already gone (e.g. the workers of the process pool, once it's shut down).
+
+    Returns:
+        [Tuple[int, int]]: the peak resident set size of the current process and of its children, in bytes
+    """
+
+    # imported here, as the module is not available on every platform (see RESOURCE_AVAILABLE)
+    import resource
+
+    # the peak is given in kilobytes, except on macOS
+    unit = 1 if sys.platform == "darwin" else 1024
+
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit,
+    )
+
+
+class ScriptProfile:
+    """
+    Wall time and CPU time spent on the analysis of a single script, in total and per phase.
+
+    It's filled in by the process analyzing the script, and then handed over to the `Profiler` of the run
+    (hence being a plain picklable object). The start and end of the analysis and of each phase are kept
+    as well, so the self-instrumentation can rebuild them as spans (see `spanalyzer.instrumentation`), along
+    with the peak of memory of each phase when the process is tracing its memory allocations.
+
+    Args:
+        script [str]: the path to the script
+    """
+
+    def __init__(self, script: str):
+        self.script = script
+        self.totals = [0.0, 0.0]
+        self.phases: Dict[str, List[float]] = {}
+        self.intervals: List[Tuple[str, int, int]] = []
+        self.peaks: Dict[str, int] = {}
+        self.bytes_read = 0
+
+    def measure(self) -> ContextManager[None]:
+        """
+        Measure the whole analysis of the script.
+        """
+
+        return _timed(self.totals, self.intervals, "script")
+
+    def phase(self, name: str) -> ContextManager[None]:
+        """
+        Measure a phase of the analysis of the script (a phase can be measured more than once).
+
+        Args:
+            name [str]: the name of the phase
+        """
+
+        return _timed(self.phases.setdefault(name, [0.0, 0.0]), self.intervals, name, self.peaks)
+
+
+def phase(profile: Optional[ScriptProfile], name: str) -> ContextManager[None]:
+    """
+    Measure a phase of the analysis of a script, if it's being profiled.
+
+    Args:
+        profile [Optional[ScriptProfile]]: the profile of the script (None if it's not being profiled)
+        name [str]: the name of the phase
+
+    Returns:
+        [ContextManager[None]]: the context manager measuring the phase
+    """
+
+    return NO_PHASE if profile is None else profile.phase(name)
+
+
+class Profiler:
+    """
+    Class collecting the wall time and CPU time of every phase of a run, and of every script analyzed.
+
+    The phases of the run itself (e.g. listing the scripts, writing the report) are measured in the current
+    process, while the phases of each script are measured by the process analyzing it (see `ScriptProfile`)
+    and summed over all the scripts: when more than one job is used, they can add up to more than the
+    wall time of the run.
+
+    When the memory allocations are being traced, the peak of memory of each phase is kept as well (the
+    highest one over all the scripts, for the phases of the scripts), along with the memory held by the
+    report once every script is analyzed and the allocations holding it (see `take_snapshot`).
+
+    Args:
+        top [int]: the number of slowest scripts (and largest allocations) to be reported
+    """
+
+    def __init__(self, top: int = 10):
+        self.top = top
+        self.totals = [0.0, 0.0]
+        self.phases: Dict[str, List[float]] = {}
+        self.scripts: List[ScriptProfile] = []
+        self.peaks: Dict[str, int] = {}
+        self.allocated = 0
+        self.retained: Optional[int] = None
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def measure(self) -> ContextManager[None]:
+        """
+        Measure the whole run.
+        """
+
+        if tracemalloc.is_tracing():
+            self.allocated = tracemalloc.get_traced_memory()[0]
+
+        return _timed(self.totals)
+
+    def phase(self, name: str) -> ContextManager[None]:
+        """
+        Measure a phase of the run.
+
+        Args:
+            name [str]: the name of the phase
+        """
+
+        return _timed(self.phases.setdefault(name, [0.0, 0.0]), peaks=self.peaks, name=name)
+
+    def take_snapshot(self):
+        """
+        Keep the memory allocated since the run started, along with a snapshot of the allocations, when the
+        memory allocations are being traced; it's taken once the report is built and before it's written,
+        so they're the ones held by the report.
+        """
+
+        if not tracemalloc.is_tracing():
+            return
+
+        self.retained = tracemalloc.get_traced_memory()[0] - self.allocated
+        self.snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+
+    def record(self, profile: ScriptProfile):
+        """
+        Add the profile of a script to the ones of the run.
+
+        Args:
+            profile [ScriptProfile]: the profile of the script
+        """
+
+        self.scripts.append(profile)
+
+        for name, (wall, cpu) in profile.phases.items():
+            totals = self.phases.setdefault(name, [0.0, 0.0])
+            totals[0] += wall
+            totals[1] += cpu
+
+        for name, peak in profile.peaks.items():
+            self.peaks[name] = max(self.peaks.get(name, 0), peak)
+
+    def summary(self) -> str:
+        """
+        Build the breakdown of the run per phase, followed by the slowest scripts.
+
+        Returns:
+            [str]: the profile of the run
+
+        _Example_:
+            ```
+            [i] Profile: 12 scripts in 0.532 s (wall), 0.498 s (cpu of this process)
+
+            Phase                  Wall (s)     CPU (s)
+            list                     0.0012      0.0011
+            parse                    0.3120      0.3050
+            ...
+
+            Slowest scripts        Wall (s)     CPU (s)
+            path/to/script_2.py      0.1010      0.0990
+            ...
+            ```
+        """
+
+        slowest = sorted(self.scripts, key=lambda profile: profile.totals[0], reverse=True)[: self.top]
+        phases = [name for name in PHASES if name in self.phases] + [
+            name for name in self.phases if name not in PHASES
+        ]
+
+        width = max([len("Slowest scripts")] + [len(profile.script) for profile in slowest])
+
+        def row(name: str, totals: List[float]) -> str:
+            return f"{name:<{width}}  {totals[0]:>10.4f}  {totals[1]:>10.4f}"
+
+        header = f"{'Wall (s)':>10}  {'CPU (s)':>10}"
+        lines = [
+            f"[i] Profile: {len(self.scripts)} scripts in {self.totals[0]:.3f} s (wall), "
+            f"{self.totals[1]:.3f} s (cpu of this process)",
+            "",
+            f"{'Phase':<{width}}  {header}",
+            *[row(name, self.phases[name]) for name in phases],
+            "",
+            f"{'Slowest scripts':<{width}}  {header}",
+            *[row(profile.script, profile.totals) for profile in slowest],
+        ]
+
+        return "\n".join(lines)
+
+    def memory_summary(self) -> str:
+        """
+        Build the breakdown of the memory of the run: the peak resident set size, the peak of memory of each
+        phase, the memory held by the report before it's written and the largest allocations holding it.
+
+        The peaks of the phases are the memory allocated on top of the one already held when the phase
+        started (e.g. the parse peak is the one of the syntax tree of the largest script, and the write peak
+        the one of the serialization of the report).
+
+        Returns:
+            [str]: the memory profile of the run
+
+        _Example_:
+            ```
+            [i] Memory: peak RSS 182.4 MB (this process), 96.1 MB (largest child process)
+            [i] Traced peak 120.3 MB (largest process), 64.2 MB held by the report before writing it
+
+            Phase                                       Peak (MB)
+            parse                                          12.310
+            write                                          48.022
+            ...
+
+            Largest allocations before writing          Size (MB)      Blocks
+            spanalyzer/engine.py:512                       30.118      401234
+            ...
+            ```
+        """
+
+        rss, children_rss = peak_rss()
+        process_peak = max(
+            self.peaks.get(PROCESS_PEAK, 0),
+            tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0,
+        )
+        phases = [name for name in PHASES if name in self.peaks] + [
+            name for name in self.peaks if name not in PHASES and name != PROCESS_PEAK
+        ]
+        allocations = self.snapshot.statistics("lineno")[: self.top] if self.snapshot else []
+        locations = [str(statistic.traceback) for statistic in allocations]
+
+        width = max([len("Largest allocations before writing")] + [len(location) for location in locations])
+
+        lines = [
+            f"[i] Memory: peak RSS {rss / MB:.1f} MB (this process)"
+            + (f", {children_rss / MB:.1f} MB (largest child process)" if children_rss else ""),
+            f"[i] Traced peak {process_peak / MB:.1f} MB (largest process)"
+            + (
+                f", {self.retained / MB:.1f} MB held by the report before writing it"
+                if self.retained is not None
+                else ""
+            ),
+            "",
+            f"{'Phase':<{width}}  {'Peak (MB)':>10}",
+            *[f"{name:<{width}}  {self.peaks[name] / MB:>10.3f}" for name in phases],
+        ]
+
+        if allocations:
+            lines.extend(
+                [
+                    "",
+                    f"{'Largest allocations before writing':<{width}}  {'Size (MB)':>10}  {'Blocks':>10}",
+                    *[
+                        f"{location:<{width}}  {statistic.size / MB:>10.3f}  {statistic.count:>10}"
+                        for location, statistic in zip(locations, allocations)
+                    ],
+                ]
+            )
+
+        return "\n".join(lines)
@@ -0,0 +1,60 @@
+# Python backend of the engine (see `spanalyzer.backends`)
+
+import ast
+
+from typing import Any
+from typing import Optional
+
+from spanalyzer.python.script import PythonScriptSniffer
+from spanalyzer.python.detector import PythonTelemetryDetector as Detector
+from spanalyzer.python.constants.keywords import PythonTelemetryKeywords as Keywords
+
+
+def tokenize(source_code: str) -> None:
+    """
+    Tokenize the source code of a python script.
+
+    There's nothing to be shared here, as the python scripts are tokenized by `ast.parse` itself.
+
+    Args:
+        source_code [str]: the content of the script
+
+    Returns:
+        [None]: no tokens
+    """
+
+    return None
+
+
+def parse(source_code: str, lexed: Optional[Any] = None, fast: bool = False) -> ast.AST:
+    """
+    Parse the source code of a python script.
+
+    Args:
+        source_code [str]: the content of the script
+        lexed [Optional[Any]]: unused, see `tokenize`
+        fast [bool]: unused, the python scripts are always fully parsed
+
+    Returns:
+        [ast.AST]: the parsed tree
+    """
+
+    return ast.parse(source_code)
+
+
+def build_sniffer(
+    script: str, source_code: Optional[str] = None, lexed: Optional[Any] = None
+) -> PythonScriptSniffer:
+    """
+    Build the sniffer of a python script.
+
+    Args:
+        script [str]: the path to the script
+        source_code [Optional[str]]: the content of the script (unused, the sniffer works on the tree)
+        lexed [Optional[Any]]: unused, see `tokenize`
+
+    Returns:
+        [PythonScriptSniffer]: the sniffer for the script
+    """
+
+    return PythonScriptSniffer(script)
@@ -1,12 +1,16 @@
 # Script containing the Telemetry Detector
 
+from typing import Set
 from typing import Dict
+from typing import Callable
 from typing import Optional
 
+from ast import AST
 from ast import Call
 from ast import Expr
-from ast import Dict
+from ast import Name
 from ast import Constant
+from ast import Attribute
 from ast import NodeVisitor
 
 from ast import walk
@@ -55,10 +59,32 @@ class PythonTelemetryDetector(NodeVisitor):
             PythonTelemetryKeywords.ADD_EVENTS,
         }
 
+        # dispatch table from the name of the method being called to the handler capturing its details
+        self.handlers: Dict[str, Callable[[str, AST], Optional[TelemetryCall]]] = {
+            PythonTelemetryKeywords.GET_TRACER.value: self._capture_tracer,
+            **{operation.value: self._capture_span for operation in self.span_operations},
+            **{operation.value: self._capture_attribute for operation in self.attribute_operations},
+            **{operation.value: self._capture_event for operation in self.event_operations},
+            PythonTelemetryKeywords.ADD_COUNTER.value: self._capture_counter,
+        }
+
+        # category filled in by each handler
+        self.categories: Dict[str, str] = {
+            PythonTelemetryKeywords.GET_TRACER.value: "tracers",
+            **{operation.value: "spans" for operation in self.span_operations},
+            **{operation.value: "attributes" for operation in self.attribute_operations},
+            **{operation.value: "events" for operation in self.event_operations},
+            PythonTelemetryKeywords.ADD_COUNTER.value: "counter",
+        }
+
     def _extract_name_from_args(self, node: Call) -> Optional[str]:
         """
         Extract name from first argument.
 
+        Only constants and plain names are considered; any other kind of argument (e.g. f-strings,
+        attributes, starred arguments) yields no name, and so do the expressions wrapping a call (the call
+        itself is visited on its own).
+
         Args:
             node [Call]: code node to be evaluated
 
@@ -66,96 +92,174 @@ class PythonTelemetryDetector(NodeVisitor):
             Optional[str]: name of the telemetry call
         """
 
-        if not node.args:
+        if not isinstance(node, Call) or not node.args:
             return None
 
         arg = node.args[0]
 
-        return arg.value if isinstance(arg, Constant) else arg.id
+        if isinstance(arg, Constant):
+            return arg.value
+
+        if isinstance(arg, Name):
+            return arg.id
+
+        return None
+
+    def _capture_tracer(self, call_type: str, node: AST) -> Optional[TelemetryCall]:
+        """
+        Capture the details of a tracer definition.
+
+        Args:
+            call_type [str]: type of call being made
+            node [AST]: code node (Call or Expr) to be evaluated
+
+        Returns:
+            Optional[TelemetryCall]: the tracer definition (None if it has no name)
+        """
+
+        if name := self._extract_name_from_args(node):
+            return TelemetryCall(func=name, line_number=node.lineno)
+
+        return None
+
+    def _capture_span(self, call_type: str, node: AST) -> Optional[TelemetryCall]:
+        """
+        Capture the details of a span operation.
+
+        Args:
+            call_type [str]: type of call being made
+            node [AST]: code node (Call or Expr) to be evaluated
+
+        Returns:
+            Optional[TelemetryCall]: the span operation (None if it has no name)
+        """
+
+        if name := self._extract_name_from_args(node):
+            return TelemetryCall(func=name, line_number=node.lineno)
+
+        return None
+
+    def _capture_attribute(self, call_type: str, node: AST) -> TelemetryCall:
+        """
+        Capture the details of an attribute setting.
+
+        Args:
+            call_type [str]: type of call being made
+            node [AST]: code node (Call or Expr) to be evaluated
+
+        Returns:
+            TelemetryCall: the attribute setting
+        """
+
+        return TelemetryCall(func=call_type, line_number=node.lineno, args=ast_extractor(node))
+
+    def _capture_event(self, call_type: str, node: AST) -> TelemetryCall:
+        """
+        Capture the details of an event recording.
+
+        Args:
+            call_type [str]: type of call being made
+            node [AST]: code node (Call or Expr) to be evaluated
+
+        Returns:
+            TelemetryCall: the event recording
+        """
+
+        args = (
+            ast_extractor(node)
+            if isinstance(node, Expr)
+            else ast_extractor(node.args)
+        )
 
-    def call_switcher(self, call_type: str, node: Call):
+        return TelemetryCall(func=call_type, line_number=node.lineno, args=args)
+
+    def _capture_counter(self, call_type: str, node: AST) -> TelemetryCall:
+        """
+        Capture the details of a counter update.
+
+        Args:
+            call_type [str]: type of call being made
+            node [AST]: code node (Call or Expr) to be evaluated
+
+        Returns:
+            TelemetryCall: the counter update
+        """
+
+        return TelemetryCall(func=call_type, line_number=node.lineno, args=ast_extractor(node))
+
+    def _capture(self, call_type: str, node: AST) -> Optional[TelemetryCall]:
+        """
+        Capture the details of a telemetry call through its handler.
+
+        Both `run` and `run_presence` go through this method, so a call is either captured by both or by
+        none of them.
+
+        Args:
+            call_type [str]: type of call being made
+            node [AST]: code node (Call or Expr) to be evaluated
+
+        Returns:
+            Optional[TelemetryCall]: the telemetry call (None if it isn't captured)
+        """
+
+        try:
+            return self.handlers[call_type](call_type, node)
+
+        # a call whose details can't be extracted (e.g. a call used as a dict key, which isn't hashable) is
+        # skipped, rather than the whole script
+        except Exception:
+            return None
+
+    def call_switcher(self, call_type: str, node: AST):
         """
         This function will work as a switch to determine the type of call being made.
 
         According to the type of call being made, the function that will capture the telemetry details will be
-        duly called.
+        duly called - through a lookup on the dispatch table.
 
         Args:
             call_type [str]: type of call being made
-            node [Call]: code node to be evaluated
+            node [AST]: code node (Call or Expr) to be evaluated
         """
 
-        match call_type:
-            case PythonTelemetryKeywords.GET_TRACER:
-                if name := self._extract_name_from_args(node):
-                    self.output["tracers"].append(
-                        TelemetryCall(func=name, line_number=node.lineno)
-                    )
-
-            case _ if call_type in self.span_operations:
-                if name := self._extract_name_from_args(node):
-                    self.output["spans"].append(
-                        TelemetryCall(
-                            func=name,
-                            line_number=node.lineno,
-                        )
-                    )
-
-            case _ if call_type in self.attribute_operations:
-                self.output["attributes"].append(
-                    TelemetryCall(
-                        func=call_type,
-                        line_number=node.lineno,
-                        args=ast_extractor(node),
-                    )
-                )
-
-            case _ if call_type in self.event_operations:
-                args = (
-                    ast_extractor(node)
-                    if isinstance(node, Expr)
-                    else ast_extractor(node.args)
-                )
-
-                self.output["events"].append(
-                    TelemetryCall(func=call_type, line_number=node.lineno, args=args)
-                )
-
-            case PythonTelemetryKeywords.ADD_COUNTER:
-                self.output["counter"].append(
-                    TelemetryCall(
-                        func=call_type,
-                        line_number=node.lineno,
-                        args=ast_extractor(node),
-                    )
-                )
-
-        self.generic_visit(node)
-
-    def run(self, node: Call) -> Dict:
+        if call_type in self.handlers and (call := self._capture(call_type, node)) is not None:
+            self.output[self.categories[call_type]].append(call)
+
+    def run(self, node: AST) -> Dict:
         """
         Method that can be seen as the heart of the PythonTelemetryDetector class.
 
         This method will be filtering the type of nodes that are of interest, and will be then calling
         the switcher method - that captures all the telemetry details spanalyzer is looking for.
 
+        The tree is traversed a single time: only the calls (or expressions wrapping a call) to an attribute
+        - e.g. `span.set_attribute(...)` - are dispatched.
+
         Args:
-            node [Call]: code node to be evaluated
+            node [AST]: code node to be evaluated
 
         Returns:
             Dict: dictionary containing the telemetry details
         """
 
+        handlers = self.handlers
+
         for node in walk(node):
-            try:
-                if isinstance(node, Call):
-                    self.call_switcher(node.func.attr, node)
+            if isinstance(node, Call):
+                func = node.func
+
+                if isinstance(func, Attribute) and func.attr in handlers:
+                    self.call_switcher(func.attr, node)
 
-                if isinstance(node, Expr):
-                    self.call_switcher(node.value.func.attr, node)
+            elif isinstance(node, Expr):
+                value = node.value
 
-            except:
-                pass
+                if (
+                    isinstance(value, Call)
+                    and isinstance(value.func, Attribute)
+                    and value.func.attr in handlers
+                ):
+                    self.call_switcher(value.func.attr, node)
 
         return {
             key: (
@@ -166,3 +270,43 @@ class PythonTelemetryDetector(NodeVisitor):
             )
             for key, val in self.output.items()
         }
+
+    def run_presence(self, node: AST) -> Set[str]:
+        """
+        Find which telemetry categories are used in the code, without capturing the details of the calls.
+
+        This is all the basic report needs: the tree is walked until every category has been seen, and
+        the details of a category are only captured until a first call of it is (through `_capture`, as
+        `run` does). A category is present if and only if `run` would capture at least one call of it.
+
+        Args:
+            node [AST]: code node to be evaluated
+
+        Returns:
+            Set[str]: the telemetry categories used in the code
+        """
+
+        categories = self.categories
+        found = set()
+
+        # the expressions wrapping a call are left aside: the call is walked on its own, and is captured
+        # whenever the expression is (a name is never extracted from an expression, and the arguments are
+        # extracted alike)
+        for node in walk(node):
+            if not isinstance(node, Call) or not isinstance(node.func, Attribute):
+                continue
+
+            category = categories.get(node.func.attr)
+
+            if category is None or category in found:
+                continue
+
+            if self._capture(node.func.attr, node) is None:
+                continue
+
+            found.add(category)
+
+            if len(found) == len(self.output):
+                break
+
+        return found
@@ -1,8 +1,10 @@
 # Script containing the logic that will be used to sniff the python scripts
 
 from typing import Union
+from typing import Optional
 
 import ast
+from ast import AST
 from ast import Str
 from ast import Expr
 from ast import parse
@@ -101,14 +103,18 @@ class PythonScriptSniffer(NodeVisitor):
 
         self.visit_FunctionDef(node)
 
-    def run(self):
+    def run(self, tree: Optional[AST] = None):
         """
         Run the sniffer over the script.
 
         This will firstly parse the script and then visit all the nodes to capture the function definitions.
+
+        Args:
+            tree [Optional[AST]]: the already parsed script; when provided the script is not read nor parsed again
         """
 
-        with open(self.filename, "r") as file:
-            tree = parse(file.read())
+        if tree is None:
+            with open(self.filename, "r") as file:
+                tree = parse(file.read())
 
         self.visit(tree)
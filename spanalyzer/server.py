@@ -0,0 +1,364 @@
+# Script containing the resident daemon, which answers analysis requests over a unix domain socket.
+
+import os
+import json
+import stat
+import socket
+import threading
+import socketserver
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Optional
+
+from collections import OrderedDict
+
+from spanalyzer import __version__
+
+from spanalyzer.cache import ResultCache
+from spanalyzer.engine import Engine
+
+
+def _stat_key(script: str) -> Optional[Tuple[int, int]]:
+    """
+    Get the modification time and size of a script, used to tell whether it changed.
+
+    Args:
+        script [str]: the path to the script
+
+    Returns:
+        [Optional[Tuple[int, int]]]: the modification time (in nanoseconds) and size, None if the script
+        can't be reached
+    """
+
+    try:
+        stat_result = os.stat(script)
+    except OSError:
+        return None
+
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+class AnalysisRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handler of a client connection: every line received is a json request, answered by a json line.
+    """
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class AnalysisServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Resident daemon that keeps the analysis results warm between requests.
+
+    On top of the (on-disk) results cache, the report entry of every script analyzed is held in memory
+    along with the modification time and size of the script, so a request over scripts that didn't
+    change is answered without reading them. The language backends are also imported only once.
+
+    The results held in memory are bounded: the ones of the scripts that are gone are dropped along with the
+    report of their folder, and the least recently requested ones are dropped past `max_results`.
+
+    The requests are json objects, one per line, with a `command` field:
+    - ping: check if the daemon is alive (answers its version and pid);
+    - report: analyze a folder, as `Engine.run` would (`path`, `report_type`, `language`, `fast`);
+    - analyze: analyze a list of scripts (`paths`, `report_type`, `language`, `fast`);
+    - shutdown: stop the daemon.
+
+    Every response carries an `ok` field and, if False, an `error` field.
+
+    Args:
+        socket_path [str]: the path to the unix domain socket to listen on
+        jobs [Optional[int]]: the number of worker processes used to analyze the scripts
+        cache_dir [Optional[str]]: the path to the results cache folder (no cache is used if not provided)
+        cache_size [int]: the maximum size of the results cache in bytes
+        max_results [int]: the maximum number of results held in memory
+    """
+
+    daemon_threads = True
+
+    DEFAULT_MAX_RESULTS = 100000
+
+    def __init__(
+        self,
+        socket_path: str,
+        jobs: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        cache_size: int = ResultCache.DEFAULT_MAX_SIZE,
+        max_results: int = DEFAULT_MAX_RESULTS,
+    ):
+        """
+        Initialize the daemon, binding its socket.
+        """
+
+        self.socket_path = socket_path
+        self.jobs = jobs
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.max_results = max_results
+
+        # ordered from the least to the most recently requested
+        self.results: OrderedDict[Tuple, Tuple[Optional[Tuple[int, int]], Optional[Dict]]] = OrderedDict()
+        self.lock = threading.Lock()
+
+        # the device and inode of the socket file bound, so only that one is removed once closed
+        self.bound_file: Optional[Tuple[int, int]] = None
+
+        super().__init__(socket_path, AnalysisRequestHandler)
+
+    def server_bind(self):
+        """
+        Bind the socket, keeping track of the file it created.
+        """
+
+        super().server_bind()
+
+        stat_result = os.lstat(self.socket_path)
+        self.bound_file = stat_result.st_dev, stat_result.st_ino
+
+    def server_close(self):
+        """
+        Close the socket and remove its file, if it's still the one bound by the daemon.
+        """
+
+        super().server_close()
+
+        try:
+            stat_result = os.lstat(self.socket_path)
+        except OSError:
+            return
+
+        if (stat_result.st_dev, stat_result.st_ino) == self.bound_file:
+            os.remove(self.socket_path)
+
+    def _engine(self, request: Dict[str, Any], folder_path: Optional[str] = None) -> Engine:
+        """
+        Build the engine of a request.
+
+        Args:
+            request [Dict[str, Any]]: the request
+            folder_path [Optional[str]]: the folder under analysis
+
+        Returns:
+            [Engine]: the engine, set up with the options of the daemon
+        """
+
+        return Engine(
+            folder_path,
+            request.get("report_type", "detailed"),
+            language=request.get("language", "python"),
+            jobs=self.jobs,
+            cache_dir=self.cache_dir,
+            cache_size=self.cache_size,
+            fast=request.get("fast", False),
+        )
+
+    def _analyze(
+        self, engine: Engine, scripts_lst: List[str], folder_path: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze the scripts, reusing the results held in memory for the ones that didn't change.
+
+        Args:
+            engine [Engine]: the engine of the request
+            scripts_lst [List[str]]: the scripts to be analyzed
+            folder_path [Optional[str]]: the folder the scripts were listed from, whose other scripts held in
+            memory are gone and dropped (if provided)
+
+        Returns:
+            [Dict[str, Any]]: the report entry of each script (None if it couldn't be processed), along
+            with the number of scripts answered from memory or the cache and the number of scripts parsed
+        """
+
+        def result_key(script: str) -> Tuple:
+            return script, engine.report_type, engine.language, engine.fast
+
+        stats = {script: _stat_key(script) for script in scripts_lst}
+
+        # the lock is only held to read and update the results held in memory, not while parsing, so a
+        # request over a few scripts isn't held back by another one parsing a whole folder
+        with self.lock:
+            fresh = {}
+
+            for script in scripts_lst:
+                held_stat, held_entry = self.results.get(result_key(script), (None, None))
+
+                if stats[script] is not None and held_stat == stats[script]:
+                    fresh[script] = held_entry
+
+        stale_lst = [script for script in scripts_lst if script not in fresh]
+        parsed = dict(zip(stale_lst, engine._map_scripts(stale_lst)))
+
+        with self.lock:
+            entries = []
+
+            for script in scripts_lst:
+                key = result_key(script)
+                entry = fresh[script] if script in fresh else parsed[script]
+                entries.append((script, entry))
+
+                # the scripts that can't be reached aren't worth keeping, the others become the most recent
+                # (unless another request dropped them in between)
+                if stats[script] is None:
+                    self.results.pop(key, None)
+                elif script in parsed:
+                    self.results[key] = (stats[script], entry)
+                    self.results.move_to_end(key)
+                elif key in self.results:
+                    self.results.move_to_end(key)
+
+            if folder_path is not None:
+                self._evict_gone(folder_path, set(scripts_lst), result_key("")[1:])
+
+            while len(self.results) > self.max_results:
+                self.results.popitem(last=False)
+
+        if engine.cache is not None and engine.cache_misses:
+            engine.cache.prune()
+
+        return {
+            "entries": [
+                [script, engine._report_entry(script, entry) if entry is not None else None]
+                for script, entry in entries
+            ],
+            "cache_hits": len(scripts_lst) - len(stale_lst) + engine.cache_hits,
+            "cache_misses": len(stale_lst) - engine.cache_hits,
+        }
+
+    def _evict_gone(self, folder_path: str, scripts: set[str], options: Tuple):
+        """
+        Drop the results of the scripts of a folder that are no longer listed in it (i.e. deleted, moved or
+        excluded since), among the ones analyzed with the same options.
+
+        Args:
+            folder_path [str]: the folder the scripts were listed from
+            scripts [set[str]]: the scripts listed
+            options [Tuple]: the report type, language and fast option the scripts were listed with
+        """
+
+        prefix = os.path.join(folder_path, "")
+
+        for key in [
+            key
+            for key in self.results
+            if key[1:] == options and key[0].startswith(prefix) and key[0] not in scripts
+        ]:
+            del self.results[key]
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Answer a request.
+
+        Args:
+            request [Dict[str, Any]]: the request
+
+        Returns:
+            [Dict[str, Any]]: the response
+        """
+
+        match request.get("command"):
+            case "ping":
+                return {"ok": True, "version": __version__, "pid": os.getpid()}
+
+            case "report":
+                engine = self._engine(request, request["path"])
+                scripts_lst = engine._list_scripts(engine.folder_path)
+
+                return {"ok": True, **self._analyze(engine, scripts_lst, engine.folder_path)}
+
+            case "analyze":
+                engine = self._engine(request)
+                extensions = engine._file_extensions()
+                scripts_lst = [path for path in request["paths"] if path.endswith(extensions)]
+
+                return {"ok": True, **self._analyze(engine, scripts_lst)}
+
+            case "shutdown":
+                # shutdown waits for the serving loop to stop, so it can't be called from the loop itself
+                threading.Thread(target=self.shutdown).start()
+
+                return {"ok": True}
+
+            case command:
+                return {"ok": False, "error": f"Invalid command: {command}"}
+
+
+def _remove_stale_socket(socket_path: str):
+    """
+    Remove the socket file left behind by a daemon that is no longer running, if any.
+
+    Only a socket of the current user is ever removed: any other file found at the path is left untouched.
+
+    Args:
+        socket_path [str]: the path to the unix domain socket
+
+    Raises:
+        ValueError: if the path is taken by a running daemon, by a file that isn't a socket or by a socket
+        of another user
+    """
+
+    try:
+        stat_result = os.lstat(socket_path)
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISSOCK(stat_result.st_mode):
+        raise ValueError(f"{socket_path} already exists and is not a socket")
+
+    if stat_result.st_uid != os.getuid():
+        raise ValueError(f"{socket_path} is a socket of another user")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            pass
+        else:
+            raise ValueError(f"A daemon is already listening on {socket_path}")
+
+    os.remove(socket_path)
+
+
+def serve(
+    socket_path: str,
+    jobs: Optional[int] = None,
+    cache_dir: Optional[str] = None,
+    cache_size: int = ResultCache.DEFAULT_MAX_SIZE,
+):
+    """
+    Run the daemon until it's interrupted or asked to shut down.
+
+    A socket file left behind by a daemon of the current user that is no longer running is replaced.
+
+    Args:
+        socket_path [str]: the path to the unix domain socket to listen on
+        jobs [Optional[int]]: the number of worker processes used to analyze the scripts
+        cache_dir [Optional[str]]: the path to the results cache folder (no cache is used if not provided)
+        cache_size [int]: the maximum size of the results cache in bytes
+
+    Raises:
+        ValueError: if the path is taken by a running daemon, by a file that isn't a socket or by a socket
+        of another user
+    """
+
+    _remove_stale_socket(socket_path)
+
+    server = AnalysisServer(socket_path, jobs=jobs, cache_dir=cache_dir, cache_size=cache_size)
+
+    print(f"[i] Listening on {socket_path}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,285 @@
+# Script containing the supervised pool of worker processes, which abandons the scripts whose analysis takes
+# too long or runs out of memory, instead of stalling (or bringing down) the whole run.
+
+import time
+import multiprocessing
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Callable
+from typing import Iterator
+from typing import Iterable
+from typing import Optional
+
+from collections import namedtuple
+
+from multiprocessing.connection import Connection
+from multiprocessing.connection import wait
+
+# result of a task abandoned by the pool; the reason is either 'timeout', 'memory' or 'crashed'
+Abandoned = namedtuple("Abandoned", ["reason"])
+
+# the workers are forked from a clean server process rather than from the current one, so their address
+# space (capped by the memory limit) doesn't start with the one of the current process (e.g. its report);
+# they're spawned where there's no such server (e.g. on Windows)
+CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def _work(connection: Connection, func: Callable[..., Any], memory_limit: Optional[int]):
+    """
+    Loop of a worker process: run the tasks received until there's none left.
+
+    The worker lets the pool know it's ready (by sending None) before taking any task, so a worker that
+    can't even start is told apart from one brought down by its task.
+
+    Args:
+        connection [Connection]: the connection to the pool, where the tasks come from (as (index, args),
+        or None once there's none left) and the results go back to
+        func [Callable[..., Any]]: the function run over the arguments of each task
+        memory_limit [Optional[int]]: the maximum size of the address space of the worker, in bytes
+    """
+
+    if memory_limit:
+        # imported here, as the module is not available on every platform (see RESOURCE_AVAILABLE)
+        import resource
+
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    connection.send(None)
+
+    while True:
+        task = connection.recv()
+
+        if task is None:
+            return
+
+        index, args = task
+
+        try:
+            result = func(*args)
+        except MemoryError:
+            result = Abandoned("memory")
+
+        connection.send((index, result))
+
+
+class _Worker:
+    """
+    Worker process of the pool, along with the connection to it, whether it started and the task it's
+    running (if any).
+
+    Args:
+        func [Callable[..., Any]]: the function run over the arguments of each task
+        memory_limit [Optional[int]]: the maximum size of the address space of the worker, in bytes
+    """
+
+    def __init__(self, func: Callable[..., Any], memory_limit: Optional[int]):
+        self.connection, worker_connection = CONTEXT.Pipe()
+        self.process = CONTEXT.Process(
+            target=_work, args=(worker_connection, func, memory_limit), daemon=True
+        )
+        self.process.start()
+        worker_connection.close()
+
+        self.ready = False
+        self.task: Optional[int] = None
+        self.deadline = float("inf")
+
+    def assign(self, index: int, args: Tuple, timeout: Optional[float]):
+        """
+        Hand a task over to the worker.
+
+        Args:
+            index [int]: the index of the task
+            args [Tuple]: the arguments of the task
+            timeout [Optional[float]]: the time budget of the task in seconds (no budget if not provided)
+        """
+
+        self.task = index
+        self.deadline = time.monotonic() + timeout if timeout else float("inf")
+        self.connection.send((index, args))
+
+    def exit_code(self) -> Optional[int]:
+        """
+        Get the exit code of the worker, once it died.
+
+        Returns:
+            [Optional[int]]: the exit code (negative if killed by a signal), None if it's still alive
+        """
+
+        self.process.join(timeout=1)
+
+        return self.process.exitcode
+
+    def kill(self):
+        """
+        Kill the worker straight away, whatever it's running.
+        """
+
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def stop(self):
+        """
+        Let the worker know there are no more tasks, killing it if it doesn't exit by itself.
+        """
+
+        try:
+            self.connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+
+        self.process.join(timeout=1)
+
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+        self.connection.close()
+
+
+class SupervisedPool:
+    """
+    Class containing a pool of worker processes that run one task at a time each, under supervision.
+
+    Unlike the `concurrent.futures` pools, a task that overruns its time budget is abandoned by killing
+    the worker running it (a parse can't be interrupted from within), and a worker that dies (e.g. killed
+    by the system for running out of memory) only takes its own task down; in both cases, a fresh worker
+    takes its place. When a memory limit is provided, the address space of each worker is capped to it, so
+    a task exhausting it raises a `MemoryError` in the worker, which is abandoned as well.
+
+    A worker that dies before it's ready to take any task (e.g. it can't be bootstrapped, or fails to import
+    the function) would fail every task the same way, so the pool gives up instead of respawning it.
+
+    Args:
+        func [Callable[..., Any]]: the function run over the arguments of each task (picklable)
+        workers [int]: the number of worker processes
+        timeout [Optional[float]]: the time budget of each task in seconds (no budget if not provided)
+        memory_limit [Optional[int]]: the maximum size of the address space of each worker, in bytes
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        workers: int = 1,
+        timeout: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+    ):
+        self.func = func
+        self.workers_count = max(1, workers)
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.workers: List[_Worker] = []
+
+    def __enter__(self) -> "SupervisedPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        # the workers are only let finish when the tasks were all run (otherwise, they may be running one)
+        for worker in self.workers:
+            if exc_info[0] is None:
+                worker.stop()
+            else:
+                worker.kill()
+
+        self.workers = []
+
+    def _spawn(self) -> _Worker:
+        """
+        Start a fresh worker process.
+        """
+
+        return _Worker(self.func, self.memory_limit)
+
+    def map(self, *iterables: Iterable[Any]) -> Iterator[Any]:
+        """
+        Run the function over the arguments provided, as the built-in `map` does.
+
+        The results are yielded in the same order as the arguments, regardless of the order in which the
+        workers finish; the tasks that were abandoned yield an `Abandoned` result instead.
+
+        Args:
+            iterables [Iterable[Any]]: the arguments of the tasks, one iterable per positional argument
+
+        Returns:
+            [Iterator[Any]]: the result of each task
+
+        Raises:
+            RuntimeError: if a worker dies before it's ready to take any task
+        """
+
+        tasks = list(zip(*iterables))
+        results: Dict[int, Any] = {}
+        pending = iter(range(len(tasks)))
+        next_index = 0
+
+        while len(self.workers) < min(self.workers_count, len(tasks)):
+            self.workers.append(self._spawn())
+
+        def assign(worker: _Worker):
+            index = next(pending, None)
+
+            if index is not None:
+                worker.assign(index, tasks[index], self.timeout)
+
+        for worker in self.workers:
+            assign(worker)
+
+        while next_index < len(tasks):
+            busy = [worker for worker in self.workers if worker.task is not None]
+            deadline = min(worker.deadline for worker in busy)
+            timeout = None if deadline == float("inf") else max(0.0, deadline - time.monotonic())
+
+            ready = wait(
+                [worker.connection for worker in busy] + [worker.process.sentinel for worker in busy],
+                timeout=timeout,
+            )
+
+            for position, worker in enumerate(self.workers):
+                if worker.task is None:
+                    continue
+
+                abandoned = None
+
+                if worker.connection in ready:
+                    try:
+                        message = worker.connection.recv()
+                    except (EOFError, OSError):
+                        abandoned = Abandoned("crashed")
+                    else:
+                        if message is None:
+                            # the worker started, its task is still running
+                            worker.ready = True
+                            continue
+
+                        index, result = message
+                        results[index] = result
+                        worker.task = None
+
+                elif worker.process.sentinel in ready:
+                    abandoned = Abandoned("crashed")
+
+                elif worker.deadline <= time.monotonic():
+                    abandoned = Abandoned("timeout")
+
+                if abandoned == Abandoned("crashed") and not worker.ready:
+                    raise RuntimeError(
+                        f"A worker process exited with code {worker.exit_code()} before taking any task"
+                    )
+
+                if abandoned is not None:
+                    results[worker.task] = abandoned
+                    worker.kill()
+                    worker = self.workers[position] = self._spawn()
+
+                if worker.task is None:
+                    assign(worker)
+
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
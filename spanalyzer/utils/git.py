@@ -0,0 +1,92 @@
+# Script containing the git operations that will be used to narrow down the scripts to analyze
+
+import os
+import subprocess
+
+from typing import List
+from typing import Tuple
+
+
+def _git(repo_path: str, *args: str) -> str:
+    """
+    Run a git command on the repository provided.
+
+    Args:
+        repo_path (str): path to a folder within the git repository
+        args (str): arguments of the git command
+
+    Returns:
+        str: the output of the command
+
+    Raises:
+        ValueError: if the command fails (e.g. the folder is not within a git repository)
+    """
+
+    try:
+        result = subprocess.run(
+            ["git", "-C", repo_path, *args],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, "stderr", None) or str(e)
+        raise ValueError(f"Failed to run git {' '.join(args)}: {stderr.strip()}")
+
+    return result.stdout
+
+
+def changed_files(folder_path: str, ref: str) -> Tuple[List[str], List[str]]:
+    """
+    List the files that differ between the working tree and the git reference provided.
+
+    The changes include the committed, staged and unstaged modifications, as well as the untracked
+    files that aren't ignored. Renamed files are reported as the deletion of the old path along with
+    the addition of the new one.
+
+    Args:
+        folder_path (str): path to a folder within the git repository
+        ref (str): the git reference to compare against (e.g. 'origin/main')
+
+    Returns:
+        Tuple[List[str], List[str]]: the absolute paths of the files that were added or modified, and
+        the absolute paths of the files that were deleted
+
+    _Example_:
+        >>> changed_files('path/to/repo', 'origin/main')
+        (['/abs/path/to/repo/new.py', '/abs/path/to/repo/renamed.py'], ['/abs/path/to/repo/old.py'])
+    """
+
+    toplevel = _git(folder_path, "rev-parse", "--show-toplevel").strip()
+
+    diff_output = _git(
+        toplevel, "diff", "--name-status", "-M", "-z", ref, "--"
+    ).split("\0")
+    untracked_output = _git(
+        toplevel, "ls-files", "--others", "--exclude-standard", "-z"
+    ).split("\0")
+
+    changed, deleted = [], []
+
+    idx = 0
+    while idx < len(diff_output) - 1:
+        status = diff_output[idx]
+
+        if status[0] in ("R", "C"):
+            old_path, new_path = diff_output[idx + 1], diff_output[idx + 2]
+            if status[0] == "R":
+                deleted.append(old_path)
+            changed.append(new_path)
+            idx += 3
+            continue
+
+        path = diff_output[idx + 1]
+        (deleted if status[0] == "D" else changed).append(path)
+        idx += 2
+
+    changed.extend(path for path in untracked_output if path)
+
+    return (
+        [os.path.join(toplevel, path) for path in changed],
+        [os.path.join(toplevel, path) for path in deleted],
+    )
@@ -1,20 +1,34 @@
 # Script containing some operations that will be used through the spanalyzer
 
 import os
+import re
 
 import json
+import mmap
+import hashlib
 
-from copy import deepcopy
+from functools import lru_cache
+
+from bisect import bisect_right
 
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Tuple
+from typing import Union
+from typing import Iterator
+from typing import Callable
+from typing import Optional
+from typing import Pattern
+from typing import FrozenSet
 
 from spanalyzer.python.script import FunctionSpecs
 from spanalyzer.python.constants.keywords import PythonTelemetryKeywords
 
 from spanalyzer.constants.telemetry import TelemetryCall
 
+from spanalyzer.constants.exceptions import ExcludedPaths
+
 
 def conciliation(
     functions_lst: List[FunctionSpecs], telemetry_lst: Dict[str, Dict]
@@ -22,6 +36,10 @@ def conciliation(
     """
     Function that will be used to conciliate the functions and the telemetry details.
 
+    Each telemetry item is assigned to the innermost function whose range contains its line, or kept at the
+    script level if there's none. The functions are indexed by their line ranges, so the conciliation takes
+    O((calls + functions) log functions) rather than checking every item against every function.
+
     Args:
         functions_lst [List[FunctionSpecs]]: list of functions with their specs
         telemetry_lst [Dict[str, Dict]]: dictionary of telemetry details
@@ -112,42 +130,84 @@ def conciliation(
         }
     """
 
-    def is_in_function(value: int, function: FunctionSpecs) -> bool:
+    def build_function_index(
+        functions_lst: List[FunctionSpecs],
+    ) -> Callable[[int], Optional[FunctionSpecs]]:
         """
-        Check if the provided value is within the range of the function.
+        Build an interval index over the line ranges of the functions.
+
+        The functions are sorted by their start line (the outer functions first when sharing the same
+        start line), and each of them is linked to the closest function enclosing its start. A line is
+        then looked up by bisecting the start lines, and walking up from the last function starting
+        before it, until reaching a function that still contains it - which is the innermost one.
 
         Args:
-            value [int]: value to check
-            function [FunctionSpecs]: function to check
+            functions_lst [List[FunctionSpecs]]: list of functions with their specs
 
         Returns:
-            bool: True if the value is within the range, False otherwise
+            Callable[[int], Optional[FunctionSpecs]]: lookup of the innermost function containing a line
         """
 
-        return value in range(function.start_lineno, function.end_lineno)
+        # among functions with the very same range, the first one provided is picked
+        ordered = [
+            func
+            for _, func in sorted(
+                enumerate(functions_lst),
+                key=lambda item: (item[1].start_lineno, -item[1].end_lineno, -item[0]),
+            )
+        ]
+        starts = [func.start_lineno for func in ordered]
+
+        parents = []
+        open_functions = []
+
+        for idx, func in enumerate(ordered):
+            while open_functions and ordered[open_functions[-1]].end_lineno <= func.start_lineno:
+                open_functions.pop()
+
+            parents.append(open_functions[-1] if open_functions else -1)
+            open_functions.append(idx)
+
+        def lookup(line_number: int) -> Optional[FunctionSpecs]:
+            """
+            Get the innermost function whose range - [start_lineno, end_lineno) - contains the line.
+
+            Args:
+                line_number [int]: line to look up
+
+            Returns:
+                Optional[FunctionSpecs]: the innermost function, None if the line is outside any function
+            """
+
+            idx = bisect_right(starts, line_number) - 1
+
+            while idx >= 0 and not line_number < ordered[idx].end_lineno:
+                idx = parents[idx]
+
+            return ordered[idx] if idx >= 0 else None
 
-    base_structure = deepcopy(PythonTelemetryKeywords.get_attributes_structure())
+        return lookup
 
     output = {
-        **base_structure,
+        **PythonTelemetryKeywords.get_attributes_structure(),
         "functions": {
             func.name: {
                 "docstring": func.docstring,
-                **deepcopy(base_structure),
+                **PythonTelemetryKeywords.get_attributes_structure(),
             }
             for func in functions_lst
         },
     }
 
+    innermost_function = build_function_index(functions_lst)
+
     for key, value in telemetry_lst.items():
         for item in value:
-            matched = False
-            for func in functions_lst:
-                if is_in_function(item["line_number"], func):
-                    output["functions"][func.name][key].append(item)
-                    matched = True
-                    break
-            if not matched:
+            func = innermost_function(item["line_number"])
+
+            if func is not None:
+                output["functions"][func.name][key].append(item)
+            else:
                 output[key].append(item)
 
     return filter_empty_dict(output)
@@ -166,6 +226,21 @@ def write_json(data: Dict, path: str):
         json.dump(data, f, indent=4)
 
 
+def read_json(path: str) -> Dict:
+    """
+    Function that will load the data of a json file.
+
+    Args:
+        path [str]: path to the json file
+
+    Returns:
+        Dict: data contained in the json file
+    """
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
 def filter_empty_dict(d: Dict, empty_values: List[Any] = [None, [], {}]) -> Dict:
     """
     Remove all the entries from the dictionary that are empty.
@@ -297,3 +372,197 @@ def folder_trim(lst: List[Dict], folder_key: str = "script") -> List[Dict]:
     )
 
     return [{**item, "script": trim(item["script"], base_folder)} for item in lst]
+
+
+def is_excluded(relative_path: str, excluded_paths: set[str] = ExcludedPaths.values()) -> bool:
+    """
+    Check if any component of the path provided is one of the excluded paths.
+
+    The components are matched as a whole, so a file like 'latests.py' is not excluded by 'tests'.
+
+    Args:
+        relative_path (str): path relative to the folder under analysis
+        excluded_paths (set[str]): the paths to be excluded
+
+    Returns:
+        bool: True if the path is excluded, False otherwise
+
+    _Example_:
+        >>> is_excluded('tests/test_engine.py', {'tests'})
+        True
+        >>> is_excluded('src/latests.py', {'tests'})
+        False
+    """
+
+    return any(part in excluded_paths for part in relative_path.split(os.sep))
+
+
+def walk_scripts(
+    folder_path: str,
+    extensions: Union[str, Tuple[str, ...]],
+    excluded_paths: set[str] = ExcludedPaths.values(),
+) -> Iterator[str]:
+    """
+    Lazily yield the scripts with the extensions provided that can be found in a nested folder structure.
+
+    The excluded paths are matched against the name of each entry, and the excluded folders are pruned
+    before being descended into. The entries of each folder are visited in name order - files first,
+    followed by the subfolders - so the scripts are always yielded in the same order (see `script_sort_key`).
+    Just like `os.walk`, symbolic links to folders are not followed.
+
+    Args:
+        folder_path (str): path to the folder to be walked
+        extensions (Union[str, Tuple[str, ...]]): the extensions of the scripts to be yielded
+        excluded_paths (set[str]): the names of the files and folders to be excluded
+
+    Returns:
+        Iterator[str]: the paths to the scripts found
+
+    _Example_:
+        >>> list(walk_scripts('tree', '.py'))
+        ['tree/script_1.py', 'tree/subfolder/script_2.py', 'tree/subfolder/subsubfolder/script_3.py']
+    """
+
+    pending_folders = [folder_path]
+
+    while pending_folders:
+        current_folder = pending_folders.pop()
+
+        try:
+            with os.scandir(current_folder) as scanner:
+                entries = sorted(scanner, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subfolders = []
+
+        for entry in entries:
+            if entry.name in excluded_paths:
+                continue
+
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+
+            if is_dir:
+                if not entry.is_symlink():
+                    subfolders.append(os.path.join(current_folder, entry.name))
+            elif entry.name.endswith(extensions):
+                yield os.path.join(current_folder, entry.name)
+
+        pending_folders.extend(reversed(subfolders))
+
+
+def script_sort_key(path: str) -> Tuple[Tuple[int, str], ...]:
+    """
+    Sort key that reproduces the order in which `walk_scripts` yields the scripts.
+
+    Within each folder the files come first, followed by the subfolders, both in name order.
+
+    Args:
+        path (str): path to the script
+
+    Returns:
+        Tuple[Tuple[int, str], ...]: the sort key of the path
+
+    _Example_:
+        >>> sorted(['tree/subfolder/script_2.py', 'tree/script_1.py'], key=script_sort_key)
+        ['tree/script_1.py', 'tree/subfolder/script_2.py']
+    """
+
+    parts = path.split(os.sep)
+
+    return tuple((1, part) for part in parts[:-1]) + ((0, parts[-1]),)
+
+
+def shard_index(relative_path: str, shards_count: int) -> int:
+    """
+    Get the shard a script belongs to, out of a stable hash of its path.
+
+    The path is hashed in its posix form, so a script is assigned to the same shard regardless of the
+    machine, the python process (unlike `hash`) or the other scripts found.
+
+    Args:
+        relative_path (str): path to the script, relative to the folder under analysis
+        shards_count (int): the number of shards
+
+    Returns:
+        int: the shard of the script, from 1 to `shards_count`
+
+    _Example_:
+        >>> shard_index('subfolder/script.py', 4)
+        2
+    """
+
+    digest = hashlib.sha1(relative_path.replace(os.sep, "/").encode()).digest()
+
+    return int.from_bytes(digest[:8], "big") % shards_count + 1
+
+
+@lru_cache(maxsize=None)
+def _keywords_pattern(keywords: FrozenSet[str]) -> Pattern[bytes]:
+    """
+    Compile the pattern matching any of the keywords provided as a whole word.
+
+    Args:
+        keywords (FrozenSet[str]): the keywords to be matched
+
+    Returns:
+        Pattern[bytes]: the compiled pattern
+    """
+
+    alternatives = b"|".join(
+        re.escape(keyword.encode()) for keyword in sorted(keywords, key=len, reverse=True)
+    )
+
+    return re.compile(rb"\b(?:" + alternatives + rb")\b")
+
+
+# non-ascii bytes (identifiers may be written with characters that normalize into ascii ones) and
+# unicode escapes (java identifiers may be written with them) hide keywords from a byte-level scan
+_OBFUSCATED_PATTERN = re.compile(rb"[\x80-\xff]|\\u")
+
+
+def contains_keywords(path: str, keywords: FrozenSet[str]) -> bool:
+    """
+    Cheap byte-level check of whether the script may contain any of the keywords provided.
+
+    The raw content of the script is scanned (through mmap, without decoding it) for any keyword that
+    shows up as a whole word. This is meant to run before parsing, to skip the scripts that can't contain
+    any telemetry call.
+
+    _Guarantee_: a telemetry call is only detected when the name of the method being called matches one of
+    the keywords, and that name is an identifier of the script. Identifiers can only hide from this scan
+    when written with non-ascii characters or unicode escapes, so whenever the script contains any of those
+    it is reported as possibly containing the keywords. Hence, a False is never returned for a script in
+    which the full parse would detect a telemetry call. The check may report false positives (e.g. keywords
+    in comments or strings), which then simply go through the full parse.
+
+    Args:
+        path (str): path to the script
+        keywords (FrozenSet[str]): the keywords to look for
+
+    Returns:
+        bool: False if the script surely doesn't contain any of the keywords, True otherwise
+
+    _Example_:
+        >>> contains_keywords('script_with_spans.py', frozenset({'start_span'}))
+        True
+        >>> contains_keywords('script_without_spans.py', frozenset({'start_span'}))
+        False
+    """
+
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                return bool(
+                    _OBFUSCATED_PATTERN.search(content)
+                    or _keywords_pattern(keywords).search(content)
+                )
+
+    except (OSError, ValueError):
+        return True
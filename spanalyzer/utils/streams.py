@@ -0,0 +1,381 @@
+# Script containing the streaming readers and writers of the spanalyzer reports
+
+import re
+import json
+
+from typing import IO
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+
+# whitespace allowed in between the tokens of a json document
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class JsonlWriter:
+    """
+    Writer that streams the report one record per line (JSON Lines), as soon as each record is available.
+
+    Every record is flushed right after being written, so the records already written survive a crash
+    of the run, and the memory used doesn't grow with the size of the report.
+
+    Args:
+        path [str]: path to the jsonl file
+
+    _Example_:
+        >>> with JsonlWriter('report.jsonl') as writer:
+        ...     writer.write({'script': 'path/to/script.py', 'spans': [...]})
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+
+    def __enter__(self) -> "JsonlWriter":
+        self.file = open(self.path, "w")
+        return self
+
+    def __exit__(self, *exc_info):
+        self.file.close()
+
+    def write(self, record: Dict[str, Any]):
+        """
+        Write a single record into the file.
+
+        Args:
+            record [Dict[str, Any]]: the record to be written
+        """
+
+        self.file.write(json.dumps(record))
+        self.file.write("\n")
+        self.file.flush()
+
+
+class JsonWriter:
+    """
+    Writer that streams a report into a single json document, one record at a time.
+
+    The document is the same as the one written by `write_json` (with the same indentation) out of the
+    whole report: when `script_key` is provided, the records are written as an object keyed by their
+    script (the layout of the detailed report), otherwise as an array of records.
+
+    Args:
+        path [str]: path to the json file
+        script_key [Optional[str]]: key of the script path in each record
+
+    _Example_:
+        >>> with JsonWriter('report.json') as writer:
+        ...     writer.write({'script': 'path/to/script.py', 'spans': [...]})
+    """
+
+    def __init__(self, path: str, script_key: Optional[str] = "script"):
+        self.path = path
+        self.script_key = script_key
+        self.file = None
+        self.empty = True
+
+    def __enter__(self) -> "JsonWriter":
+        self.file = open(self.path, "w")
+        self.file.write("{" if self.script_key else "[")
+        return self
+
+    def __exit__(self, *exc_info):
+        closing = "}" if self.script_key else "]"
+
+        self.file.write(closing if self.empty else f"\n{closing}")
+        self.file.close()
+
+    def write(self, record: Dict[str, Any]):
+        """
+        Write a single record into the document.
+
+        Args:
+            record [Dict[str, Any]]: the record to be written
+        """
+
+        if self.script_key:
+            record = dict(record)
+            prefix = f"{json.dumps(record.pop(self.script_key))}: "
+        else:
+            prefix = ""
+
+        # the record is nested one level deep, so all its lines (but the first) are indented once more
+        value = json.dumps(record, indent=4).replace("\n", "\n    ")
+
+        self.file.write(f"{'' if self.empty else ','}\n    {prefix}{value}")
+        self.empty = False
+
+
+class _JsonStream:
+    """
+    Incremental reader of a json document, which only holds in memory the value being read.
+
+    Args:
+        file [IO[str]]: the json file
+        chunk_size [int]: the number of characters read at once
+    """
+
+    def __init__(self, file: IO[str], chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        """
+        Read the next chunk of the file, dropping the part of the buffer already read.
+
+        Returns:
+            bool: True if the buffer was extended, False if the end of the file was reached
+        """
+
+        chunk = self.file.read(self.chunk_size)
+
+        if not chunk:
+            return False
+
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+
+        return True
+
+    def peek(self) -> str:
+        """
+        Get the next character that is not whitespace, without consuming it.
+
+        Returns:
+            str: the next character
+        """
+
+        while True:
+            self.pos = JSON_WHITESPACE.match(self.buffer, self.pos).end()
+
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+
+            if not self._fill():
+                raise ValueError(f"Unexpected end of the json document: {self.file.name}")
+
+    def consume(self, expected: str) -> str:
+        """
+        Consume the next character that is not whitespace, which must be one of the expected ones.
+
+        Args:
+            expected [str]: the characters expected
+
+        Returns:
+            str: the character consumed
+        """
+
+        char = self.peek()
+
+        if char not in expected:
+            raise ValueError(
+                f"Invalid json document: {self.file.name} (found {char!r} instead of {expected!r})"
+            )
+
+        self.pos += 1
+
+        return char
+
+    def decode(self) -> Any:
+        """
+        Decode the next value of the document.
+
+        Returns:
+            Any: the value decoded
+        """
+
+        self.peek()
+
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+
+            # a value ending with the buffer (e.g. a number) may continue in the next chunk
+            if end < len(self.buffer) or not self._fill():
+                self.pos = end
+                return value
+
+
+def iter_json_records(
+    path: str, script_key: str = "script", chunk_size: int = 64 * 1024
+) -> Iterator[Dict[str, Any]]:
+    """
+    Read the records of a json report, one at a time, without loading the whole document.
+
+    An object keyed by script (the layout of the detailed report) yields one record per script, with the
+    script path under `script_key`; an array yields its items as they are.
+
+    Args:
+        path [str]: path to the json file
+        script_key [str]: key of the script path in each record
+        chunk_size [int]: the number of characters read at once
+
+    Returns:
+        Iterator[Dict[str, Any]]: the records of the file
+
+    _Example_:
+        Given the following json file:
+        ```
+        {"path/to/script_1.py": {"spans": [...]}, "path/to/script_2.py": {"functions": {...}}}
+        ```
+
+        The records will be yielded as:
+        ```python
+        {"script": "path/to/script_1.py", "spans": [...]}
+        {"script": "path/to/script_2.py", "functions": {...}}
+        ```
+    """
+
+    with open(path, "r") as f:
+        stream = _JsonStream(f, chunk_size)
+
+        keyed = stream.consume("{[") == "{"
+        closing = "}" if keyed else "]"
+
+        if stream.peek() == closing:
+            return
+
+        while True:
+            if keyed:
+                script = stream.decode()
+                stream.consume(":")
+                yield {script_key: script, **stream.decode()}
+            else:
+                yield stream.decode()
+
+            if stream.consume(f",{closing}") == closing:
+                return
+
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read the records of a jsonl file, one at a time.
+
+    Args:
+        path [str]: path to the jsonl file
+
+    Returns:
+        Iterator[Dict[str, Any]]: the records of the file
+    """
+
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def jsonl_to_report(path: str, script_key: str = "script") -> Dict[str, Dict]:
+    """
+    Rebuild the classic layout of the detailed report (i.e. a dictionary keyed by script) from a jsonl file.
+
+    Args:
+        path [str]: path to the jsonl file
+        script_key [str]: key of the script path in each record
+
+    Returns:
+        Dict[str, Dict]: the detailed report
+
+    _Example_:
+        Given the following jsonl file:
+        ```
+        {"script": "path/to/script_1.py", "spans": [...]}
+        {"script": "path/to/script_2.py", "functions": {...}}
+        ```
+
+        The report will be returned as:
+        ```python
+        {
+            "path/to/script_1.py": {"spans": [...]},
+            "path/to/script_2.py": {"functions": {...}},
+        }
+        ```
+    """
+
+    return {record.pop(script_key): record for record in iter_jsonl(path)}
+
+
+def _first_char(file: IO) -> str:
+    """
+    Read a file up to its first character that isn't whitespace.
+
+    Args:
+        file [IO]: the file to be read
+
+    Returns:
+        str: the first character that isn't whitespace, empty if there's none left
+    """
+
+    while char := file.read(1):
+        if not char.isspace():
+            return char
+
+    return ""
+
+
+def is_jsonl(path: str) -> bool:
+    """
+    Check if a report is a jsonl file, i.e. its first line is a whole record (led by its script).
+
+    The first line of a json report (written with indentation) is never a whole json document, and the
+    values of a compact one are the report entries, not the path of a script. An empty report is an empty
+    jsonl file (e.g. the one of a shard, or of a `--since` run, without any script).
+
+    Args:
+        path [str]: path to the report
+
+    Returns:
+        bool: True if the report is a jsonl file, False otherwise
+    """
+
+    with open(path, "r") as f:
+        first_line = f.readline()
+
+        if not first_line.strip():
+            return not _first_char(f)
+
+    try:
+        record = json.loads(first_line)
+    except ValueError:
+        return False
+
+    return isinstance(record, dict) and isinstance(record.get("script"), str)
+
+
+def iter_report_records(path: str, script_key: str = "script") -> Iterator[Dict[str, Any]]:
+    """
+    Read the records of a report, one per script and one at a time, whether it's a json or a jsonl file.
+
+    Args:
+        path [str]: path to the report
+        script_key [str]: key of the script path in each record
+
+    Returns:
+        Iterator[Dict[str, Any]]: the records of the report, in the order they were written
+    """
+
+    return iter_jsonl(path) if is_jsonl(path) else iter_json_records(path, script_key)
+
+
+def is_basic_report(path: str) -> bool:
+    """
+    Check if a report holds the rows of the basic report, written as an array (the detailed report is an
+    object keyed by script, or a jsonl file, which is empty when there are no records).
+
+    Args:
+        path [str]: path to the report
+
+    Returns:
+        bool: True if the report holds basic rows, False otherwise
+    """
+
+    with open(path, "r") as f:
+        return _first_char(f) == "["
@@ -0,0 +1,227 @@
+# Script containing the watch mode, which keeps the detailed report up to date while the scripts change.
+
+import os
+import sys
+import time
+
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Optional
+
+from spanalyzer.engine import Engine
+
+from spanalyzer.backends import load_backend
+
+from spanalyzer.reports import terminal_report
+
+from spanalyzer.utils.streams import JsonlWriter
+
+from spanalyzer.utils.operations import write_json
+from spanalyzer.utils.operations import folder_trim
+
+# ANSI sequence that clears the terminal and moves the cursor to its top left corner
+CLEAR_SCREEN = "\033[2J\033[H"
+
+# minimum number of seconds between two prunes of the results cache, which walks the whole cache
+PRUNE_INTERVAL = 60.0
+
+
+class Watcher:
+    """
+    Class that keeps the detailed report of a folder up to date while its scripts are edited.
+
+    The folder is polled every `interval` seconds: the scripts are listed again and their modification
+    time and size compared against the ones of the previous poll, so only the scripts that were added
+    or modified are analyzed again. The report entry of every script is held in memory between polls,
+    hence the report (and the terminal summary) can be rewritten without analyzing the other scripts.
+
+    The results cache (if any) is pruned along with the polls that wrote into it, at most every
+    `PRUNE_INTERVAL` seconds, so it doesn't grow without bound over a long session.
+
+    Args:
+        engine [Engine]: the engine of the folder to be watched (its report type must be 'detailed')
+        interval [float]: the number of seconds between two polls
+    """
+
+    def __init__(self, engine: Engine, interval: float = 1.0):
+        """
+        Initialize the watcher.
+        """
+
+        if engine.report_type != "detailed":
+            raise ValueError(f"Invalid report type for the watch mode: {engine.report_type}")
+
+        self.engine = engine
+        self.interval = interval
+
+        self.scripts_lst: List[str] = []
+        # None until the first poll, so the report of an empty folder is only written once
+        self.stats: Optional[Dict[str, Tuple[int, int]]] = None
+        self.results: Dict[str, Optional[Dict]] = {}
+
+        self.pruned_at = time.monotonic()
+        self.pruned_misses = 0
+
+    def _snapshot(self) -> Tuple[List[str], Dict[str, Tuple[int, int]]]:
+        """
+        List the scripts of the folder along with their modification time and size.
+
+        Returns:
+            [Tuple[List[str], Dict[str, Tuple[int, int]]]]: the scripts (in the order of a full run), and
+            the modification time (in nanoseconds) and size of each one of them
+        """
+
+        scripts_lst, stats = [], {}
+
+        for script in self.engine._list_scripts(self.engine.folder_path):
+            try:
+                stat = os.stat(script)
+            except OSError:
+                # deleted in between the listing and the stat call
+                continue
+
+            scripts_lst.append(script)
+            stats[script] = (stat.st_mtime_ns, stat.st_size)
+
+        return scripts_lst, stats
+
+    def poll(self) -> bool:
+        """
+        Analyze the scripts that changed since the previous poll, and rewrite the report if needed.
+
+        Returns:
+            [bool]: True if the report was rewritten, False if no script changed
+        """
+
+        scripts_lst, stats = self._snapshot()
+        previous_stats = self.stats or {}
+
+        changed_lst = [
+            script for script in scripts_lst if previous_stats.get(script) != stats[script]
+        ]
+        deleted_lst = [script for script in previous_stats if script not in stats]
+
+        if self.stats is not None and not changed_lst and not deleted_lst:
+            return False
+
+        for script, script_report in zip(changed_lst, self.engine._map_scripts(changed_lst)):
+            self.results[script] = (
+                self.engine._report_entry(script, script_report)
+                if script_report is not None
+                else None
+            )
+
+        for script in deleted_lst:
+            self.results.pop(script, None)
+
+        self.scripts_lst = scripts_lst
+        self.stats = stats
+
+        self._write_report()
+        self._prune_cache()
+
+        return True
+
+    def _prune_cache(self):
+        """
+        Prune the results cache if it was written into since the previous prune, and that was long enough
+        ago (see `PRUNE_INTERVAL`).
+        """
+
+        cache = self.engine.cache
+
+        if cache is None or self.engine.cache_misses == self.pruned_misses:
+            return
+
+        if time.monotonic() - self.pruned_at < PRUNE_INTERVAL:
+            return
+
+        cache.prune()
+
+        self.pruned_at = time.monotonic()
+        self.pruned_misses = self.engine.cache_misses
+
+    def _write_report(self):
+        """
+        Write the detailed report, replacing the previous one at once (so it's never read half written).
+        """
+
+        temp_path = f"{self.engine.output_path}.tmp"
+        entries = (
+            (script, self.results[script])
+            for script in self.scripts_lst
+            if self.results.get(script) is not None
+        )
+
+        if self.engine.output_format == "jsonl":
+            with JsonlWriter(temp_path) as writer:
+                for script, script_report in entries:
+                    writer.write({"script": script, **script_report})
+        else:
+            write_json(dict(entries), temp_path)
+
+        os.replace(temp_path, self.engine.output_path)
+
+    def _summarize(self, script: str, script_report: Dict) -> Dict:
+        """
+        Summarize the detailed report entry of a script into the row of the basic report.
+
+        A telemetry category is present in the script if it's used either at the script level or in any
+        of its functions (the detailed report leaves the empty categories out).
+
+        Args:
+            script [str]: the path to the script
+            script_report [Dict]: the detailed report entry of the script
+
+        Returns:
+            [Dict]: whether each telemetry category is present in the script (led by the language of the
+            script, if it was tagged)
+        """
+
+        language = self.engine._script_language(script)
+        functions = script_report.get("functions", {}).values()
+        categories = load_backend(language).Keywords.get_attributes_structure()
+
+        return self.engine._report_entry(
+            script,
+            {
+                key: bool(script_report.get(key))
+                or any(function.get(key) for function in functions)
+                for key in categories
+            },
+        )
+
+    def summary(self) -> str:
+        """
+        Build the terminal summary of the current report.
+
+        Returns:
+            [str]: the basic report table of the scripts watched
+        """
+
+        rows = [
+            {"script": script, **self._summarize(script, self.results[script])}
+            for script in self.scripts_lst
+            if self.results.get(script) is not None
+        ]
+
+        return terminal_report(folder_trim(rows)) if rows else ""
+
+    def run(self):
+        """
+        Watch the folder until interrupted, refreshing the report and the terminal summary on every change.
+        """
+
+        clear_screen = CLEAR_SCREEN if sys.stdout.isatty() else ""
+
+        try:
+            while True:
+                if self.poll():
+                    print(f"{clear_screen}{self.summary()}")
+                    print(f"\n[i] Report updated at {time.strftime('%H:%M:%S')} ({self.engine.output_path})")
+
+                time.sleep(self.interval)
+
+        except KeyboardInterrupt:
+            pass
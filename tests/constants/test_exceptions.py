@@ -15,6 +15,10 @@ class TestExcludedPaths(TestCase):
         actual = ExcludedPaths.values()
         expected = {
             "venv",
+            ".venv",
+            "virtualenv",
+            ".virtualenv",
+            "site-packages",
             "tests",
             "node_modules",
             "__pycache__",
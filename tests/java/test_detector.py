@@ -5,6 +5,7 @@ import os
 import javalang
 
 from unittest import TestCase
+from unittest.mock import patch
 
 from spanalyzer.constants.telemetry import TelemetryCall
 from spanalyzer.java.detector import JavaTelemetryDetector
@@ -604,3 +605,79 @@ class TestJavaTelemetryDetector(TestCase):
         }
 
         self.assertEqual(actual, expected)
+
+    def test_telemetry_detector_presence(self):
+        """
+        Description: check if the categories found by the presence only detection are exactly the ones
+        with calls captured by the full detection.
+        """
+
+        for code in (self.code_1, self.code_2, self.code_3, self.code_4):
+            with self.subTest(code=code[0][1]):
+                expected = {
+                    key for key, val in JavaTelemetryDetector().run(code).items() if val
+                }
+
+                self.assertEqual(JavaTelemetryDetector().run_presence(code), expected)
+
+    def test_telemetry_detector_presence_extraction_failure(self):
+        """
+        Description: check if the calls whose details can't be extracted are skipped alike by the presence
+        only detection and the full detection, without interrupting either of them.
+        """
+
+        code = list(
+            javalang.parse.parse(
+                "class Test {\n"
+                "  void instrumented() {\n"
+                "    Tracer tracer = provider.getTracer(\"tracer\");\n"
+                "    span.setAttribute(\"key\", \"value\");\n"
+                "    span.addEvent(\"event\");\n"
+                "  }\n"
+                "}\n"
+            )
+        )
+
+        def failing_extractor(node):
+            if node.member == "setAttribute":
+                raise TypeError("unhashable type: 'dict'")
+
+            return None
+
+        with patch("spanalyzer.java.detector.java_ast_extractor", failing_extractor):
+            actual = JavaTelemetryDetector().run(code)
+            presence = JavaTelemetryDetector().run_presence(code)
+
+        self.assertEqual({key for key, val in actual.items() if val}, {"tracers", "events"})
+        self.assertEqual(presence, {"tracers", "events"})
+
+    def test_telemetry_detector_presence_early_exit(self):
+        """
+        Description: check if the presence only detection stops walking the tree once every category
+        has been seen.
+        """
+
+        code = javalang.parse.parse(
+            "class Test {\n"
+            "  void instrumented() {\n"
+            "    Tracer tracer = provider.getTracer(\"tracer\");\n"
+            "    Span span = tracer.spanBuilder(\"span\").startSpan();\n"
+            "    span.setAttribute(\"key\", \"value\");\n"
+            "    span.addEvent(\"event\");\n"
+            "    counter.add(1);\n"
+            "  }\n"
+            + "  void plain() { System.out.println(\"not telemetry\"); }\n" * 50
+            + "}\n"
+        )
+
+        visited = []
+
+        def counting_tree():
+            for path, node in code:
+                visited.append(node)
+                yield path, node
+
+        actual = JavaTelemetryDetector().run_presence(counting_tree())
+
+        self.assertEqual(actual, {"tracers", "spans", "attributes", "events", "counter"})
+        self.assertLess(len(visited), len(list(code)) // 2)
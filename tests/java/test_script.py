@@ -211,6 +211,63 @@ class TestJavaScriptSniffer(TestCase):
 
             self.assertEqual(actual, expected)
 
+    def test__estimate_method_end_literals(self):
+        """
+        Description: Test that the braces within string literals, char literals and comments are not
+        taken into account when estimating the method end line.
+        """
+
+        test_code = """
+        public class Example {
+            public String braces() {
+                String open = "{ {";
+                char close = '}';
+                // a comment with an unmatched {
+                /* another comment
+                   with an unmatched } */
+                return open + close;
+            }
+
+            public void other() {
+            }
+        }
+        """
+
+        with patch("builtins.open", mock_open(read_data=test_code)):
+            sniffer = JavaScriptSniffer("Dummy.java")
+
+            self.assertEqual(sniffer._estimate_method_end(3), 10)
+            self.assertEqual(sniffer._estimate_method_end(12), 13)
+            self.assertEqual(sniffer._estimate_method_end(1), 14)
+
+    def test_visit_methods_without_body(self):
+        """
+        Description: Test that the methods without a body (abstract and interface methods) end at their
+        start line, instead of at the end of the next block.
+        """
+
+        test_code = """
+        public abstract class Example {
+            public abstract void first();
+
+            public void second() {
+                int a = 1;
+            }
+        }
+        """
+
+        with patch("builtins.open", mock_open(read_data=test_code)):
+            sniffer = JavaScriptSniffer("Test.java")
+            sniffer.visit_methods(javalang.parse.parse(test_code), [])
+
+            actual = sniffer.functions_list
+            expected = [
+                FunctionSpecs(name="first", docstring=None, start_lineno=3, end_lineno=3),
+                FunctionSpecs(name="second", docstring=None, start_lineno=5, end_lineno=7),
+            ]
+
+            self.assertEqual(actual, expected)
+
     def test__extract_comments_basic(self):
         """
         Description: Test that the function can duly capture a function with a very basic docstring.
@@ -285,6 +342,29 @@ class TestJavaScriptSniffer(TestCase):
 
             self.assertEqual(actual, expected)
 
+    def test__extract_comments_string_literal(self):
+        """
+        Description: Test that a JavaDoc opening within a string literal isn't taken as a comment.
+        """
+
+        test_code = """
+        public class TestClass {
+            String text =
+                "/** not a comment */";
+
+            public void testFunction() {
+            }
+        }
+        """
+
+        with patch("builtins.open", mock_open(read_data=test_code)):
+            sniffer = JavaScriptSniffer("Dummy.java")
+
+            actual = sniffer._extract_comments()
+            expected = []
+
+            self.assertEqual(actual, expected)
+
     def test_visit_methods_basic(self):
         """
         Description: Test that visit_methods extracts method name, docstring, and line numbers.
@@ -443,3 +523,31 @@ class TestJavaScriptSniffer(TestCase):
         ]
 
         self.assertEqual(actual, expected)
+
+    def test_run_pre_parsed_tree(self):
+        """
+        Description: Test that run produces the same output when the source code and the parsed tree are
+        provided upfront, without reading nor parsing the file again.
+        """
+
+        with open(self.script_2, "r") as f:
+            source_code = f.read()
+
+        tree = javalang.parse.parse(source_code)
+
+        with patch("builtins.open") as open_mock, patch(
+            "javalang.parse.parse"
+        ) as parse_mock:
+            sniffer = JavaScriptSniffer(self.script_2, source_code=source_code)
+            sniffer.run(tree)
+
+            open_mock.assert_not_called()
+            parse_mock.assert_not_called()
+
+        reference_sniffer = JavaScriptSniffer(self.script_2)
+        reference_sniffer.run()
+
+        actual = sniffer.functions_list
+        expected = reference_sniffer.functions_list
+
+        self.assertEqual(actual, expected)
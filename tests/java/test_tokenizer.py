@@ -0,0 +1,140 @@
+# Unitary tests for the Java tokenizer
+
+import os
+
+import javalang
+
+from unittest import TestCase
+
+from spanalyzer.java.tokenizer import JavaComment
+from spanalyzer.java.tokenizer import tokenize
+from spanalyzer.java.tokenizer import parse_tokens
+from spanalyzer.java.tokenizer import elide_method_bodies
+
+from spanalyzer.java.constants.keywords import JavaTelemetryKeywords
+
+
+class TestJavaTokenizer(TestCase):
+    def setUp(self):
+        """
+        Description: Set up the test environment.
+        """
+
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+        with open(
+            os.path.join(base_path, "tests", "samples", "java", "script_2.java"), "r"
+        ) as f:
+            self.source_code = f.read()
+
+    def test_tokenize_tokens(self):
+        """
+        Description: Test that the tokens are the same as the ones of the javalang tokenizer.
+        """
+
+        actual = [
+            (type(token), token.value, token.position, token.javadoc)
+            for token in tokenize(self.source_code).tokens
+        ]
+        expected = [
+            (type(token), token.value, token.position, token.javadoc)
+            for token in javalang.tokenizer.tokenize(self.source_code)
+        ]
+
+        self.assertEqual(actual, expected)
+
+    def test_tokenize_comments(self):
+        """
+        Description: Test that the comments are kept along with their positions, leaving out the
+        comment markers within string literals.
+        """
+
+        test_code = (
+            "// line comment\n"
+            "public class Example {\n"
+            '    String text = "/** not a comment */";\n'
+            "    /**\n"
+            "     * JavaDoc.\n"
+            "     */\n"
+            "    void example() { /* block */ }\n"
+            "}\n"
+        )
+
+        actual = tokenize(test_code).comments
+        expected = [
+            JavaComment(line=1, column=1, end_line=2, text="// line comment\n"),
+            JavaComment(
+                line=4, column=5, end_line=6, text="/**\n     * JavaDoc.\n     */"
+            ),
+            JavaComment(line=7, column=22, end_line=7, text="/* block */"),
+        ]
+
+        self.assertEqual(actual, expected)
+
+    def test_parse_tokens(self):
+        """
+        Description: Test that parsing the tokens produces the same tree as parsing the source code.
+        """
+
+        def methods(tree):
+            return [
+                (node.name, node.position, node.documentation)
+                for _, node in tree.filter(javalang.tree.MethodDeclaration)
+            ]
+
+        actual = methods(parse_tokens(tokenize(self.source_code).tokens))
+        expected = methods(javalang.parse.parse(self.source_code))
+
+        self.assertEqual(actual, expected)
+        self.assertNotEqual(actual, [])
+
+    def test_elide_method_bodies(self):
+        """
+        Description: Test that only the bodies of the methods that can't contain any telemetry call nor
+        method are left out.
+        """
+
+        test_code = """
+        public class Example {
+            private Runnable runnable = new Runnable() {
+                public void run() { int inner = 1; }
+            };
+
+            public Example() { int constructor = 1; }
+
+            public void plain() throws Exception { int a = 1; }
+
+            public void traced() { span.setAttribute("a", 1); }
+
+            public void anonymous() {
+                Runnable r = new Runnable() { public void run() { int b = 1; } };
+            }
+
+            public void local() { class Local { void run() { int c = 1; } } }
+
+            public void literal() { Class<?> type = Example.class; }
+
+            enum Kind {
+                FIRST { void run() { int d = 1; } };
+
+                void kind() { int e = 1; }
+            }
+        }
+        """
+
+        tokens = tokenize(test_code).tokens
+        elided = elide_method_bodies(tokens, JavaTelemetryKeywords.values())
+
+        actual = {token.value for token in tokens} - {token.value for token in elided}
+        expected = {"constructor", "a", "c", "type", "Class", "?", "<", ">", "e"}
+
+        self.assertEqual(actual, expected)
+
+        # the tree is still parsed, with the same methods as the one of the full parse
+        def methods(tree):
+            return [
+                (node.name, node.position)
+                for _, node in tree.filter(javalang.tree.MethodDeclaration)
+            ]
+
+        self.assertEqual(methods(parse_tokens(elided)), methods(parse_tokens(tokens)))
@@ -5,6 +5,7 @@ import os
 import ast
 
 from unittest import TestCase
+from unittest.mock import patch
 
 from spanalyzer.constants.telemetry import TelemetryCall
 
@@ -371,3 +372,111 @@ class TestPythonTelemetryDetector(TestCase):
         }
 
         self.assertEqual(actual, expected)
+
+    def test_telemetry_detector_unsupported_arguments(self):
+        """
+        Description: check if the calls whose name can't be extracted (f-strings, attributes, starred
+        arguments) and the calls to plain functions are skipped without interrupting the detection.
+        """
+
+        code = ast.parse(
+            "tracer.start_span(f'{name}')\n"
+            "tracer.start_span(self.name)\n"
+            "tracer.start_span(*args)\n"
+            "start_span('plain_function')\n"
+            "tracer.start_span(name)\n"
+            "span.set_attribute('key', 'value')\n"
+        )
+
+        detector = PythonTelemetryDetector()
+
+        actual = detector.run(code)
+        expected = {
+            "tracers": [],
+            "spans": [TelemetryCall(func="name", line_number=5, args=None)],
+            "attributes": [
+                TelemetryCall(
+                    func="set_attribute",
+                    line_number=6,
+                    args={"func": "span.set_attribute", "args": ["key", "value"]},
+                ),
+            ],
+            "events": [],
+            "counter": [],
+        }
+
+        self.assertEqual(actual, expected)
+
+    def test_telemetry_detector_unhashable_arguments(self):
+        """
+        Description: check if a call whose arguments can't be extracted (a call used as a dict key, which
+        isn't hashable once extracted) is skipped without interrupting the detection of the other calls.
+        """
+
+        code = ast.parse(
+            "tracer = trace.get_tracer('tracer')\n"
+            "with tracer.start_as_current_span('span') as span:\n"
+            "    span.set_attributes({key_for('a'): 1})\n"
+            "    span.add_event('event')\n"
+        )
+
+        actual = PythonTelemetryDetector().run(code)
+
+        self.assertEqual(actual["tracers"], [TelemetryCall(func="tracer", line_number=1)])
+        self.assertEqual(actual["spans"], [TelemetryCall(func="span", line_number=2)])
+        self.assertEqual(actual["attributes"], [])
+        self.assertEqual(len(actual["events"]), 1)
+
+    def test_telemetry_detector_presence(self):
+        """
+        Description: check if the categories found by the presence only detection are exactly the ones
+        with calls captured by the full detection, including when the details of a call can't be extracted.
+        """
+
+        code_5 = ast.parse(
+            "tracer.get_tracer(f'{name}')\n"
+            "tracer.start_span(self.name)\n"
+            "span.set_attribute('key', 'value')\n"
+        )
+        # the only attribute setting can't be extracted, so neither detection reports the attributes
+        code_6 = ast.parse(
+            "tracer = trace.get_tracer('tracer')\n"
+            "span.set_attributes({key_for('a'): 1})\n"
+            "span.add_event('event')\n"
+        )
+
+        for code in (self.code_1, self.code_2, self.code_3, self.code_4, code_5, code_6):
+            with self.subTest(code=code):
+                expected = {
+                    key for key, val in PythonTelemetryDetector().run(code).items() if val
+                }
+
+                self.assertEqual(PythonTelemetryDetector().run_presence(code), expected)
+
+    def test_telemetry_detector_presence_early_exit(self):
+        """
+        Description: check if the presence only detection stops walking the tree once every category
+        has been seen.
+        """
+
+        code = ast.parse(
+            "tracer = trace.get_tracer('tracer')\n"
+            "tracer.start_span('span')\n"
+            "span.set_attribute('key', 'value')\n"
+            "span.add_event('event')\n"
+            "counter.add(1)\n"
+            + "print('not telemetry')\n" * 100
+        )
+
+        visited = []
+
+        def counting_walk(node):
+            for child in ast.walk(node):
+                visited.append(child)
+                yield child
+
+        with patch("spanalyzer.python.detector.walk", counting_walk):
+            actual = PythonTelemetryDetector().run_presence(code)
+
+        self.assertEqual(actual, {"tracers", "spans", "attributes", "events", "counter"})
+        self.assertLess(len(visited), len(list(ast.walk(code))) // 2)
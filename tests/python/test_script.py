@@ -267,3 +267,23 @@ class TestPythonScriptSniffer(TestCase):
         ]
 
         self.assertEqual(actual, expected)
+
+    def test_script_sniffer_pre_parsed_tree(self):
+        """
+        Description: test the sniffer operating over an already parsed tree, which must produce the same
+        output as when the sniffer reads and parses the script by itself.
+        """
+
+        with open(self.script_2, "r") as file:
+            tree = ast.parse(file.read())
+
+        script_sniffer = PythonScriptSniffer(self.script_2)
+        script_sniffer.run(tree)
+
+        reference_sniffer = PythonScriptSniffer(self.script_2)
+        reference_sniffer.run()
+
+        actual = script_sniffer.functions_list
+        expected = reference_sniffer.functions_list
+
+        self.assertEqual(actual, expected)
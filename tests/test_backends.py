@@ -0,0 +1,103 @@
+# Unitary tests for the backends registry
+
+import re
+import sys
+import subprocess
+
+from unittest import TestCase
+
+from spanalyzer.backends import BACKENDS
+from spanalyzer.backends import load_backend
+from spanalyzer.backends import file_extension
+
+# generous budget for the cumulative import time of the CLI, only meant to catch startup regressions
+# (e.g. a heavy dependency being imported at the top level again)
+CLI_IMPORT_TIME_BUDGET_US = 500_000
+
+
+def import_time(module: str) -> int:
+    """
+    Measure the cumulative import time of a module in a fresh interpreter.
+
+    Args:
+        module [str]: the module to be imported
+
+    Returns:
+        [int]: the cumulative import time in microseconds
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    match = re.search(
+        rf"^import time:\s+\d+ \|\s+(\d+) \| {re.escape(module)}$",
+        result.stderr,
+        re.MULTILINE,
+    )
+
+    return int(match.group(1))
+
+
+class TestBackends(TestCase):
+    def test_file_extension(self):
+        """
+        Description: test if the file extension of each language is obtained.
+        """
+
+        self.assertEqual(file_extension("python"), ".py")
+        self.assertEqual(file_extension("java"), ".java")
+
+    def test_load_backend(self):
+        """
+        Description: test if every registered backend exposes the interface used by the engine.
+        """
+
+        for language in BACKENDS:
+            with self.subTest(language=language):
+                backend = load_backend(language)
+
+                self.assertTrue(callable(backend.tokenize))
+                self.assertTrue(callable(backend.parse))
+                self.assertTrue(callable(backend.build_sniffer))
+                self.assertTrue(hasattr(backend.Detector, "run"))
+                self.assertTrue(hasattr(backend.Keywords, "get_attributes_structure"))
+
+    def test_invalid_language(self):
+        """
+        Description: test if an unsupported language is rejected.
+        """
+
+        with self.assertRaises(ValueError):
+            file_extension("cobol")
+
+        with self.assertRaises(ValueError):
+            load_backend("cobol")
+
+    def test_cli_import_is_lazy(self):
+        """
+        Description: test if importing the CLI doesn't import any language backend, nor the process pool.
+        """
+
+        code = (
+            "import sys, spanalyzer.cli; "
+            "print(','.join(sorted(m for m in sys.modules if m.startswith(("
+            "'javalang', 'spanalyzer.java', 'spanalyzer.python.backend', 'concurrent.futures.process'"
+            ")))))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_cli_import_time_budget(self):
+        """
+        Description: test if the import time of the CLI stays within its budget (best of three runs).
+        """
+
+        actual = min(import_time("spanalyzer.cli") for _ in range(3))
+
+        self.assertLess(actual, CLI_IMPORT_TIME_BUDGET_US)
@@ -0,0 +1,100 @@
+# Unitary tests for the cache module
+
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from spanalyzer.cache import ResultCache
+
+
+class TestResultCache(TestCase):
+    def setUp(self):
+        """
+        Description: set up the test environment.
+        """
+
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+
+    def test_key(self):
+        """
+        Description: test if the key depends on both the content and the language of the script.
+        """
+
+        python_key = ResultCache.key("print('test')", "python")
+
+        self.assertEqual(python_key, ResultCache.key("print('test')", "python"))
+        self.assertNotEqual(python_key, ResultCache.key("print('test')", "java"))
+        self.assertNotEqual(python_key, ResultCache.key("print('other')", "python"))
+
+    def test_get_set(self):
+        """
+        Description: test if an entry stored in the cache is retrieved as it was stored.
+        """
+
+        cache = ResultCache(self.cache_dir)
+        key = ResultCache.key("print('test')", "python")
+        entry = {
+            "telemetry": {"spans": [{"func": "span", "line_number": 1, "args": None}]},
+            "functions": [["function_1", None, 1, 10]],
+        }
+
+        cache.set(key, entry)
+
+        actual = cache.get(key)
+        expected = entry
+
+        self.assertEqual(actual, expected)
+
+    def test_get_missing(self):
+        """
+        Description: test if a missing entry is reported as None.
+        """
+
+        cache = ResultCache(self.cache_dir)
+
+        actual = cache.get(ResultCache.key("print('test')", "python"))
+        expected = None
+
+        self.assertEqual(actual, expected)
+
+    def test_set_not_serializable(self):
+        """
+        Description: test if an entry that can't be serialized is skipped without leaving files behind.
+        """
+
+        cache = ResultCache(self.cache_dir)
+        key = ResultCache.key("print(b'test')", "python")
+
+        cache.set(key, {"telemetry": {"events": [{"args": b"test"}]}})
+
+        self.assertIsNone(cache.get(key))
+        self.assertEqual(
+            [file for _, _, files in os.walk(self.cache_dir) for file in files], []
+        )
+
+    def test_prune(self):
+        """
+        Description: test if the least recently used entries are evicted once the cache outgrows its size.
+        """
+
+        keys = [ResultCache.key(f"print({idx})", "python") for idx in range(3)]
+
+        cache = ResultCache(self.cache_dir)
+        for idx, key in enumerate(keys):
+            cache.set(key, {"telemetry": {"spans": []}})
+            os.utime(cache._entry_path(key), ns=(idx * 10**9, idx * 10**9))
+
+        # reading the oldest entry marks it as the most recently used one
+        cache.get(keys[0])
+
+        entry_size = os.path.getsize(cache._entry_path(keys[0]))
+        cache.max_size = 2 * entry_size
+        cache.prune()
+
+        actual = [cache.get(key) is not None for key in keys]
+        expected = [True, False, True]
+
+        self.assertEqual(actual, expected)
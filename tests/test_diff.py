@@ -0,0 +1,215 @@
+# Unitary tests for the comparison of two detailed reports
+
+import io
+import os
+import shutil
+import tempfile
+
+from contextlib import redirect_stdout
+
+from unittest import TestCase
+
+from spanalyzer.diff import ItemChange
+from spanalyzer.diff import ScriptDiff
+from spanalyzer.diff import diff_records
+from spanalyzer.diff import diff_reports
+from spanalyzer.diff import run_diff
+
+from spanalyzer.utils.streams import JsonlWriter
+
+from spanalyzer.utils.operations import write_json
+
+
+def call(func: str, line_number: int, args=None) -> dict:
+    """
+    Build a telemetry item of the detailed report.
+    """
+
+    return {"func": func, "line_number": line_number, "args": args, "keywords": None}
+
+
+class TestDiff(TestCase):
+    def setUp(self):
+        """
+        Description: set up the test environment, with an old and a new detailed report.
+        """
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+        self.old_path = os.path.join(self.temp_dir, "old.json")
+        self.new_path = os.path.join(self.temp_dir, "new.json")
+
+        self.old_report = {
+            "src/removed.py": {"tracers": [call("tracer", 1)]},
+            "src/service.py": {
+                "tracers": [call("tracer", 3)],
+                "functions": {
+                    "handle": {
+                        "docstring": None,
+                        "spans": [call("handle", 10)],
+                        "attributes": [
+                            call("set_attribute", 11, {"args": ["user", "id"]}),
+                            call("set_attribute", 12, {"args": ["user", "id"]}),
+                        ],
+                    },
+                    "process": {
+                        "docstring": "Process the request.",
+                        "spans": [call("process", 20)],
+                        "counter": [call("add", 21, {"args": [1]})],
+                    },
+                },
+            },
+            "src/unchanged.py": {"spans": [call("span", 5)]},
+        }
+        self.new_report = {
+            "src/added.py": {"events": [call("add_event", 2, {"args": ["started"]})]},
+            "src/service.py": {
+                "tracers": [call("tracer", 5)],
+                "functions": {
+                    "handle": {
+                        "docstring": None,
+                        "spans": [call("handle", 12)],
+                        "attributes": [
+                            call("set_attribute", 13, {"args": ["user", "id"]}),
+                            call("set_attribute", 14, {"args": ["user", "name"]}),
+                        ],
+                    },
+                    "process": {"docstring": "Process the request."},
+                },
+            },
+            "src/unchanged.py": {"spans": [call("span", 5)]},
+        }
+
+        write_json(self.old_report, self.old_path)
+        write_json(self.new_report, self.new_path)
+
+    def test_diff_reports(self):
+        """
+        Description: test if the items added and removed are listed per script and function, ignoring
+        the ones that only moved to another line, and the functions that lost all instrumentation are
+        flagged.
+        """
+
+        actual = list(diff_reports(self.old_path, self.new_path))
+        expected = [
+            ScriptDiff(
+                script="src/added.py",
+                status="added",
+                added=[
+                    ItemChange(None, "events", call("add_event", 2, {"args": ["started"]})),
+                ],
+                removed=[],
+                uninstrumented=[],
+            ),
+            ScriptDiff(
+                script="src/removed.py",
+                status="removed",
+                added=[],
+                removed=[ItemChange(None, "tracers", call("tracer", 1))],
+                uninstrumented=[],
+            ),
+            ScriptDiff(
+                script="src/service.py",
+                status="modified",
+                added=[
+                    ItemChange(
+                        "handle", "attributes", call("set_attribute", 14, {"args": ["user", "name"]})
+                    ),
+                ],
+                removed=[
+                    ItemChange(
+                        "handle", "attributes", call("set_attribute", 12, {"args": ["user", "id"]})
+                    ),
+                    ItemChange("process", "spans", call("process", 20)),
+                    ItemChange("process", "counter", call("add", 21, {"args": [1]})),
+                ],
+                uninstrumented=["process"],
+            ),
+        ]
+
+        self.assertEqual(actual, expected)
+
+    def test_diff_reports_jsonl(self):
+        """
+        Description: test if the reports are compared in the same way whatever their format.
+        """
+
+        jsonl_path = os.path.join(self.temp_dir, "new.jsonl")
+
+        with JsonlWriter(jsonl_path) as writer:
+            for script, entry in self.new_report.items():
+                writer.write({"script": script, **entry})
+
+        actual = list(diff_reports(self.old_path, jsonl_path))
+        expected = list(diff_reports(self.old_path, self.new_path))
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(list(diff_reports(self.old_path, self.old_path)), [])
+
+    def test_diff_reports_exception(self):
+        """
+        Description: test if the basic reports are rejected.
+        """
+
+        basic_path = os.path.join(self.temp_dir, "basic.json")
+
+        write_json([{"script": "src/service.py", "tracers": True}], basic_path)
+
+        with self.assertRaises(ValueError):
+            list(diff_reports(basic_path, self.new_path))
+
+    def test_diff_reports_unsorted(self):
+        """
+        Description: test if the reports whose scripts are not sorted in the order they are analyzed (e.g.
+        written by an older version) are compared as the sorted ones.
+        """
+
+        unsorted_path = os.path.join(self.temp_dir, "unsorted.json")
+
+        write_json(dict(reversed(self.old_report.items())), unsorted_path)
+
+        actual = list(diff_reports(unsorted_path, self.new_path))
+        expected = list(diff_reports(self.old_path, self.new_path))
+
+        self.assertEqual(actual, expected)
+
+    def test_diff_records_deleted_function(self):
+        """
+        Description: test if only the functions that are still there are flagged as having lost all their
+        instrumentation, rather than the deleted ones.
+        """
+
+        old_record = self.old_report["src/service.py"]
+        new_record = {
+            "tracers": old_record["tracers"],
+            "functions": {"handle": old_record["functions"]["handle"]},
+        }
+
+        actual = diff_records("src/service.py", old_record, new_record)
+
+        self.assertEqual(len(actual.removed), 2)
+        self.assertEqual(actual.uninstrumented, [])
+
+    def test_run_diff(self):
+        """
+        Description: test if the changes are printed grouped by script and function, followed by a summary.
+        """
+
+        stdout = io.StringIO()
+
+        with redirect_stdout(stdout):
+            run_diff(self.old_path, self.new_path)
+
+        actual = stdout.getvalue()
+
+        self.assertIn(
+            '+ src/added.py\n  <script>\n    + events: add_event {"args": ["started"]} (line 2)', actual
+        )
+        self.assertIn("- src/removed.py\n  <script>\n    - tracers: tracer (line 1)", actual)
+        self.assertIn("  process [lost all instrumentation]\n    - spans: process (line 20)", actual)
+        self.assertNotIn("unchanged.py", actual)
+        self.assertIn(
+            "3 scripts changed: 2 items added, 4 items removed, 1 functions lost all instrumentation",
+            actual,
+        )
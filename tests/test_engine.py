@@ -1,14 +1,42 @@
 # Unitary tests for the engine.py file
 
 import os
+import io
+import sys
+import json
+import shutil
+import tempfile
+import tracemalloc
+import subprocess
+
+from javalang.parser import Parser
+from javalang.tokenizer import JavaTokenizer
 
 from pathlib import Path
 
+from contextlib import redirect_stdout
+
+from unittest.mock import patch
+
 from dotenv import load_dotenv
 
 from unittest import TestCase
 
 from spanalyzer.engine import Engine
+from spanalyzer.engine import ScriptResult
+from spanalyzer.engine import _analyze_script
+
+from spanalyzer.cache import ResultCache
+
+from spanalyzer.python.detector import PythonTelemetryDetector
+from spanalyzer.java.detector import JavaTelemetryDetector
+
+from spanalyzer.java.tokenizer import elide_method_bodies
+
+from spanalyzer.utils.streams import jsonl_to_report
+
+from spanalyzer.utils.operations import read_json
+from spanalyzer.utils.operations import write_json
 
 load_dotenv()
 
@@ -56,3 +84,629 @@ class TestEngine(TestCase):
         ]
 
         self.assertEqual(actual, expected)
+
+    def test__list_scripts_auto(self):
+        """
+        Description: test if the _list_scripts is able to capture the scripts of every language in a single walk.
+        """
+
+        test_folder = os.path.join(self.project_path, "tree")
+
+        engine = Engine(test_folder, "basic", language="auto")
+
+        actual = engine._list_scripts(test_folder)
+        expected = [
+            os.path.join(test_folder, "script_1.java"),
+            os.path.join(test_folder, "script_1.py"),
+            os.path.join(test_folder, "subfolder", "script_2.java"),
+            os.path.join(test_folder, "subfolder", "script_2.py"),
+            os.path.join(test_folder, "subfolder", "subsubfolder", "script_3.java"),
+            os.path.join(test_folder, "subfolder", "subsubfolder", "script_3.py"),
+        ]
+
+        self.assertEqual(actual, expected)
+
+    def _copy_samples(self, language: str) -> str:
+        """
+        Copy the samples of the language provided into a temporary folder.
+
+        The samples live under the tests folder, which is excluded from the analysis by default.
+        """
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+
+        samples_folder = os.path.join(temp_dir, "samples")
+        shutil.copytree(
+            os.path.join(self.project_path, "tests", "samples", language),
+            samples_folder,
+        )
+
+        return samples_folder
+
+    def test_run_detailed_mixed_languages(self):
+        """
+        Description: test if a mixed language run produces the entries of the single language runs, each
+        one tagged with its language.
+        """
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+
+        for language in ["python", "java"]:
+            shutil.copytree(
+                os.path.join(self.project_path, "tests", "samples", language),
+                os.path.join(temp_dir, language),
+            )
+
+        expected = {}
+
+        for language in ["python", "java"]:
+            output_path = os.path.join(temp_dir, f"{language}.json")
+            Engine(temp_dir, "detailed", language=language, output_path=output_path, jobs=1).run()
+
+            expected.update(
+                {
+                    script: {"language": language, **script_report}
+                    for script, script_report in read_json(output_path).items()
+                }
+            )
+
+        for language in ["auto", "java,python"]:
+            with self.subTest(language=language):
+                output_path = os.path.join(temp_dir, "mixed.json")
+                Engine(temp_dir, "detailed", language=language, output_path=output_path, jobs=2).run()
+
+                actual = read_json(output_path)
+
+                self.assertEqual(actual, expected)
+                self.assertEqual(
+                    {script_report["language"] for script_report in actual.values()},
+                    {"python", "java"},
+                )
+
+    def test_iter_results(self):
+        """
+        Description: test if the results yielded one at a time are the entries of the report written by a
+        run, for both report types and a mixed language run.
+        """
+
+        samples_folder = self._copy_samples("python")
+        shutil.copytree(
+            os.path.join(self.project_path, "tests", "samples", "java"),
+            os.path.join(samples_folder, "java"),
+        )
+        output_path = os.path.join(samples_folder, "report.json")
+
+        engine = Engine(samples_folder, "detailed", language="auto", output_path=output_path, jobs=1)
+
+        with redirect_stdout(io.StringIO()):
+            engine.run()
+
+        actual = {result.script: result for result in engine.iter_results()}
+        expected = read_json(output_path)
+
+        self.assertEqual(list(actual), list(expected))
+
+        for script, result in actual.items():
+            self.assertIsInstance(result, ScriptResult)
+            self.assertEqual(result.language, expected[script].pop("language"))
+            self.assertEqual(result.report_entry(), expected[script])
+            self.assertNotIn("functions", result.telemetry)
+
+        results = list(Engine(samples_folder, "basic", language="python", jobs=1).iter_results())
+        script_1 = next(result for result in results if result.script.endswith("script_1.py"))
+
+        self.assertEqual(len(results), len([script for script in actual if script.endswith(".py")]))
+        self.assertIsNone(script_1.functions)
+        self.assertEqual(
+            script_1.telemetry,
+            {"tracers": True, "spans": True, "attributes": True, "events": False, "counter": False},
+        )
+
+    def test_run_profile(self):
+        """
+        Description: test if the profile of the run is printed after the report, with the phases of the
+        detailed report and the slowest scripts, leaving the report untouched.
+        """
+
+        samples_folder = self._copy_samples("python")
+        expected_path = os.path.join(samples_folder, "expected.json")
+        output_path = os.path.join(samples_folder, "report.json")
+
+        with redirect_stdout(io.StringIO()):
+            Engine(samples_folder, "detailed", output_path=expected_path, jobs=1).run()
+
+        engine = Engine(
+            samples_folder, "detailed", output_path=output_path, jobs=1, profile=True, profile_top=2
+        )
+        stdout = io.StringIO()
+
+        with redirect_stdout(stdout):
+            engine.run()
+
+        summary = stdout.getvalue()
+        slowest = summary.split("Slowest scripts")[1].strip().splitlines()[1:]
+
+        self.assertEqual(read_json(output_path), read_json(expected_path))
+        self.assertTrue(summary.startswith("[i] Profile: 6 scripts in "))
+
+        for phase in ("list", "read", "parse", "detect", "sniff", "conciliate", "write"):
+            self.assertRegex(summary, rf"\n{phase} +\d+\.\d{{4}} +\d+\.\d{{4}}\n")
+
+        self.assertEqual(len(slowest), 2)
+        self.assertEqual(len(engine.profiler.scripts), 6)
+
+    def test_run_memory(self):
+        """
+        Description: test if the memory of the run is printed after the report, with the peak of each phase
+        and the memory held by the report, leaving the report untouched and the allocations untraced.
+        """
+
+        samples_folder = self._copy_samples("python")
+        expected_path = os.path.join(samples_folder, "expected.json")
+        output_path = os.path.join(samples_folder, "report.json")
+
+        with redirect_stdout(io.StringIO()):
+            Engine(samples_folder, "detailed", output_path=expected_path, jobs=1).run()
+
+        stdout = io.StringIO()
+
+        with redirect_stdout(stdout):
+            Engine(samples_folder, "detailed", output_path=output_path, jobs=1, memory=True).run()
+
+        summary = stdout.getvalue()
+
+        self.assertEqual(read_json(output_path), read_json(expected_path))
+        self.assertTrue(summary.startswith("[i] Memory: peak RSS "))
+        self.assertNotIn("[i] Profile", summary)
+        self.assertRegex(summary, r"\nparse +\d+\.\d{3}\n")
+        self.assertIn("held by the report before writing it", summary)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_run_file_timeout(self):
+        """
+        Description: test if a script whose parse overruns the time budget is abandoned and reported as timed
+        out, while the other scripts are reported as usual.
+        """
+
+        samples_folder = self._copy_samples("java")
+        expected_path = os.path.join(samples_folder, "expected.json")
+        output_path = os.path.join(samples_folder, "report.json")
+
+        with redirect_stdout(io.StringIO()):
+            Engine(samples_folder, "detailed", language="java", output_path=expected_path, jobs=1).run()
+
+        # a generated script with a huge array initializer takes javalang several seconds to parse
+        slow_script = os.path.join(samples_folder, "Generated.java")
+
+        with open(slow_script, "w") as file:
+            values = ", ".join(str(value) for value in range(200000))
+            file.write(f"public class Generated {{ int[] values = {{{values}}}; }}")
+
+        engine = Engine(
+            samples_folder, "detailed", language="java", output_path=output_path, jobs=2, file_timeout=0.5
+        )
+        stdout = io.StringIO()
+
+        with redirect_stdout(stdout):
+            engine.run()
+
+        report = read_json(output_path)
+
+        self.assertEqual(report.pop(slow_script), {"error": "timeout"})
+        self.assertEqual(report, read_json(expected_path))
+        self.assertEqual(engine.abandoned, [(slow_script, "timeout")])
+        self.assertIn(f"    {slow_script}: timeout", stdout.getvalue())
+
+    def test_engine_import_is_portable(self):
+        """
+        Description: test if importing the engine doesn't import the modules that are only available on some
+        platforms (or only needed along with some options).
+        """
+
+        code = (
+            "import sys, spanalyzer.engine; "
+            "print(','.join(sorted(m for m in sys.modules if m.startswith(("
+            "'resource', 'spanalyzer.supervisor', 'opentelemetry.sdk'"
+            ")))))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_memory_unsupported(self):
+        """
+        Description: test if the memory accounting and limits are rejected when the engine is built on a
+        platform that can't support them.
+        """
+
+        with patch("spanalyzer.engine.RESOURCE_AVAILABLE", False):
+            Engine(self.project_path, "basic", file_timeout=1.0)
+
+            with self.assertRaises(ValueError):
+                Engine(self.project_path, "basic", memory=True)
+
+            with self.assertRaises(ValueError):
+                Engine(self.project_path, "basic", file_memory=1024)
+
+    def test_invalid_language(self):
+        """
+        Description: test if an unsupported language is rejected when the engine is built.
+        """
+
+        with self.assertRaises(ValueError):
+            Engine(self.project_path, "basic", language="python,cobol")
+
+    def test_run_detailed_parallel(self):
+        """
+        Description: test if the detailed report produced by the process pool is byte-identical to the
+        one produced by a serial run.
+        """
+
+        for language in ["python", "java"]:
+            samples_folder = self._copy_samples(language)
+
+            serial_output = os.path.join(samples_folder, "serial.json")
+            parallel_output = os.path.join(samples_folder, "parallel.json")
+
+            Engine(
+                samples_folder,
+                "detailed",
+                language=language,
+                output_path=serial_output,
+                jobs=1,
+            ).run()
+            Engine(
+                samples_folder,
+                "detailed",
+                language=language,
+                output_path=parallel_output,
+                jobs=4,
+            ).run()
+
+            with open(serial_output, "r") as serial, open(parallel_output, "r") as parallel:
+                actual = parallel.read()
+                expected = serial.read()
+
+            self.assertEqual(actual, expected)
+            self.assertNotEqual(actual, "{}")
+
+    def test_run_basic_parallel(self):
+        """
+        Description: test if the basic report produced by the process pool is the same as the one
+        produced by a serial run.
+        """
+
+        samples_folder = self._copy_samples("python")
+
+        serial_stdout = io.StringIO()
+        with redirect_stdout(serial_stdout):
+            Engine(samples_folder, "basic", jobs=1).run()
+
+        parallel_stdout = io.StringIO()
+        with redirect_stdout(parallel_stdout):
+            Engine(samples_folder, "basic", jobs=4).run()
+
+        actual = parallel_stdout.getvalue()
+        expected = serial_stdout.getvalue()
+
+        self.assertEqual(actual, expected)
+        self.assertIn("script_1.py", actual)
+
+    def test__analyze_script_single_parse(self):
+        """
+        Description: test if each script is read, tokenized and parsed only once when producing a detailed
+        entry, with the same tokens and tree being shared by the detector and the sniffer.
+        """
+
+        script = os.path.join(self.project_path, "tests", "samples", "java", "script_2.java")
+
+        with patch.object(
+            JavaTokenizer, "tokenize", autospec=True, side_effect=JavaTokenizer.tokenize
+        ) as tokenize_mock, patch.object(
+            Parser, "parse", autospec=True, side_effect=Parser.parse
+        ) as parse_mock:
+            actual, _ = _analyze_script(script, "detailed", "java")
+
+        self.assertEqual(tokenize_mock.call_count, 1)
+        self.assertEqual(parse_mock.call_count, 1)
+        self.assertIn("functions", actual)
+
+        script = os.path.join(self.project_path, "tests", "samples", "python", "script_2.py")
+
+        with patch("spanalyzer.python.script.parse") as parse_mock:
+            actual, _ = _analyze_script(script, "detailed", "python")
+
+        parse_mock.assert_not_called()
+        self.assertIn("functions", actual)
+
+    def test__analyze_script_basic_presence(self):
+        """
+        Description: test if the basic entry of each script only relies on the presence of the telemetry
+        categories, matches the full detection, and is cached apart from the detailed entry.
+        """
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        cache = ResultCache(cache_dir)
+
+        for language, detector_cls in (
+            ("python", PythonTelemetryDetector),
+            ("java", JavaTelemetryDetector),
+        ):
+            samples_folder = os.path.join(self.project_path, "tests", "samples", language)
+
+            for script in sorted(Path(samples_folder).rglob("script_*.*")):
+                with self.subTest(script=script.name):
+                    detailed, _ = _analyze_script(str(script), "detailed", language)
+                    expected = {
+                        key: bool(detailed.get(key))
+                        or any(func.get(key) for func in detailed.get("functions", {}).values())
+                        for key in ("tracers", "spans", "attributes", "events", "counter")
+                    }
+
+                    with patch.object(detector_cls, "run") as run_mock:
+                        actual, _ = _analyze_script(str(script), "basic", language)
+                        cached, cache_hit = _analyze_script(str(script), "basic", language, cache)
+
+                    run_mock.assert_not_called()
+                    self.assertEqual(actual, expected)
+                    self.assertEqual(cached, expected)
+                    self.assertFalse(cache_hit)
+
+                    # a basic entry in the cache is not enough to produce the detailed one
+                    actual, cache_hit = _analyze_script(str(script), "detailed", language, cache)
+
+                    self.assertEqual(actual, detailed)
+                    self.assertFalse(cache_hit)
+
+                    actual, cache_hit = _analyze_script(str(script), "basic", language, cache)
+
+                    self.assertEqual(actual, expected)
+                    self.assertTrue(cache_hit)
+
+    def test_run_detailed_cache(self):
+        """
+        Description: test if a second run over unchanged scripts is served from the cache, without parsing
+        any script, and produces the same report.
+        """
+
+        samples_folder = self._copy_samples("java")
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+
+        first_output = os.path.join(samples_folder, "first.json")
+        second_output = os.path.join(samples_folder, "second.json")
+
+        first_engine = Engine(
+            samples_folder,
+            "detailed",
+            language="java",
+            output_path=first_output,
+            jobs=1,
+            cache_dir=cache_dir,
+        )
+        with redirect_stdout(io.StringIO()):
+            first_engine.run()
+
+        second_engine = Engine(
+            samples_folder,
+            "detailed",
+            language="java",
+            output_path=second_output,
+            jobs=1,
+            cache_dir=cache_dir,
+        )
+        with patch.object(Parser, "parse") as parse_mock, redirect_stdout(
+            io.StringIO()
+        ) as stdout:
+            second_engine.run()
+
+        parse_mock.assert_not_called()
+
+        self.assertGreater(first_engine.cache_misses, 0)
+        self.assertEqual(second_engine.cache_misses, 0)
+        self.assertEqual(
+            second_engine.cache_hits,
+            first_engine.cache_hits + first_engine.cache_misses,
+        )
+        self.assertIn(f"{second_engine.cache_hits} hits, 0 misses", stdout.getvalue())
+
+        with open(first_output, "r") as first, open(second_output, "r") as second:
+            self.assertEqual(second.read(), first.read())
+
+    def test_run_detailed_jsonl(self):
+        """
+        Description: test if the streamed jsonl report rebuilds into the same report as the json one.
+        """
+
+        samples_folder = self._copy_samples("java")
+
+        json_output = os.path.join(samples_folder, "report.json")
+        jsonl_output = os.path.join(samples_folder, "report.jsonl")
+        rebuilt_output = os.path.join(samples_folder, "rebuilt.json")
+
+        Engine(samples_folder, "detailed", language="java", output_path=json_output).run()
+        Engine(
+            samples_folder,
+            "detailed",
+            language="java",
+            output_path=jsonl_output,
+            output_format="jsonl",
+        ).run()
+
+        write_json(jsonl_to_report(jsonl_output), rebuilt_output)
+
+        with open(json_output, "r") as expected_file, open(rebuilt_output, "r") as actual_file:
+            actual = actual_file.read()
+            expected = expected_file.read()
+
+        self.assertEqual(actual, expected)
+
+    def test_run_detailed_since(self):
+        """
+        Description: test if merging the scripts that changed since a git reference into the previous
+        report produces the same report as a full run, covering added, modified, renamed and deleted scripts.
+        """
+
+        for output_format in ["json", "jsonl"]:
+            with self.subTest(output_format=output_format):
+                self._check_run_detailed_since(output_format)
+
+    def _check_run_detailed_since(self, output_format: str):
+        """
+        Check the merge of the changed scripts into the previous report, for the output format provided.
+        """
+
+        samples_folder = self._copy_samples("python")
+
+        def git(*args):
+            subprocess.run(
+                ["git", "-c", "user.name=test", "-c", "user.email=test@test", "-C", samples_folder, *args],
+                check=True,
+                capture_output=True,
+            )
+
+        def load(path):
+            return jsonl_to_report(path) if output_format == "jsonl" else read_json(path)
+
+        git("init", "-q")
+        git("add", "-A")
+        git("commit", "-q", "-m", "initial")
+        git("tag", "initial")
+
+        output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, output_dir)
+
+        incremental_output = os.path.join(output_dir, f"incremental.{output_format}")
+        full_output = os.path.join(output_dir, f"full.{output_format}")
+
+        Engine(
+            samples_folder,
+            "detailed",
+            output_path=incremental_output,
+            jobs=1,
+            output_format=output_format,
+        ).run()
+
+        with open(os.path.join(samples_folder, "script_1.py"), "a") as f:
+            f.write(
+                "\n\ndef extra_function():\n"
+                "    with tracer.start_as_current_span('extra_function') as span:\n"
+                "        span.set_attribute('extra', 'value')\n"
+            )
+        git("mv", "script_2.py", "script_2_renamed.py")
+        os.remove(os.path.join(samples_folder, "script_3.py"))
+        shutil.copy(
+            os.path.join(samples_folder, "script_4.py"),
+            os.path.join(samples_folder, "script_5.py"),
+        )
+
+        engine = Engine(
+            samples_folder,
+            "detailed",
+            output_path=incremental_output,
+            jobs=1,
+            since="initial",
+            output_format=output_format,
+        )
+
+        self.assertEqual(
+            sorted(engine._list_changed_scripts(samples_folder)[0]),
+            [
+                os.path.join(samples_folder, "script_1.py"),
+                os.path.join(samples_folder, "script_2_renamed.py"),
+                os.path.join(samples_folder, "script_5.py"),
+            ],
+        )
+
+        engine.run()
+        Engine(
+            samples_folder,
+            "detailed",
+            output_path=full_output,
+            jobs=1,
+            output_format=output_format,
+        ).run()
+
+        with open(incremental_output, "r") as incremental, open(full_output, "r") as full:
+            self.assertEqual(incremental.read(), full.read())
+
+        actual = load(incremental_output)
+
+        self.assertIn("extra_function", actual[os.path.join(samples_folder, "script_1.py")]["functions"])
+        self.assertNotIn(os.path.join(samples_folder, "script_2.py"), actual)
+
+    def test_run_fast(self):
+        """
+        Description: test if the fast mode produces the same reports as the full parse, without parsing
+        the scripts that don't mention any telemetry keyword.
+        """
+
+        samples_folder = self._copy_samples("python")
+
+        with open(os.path.join(samples_folder, "no_telemetry.py"), "w") as f:
+            f.write("def function():\n    return 'nothing to see here'\n")
+
+        reports = {}
+
+        for fast in [False, True]:
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                Engine(samples_folder, "basic", jobs=1, fast=fast).run()
+
+            output_path = os.path.join(samples_folder, f"report_{fast}.json")
+            Engine(samples_folder, "detailed", output_path=output_path, jobs=1, fast=fast).run()
+
+            with open(output_path, "r") as f:
+                reports[fast] = (stdout.getvalue(), f.read())
+
+        self.assertEqual(reports[True], reports[False])
+        self.assertIn("no_telemetry.py", reports[True][0])
+
+        with patch("spanalyzer.python.backend.parse") as parse_mock:
+            _analyze_script(os.path.join(samples_folder, "no_telemetry.py"), "basic", "python", fast=True)
+
+        parse_mock.assert_not_called()
+
+    def test_run_fast_java(self):
+        """
+        Description: test if the fast mode produces the same java reports as the full parse, while leaving
+        the method bodies without telemetry keywords out of the parse.
+        """
+
+        samples_folder = self._copy_samples("java")
+
+        reports = {}
+
+        for fast in [False, True]:
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                Engine(samples_folder, "basic", language="java", jobs=1, fast=fast).run()
+
+            output_path = os.path.join(samples_folder, f"report_{fast}.json")
+            Engine(
+                samples_folder,
+                "detailed",
+                language="java",
+                output_path=output_path,
+                jobs=1,
+                fast=fast,
+            ).run()
+
+            with open(output_path, "r") as f:
+                reports[fast] = (stdout.getvalue(), f.read())
+
+        self.assertEqual(reports[True], reports[False])
+
+        script = os.path.join(samples_folder, "script_4.java")
+
+        with patch(
+            "spanalyzer.java.backend.elide_method_bodies", wraps=elide_method_bodies
+        ) as elide_mock:
+            _analyze_script(script, "detailed", "java", fast=True)
+
+        elide_mock.assert_called_once()
@@ -0,0 +1,123 @@
+# Unitary tests for the self-instrumentation of the spanalyzer
+
+import io
+import os
+import json
+import shutil
+import tempfile
+
+from pathlib import Path
+
+from contextlib import redirect_stdout
+
+from dotenv import load_dotenv
+
+from unittest import TestCase
+from unittest import skipIf
+from unittest import skipUnless
+
+from spanalyzer.engine import Engine
+from spanalyzer.profiling import NO_PHASE
+from spanalyzer.instrumentation import OTEL_AVAILABLE
+from spanalyzer.instrumentation import Instrumentation
+
+from spanalyzer.utils.operations import read_json
+
+load_dotenv()
+
+
+class TestInstrumentation(TestCase):
+    def setUp(self):
+        """
+        Description: set up the test environment, with the python samples copied into a temporary folder.
+        """
+
+        self.project_path = Path(os.getenv("PROJECT_ROOT_PATH"))
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+        self.samples_folder = os.path.join(self.temp_dir, "samples")
+        self.telemetry_path = os.path.join(self.temp_dir, "telemetry.jsonl")
+
+        shutil.copytree(
+            os.path.join(self.project_path, "tests", "samples", "python"), self.samples_folder
+        )
+
+    def run_engine(self, output_name: str, **kwargs):
+        """
+        Run the engine over the samples folder, generating the detailed report.
+        """
+
+        with redirect_stdout(io.StringIO()):
+            Engine(
+                self.samples_folder,
+                "detailed",
+                output_path=os.path.join(self.temp_dir, output_name),
+                jobs=1,
+                **kwargs,
+            ).run()
+
+    @skipIf(OTEL_AVAILABLE, "the opentelemetry sdk is installed")
+    def test_instrumentation_disabled(self):
+        """
+        Description: test if nothing is recorded nor exported when the opentelemetry sdk is not installed,
+        and the report is the same as the one of a run without instrumentation.
+        """
+
+        instrumentation = Instrumentation(self.telemetry_path)
+
+        self.run_engine("expected.json")
+        self.run_engine("report.json", instrumentation=instrumentation)
+        instrumentation.shutdown()
+
+        self.assertFalse(instrumentation.enabled)
+        self.assertIs(instrumentation.span("run"), NO_PHASE)
+        self.assertFalse(os.path.exists(self.telemetry_path))
+        self.assertEqual(
+            read_json(os.path.join(self.temp_dir, "report.json")),
+            read_json(os.path.join(self.temp_dir, "expected.json")),
+        )
+
+    @skipUnless(OTEL_AVAILABLE, "the opentelemetry sdk is not installed")
+    def test_instrumentation(self):
+        """
+        Description: test if the run, its phases and each script are exported as spans (the phases of the
+        scripts being children of their script), along with the counters.
+        """
+
+        instrumentation = Instrumentation(self.telemetry_path)
+
+        self.run_engine("report.json", instrumentation=instrumentation)
+        instrumentation.shutdown()
+
+        with open(self.telemetry_path, "r") as file:
+            records = [json.loads(line) for line in file]
+
+        spans = [record for record in records if "name" in record]
+        spans_ids = {span["context"]["span_id"]: span for span in spans}
+        metrics = {
+            metric["name"]: sum(point["value"] for point in metric["data"]["data_points"])
+            for record in records
+            if "resource_metrics" in record
+            for metric in record["resource_metrics"][0]["scope_metrics"][0]["metrics"]
+        }
+
+        run_span = next(span for span in spans if span["name"] == "spanalyzer.run")
+        script_spans = [span for span in spans if span["name"] == "spanalyzer.script"]
+        parse_spans = [span for span in spans if span["name"] == "spanalyzer.parse"]
+
+        self.assertEqual(len(script_spans), 6)
+        self.assertEqual(len(parse_spans), 6)
+        self.assertTrue(
+            all(span["parent_id"] == run_span["context"]["span_id"] for span in script_spans)
+        )
+        self.assertTrue(
+            all(spans_ids[span["parent_id"]]["name"] == "spanalyzer.script" for span in parse_spans)
+        )
+        self.assertIn("spanalyzer.list", [span["name"] for span in spans])
+        self.assertEqual(metrics["spanalyzer.files"], 6)
+        self.assertEqual(
+            metrics["spanalyzer.bytes_read"],
+            sum(span["attributes"]["bytes_read"] for span in script_spans),
+        )
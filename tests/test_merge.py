@@ -0,0 +1,162 @@
+# Unitary tests for the merge of the partial reports of a sharded run
+
+import io
+import os
+import shutil
+import tempfile
+
+from pathlib import Path
+
+from contextlib import redirect_stdout
+
+from dotenv import load_dotenv
+
+from unittest import TestCase
+
+from spanalyzer.engine import Engine
+from spanalyzer.merge import merge_reports
+
+from spanalyzer.utils.streams import jsonl_to_report
+
+from spanalyzer.utils.operations import read_json
+from spanalyzer.utils.operations import write_json
+
+load_dotenv()
+
+
+class TestMerge(TestCase):
+    def setUp(self):
+        """
+        Description: set up the test environment, with the python and java samples copied into a temporary
+        folder (the samples live under the tests folder, which is excluded from the analysis by default).
+        """
+
+        self.project_path = Path(os.getenv("PROJECT_ROOT_PATH"))
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+        self.samples_folder = os.path.join(self.temp_dir, "samples")
+
+        for language in ("python", "java"):
+            shutil.copytree(
+                os.path.join(self.project_path, "tests", "samples", language),
+                os.path.join(self.samples_folder, language),
+            )
+
+    def run_engine(self, report_type: str, output_name: str, **kwargs) -> str:
+        """
+        Run the engine over the samples folder, returning what was printed.
+        """
+
+        stdout = io.StringIO()
+
+        with redirect_stdout(stdout):
+            Engine(
+                self.samples_folder,
+                report_type,
+                language="auto",
+                output_path=os.path.join(self.temp_dir, output_name),
+                jobs=1,
+                **kwargs,
+            ).run()
+
+        return stdout.getvalue()
+
+    def test_shards_partition(self):
+        """
+        Description: test if every script is analyzed by exactly one shard.
+        """
+
+        self.run_engine("detailed", "full.json")
+        shard_reports = []
+
+        for index in range(1, 4):
+            self.run_engine("detailed", f"shard_{index}.json", shard=(index, 3))
+            shard_reports.append(read_json(os.path.join(self.temp_dir, f"shard_{index}.json")))
+
+        full_report = read_json(os.path.join(self.temp_dir, "full.json"))
+        shard_scripts = [script for report in shard_reports for script in report]
+
+        self.assertEqual(sorted(shard_scripts), sorted(full_report))
+        self.assertEqual(len([report for report in shard_reports if report]), 3)
+
+    def test_merge_detailed(self):
+        """
+        Description: test if the merged detailed report is byte for byte the one of a single run, whatever
+        the format of the partial reports.
+        """
+
+        self.run_engine("detailed", "full.json")
+
+        for index in range(1, 4):
+            self.run_engine("detailed", f"shard_{index}.json", shard=(index, 3))
+            self.run_engine(
+                "detailed", f"shard_{index}.jsonl", shard=(index, 3), output_format="jsonl"
+            )
+
+        for extension in ("json", "jsonl"):
+            with self.subTest(extension=extension):
+                merged_path = os.path.join(self.temp_dir, f"merged_{extension}.json")
+                shard_paths = [
+                    os.path.join(self.temp_dir, f"shard_{index}.{extension}")
+                    for index in (3, 1, 2)
+                ]
+
+                report_type = merge_reports(shard_paths, merged_path)
+
+                with open(merged_path, "r") as merged, open(
+                    os.path.join(self.temp_dir, "full.json"), "r"
+                ) as full:
+                    self.assertEqual(merged.read(), full.read())
+
+                self.assertEqual(report_type, "detailed")
+
+        merged_path = os.path.join(self.temp_dir, "merged.jsonl")
+        merge_reports(shard_paths, merged_path, output_format="jsonl")
+
+        self.assertEqual(
+            jsonl_to_report(merged_path), read_json(os.path.join(self.temp_dir, "full.json"))
+        )
+
+    def test_merge_basic(self):
+        """
+        Description: test if the merged basic report prints the same table as a single run, with the
+        paths trimmed against the scripts of every shard.
+        """
+
+        expected = self.run_engine("basic", "full.json")
+        shard_paths = []
+
+        for index in range(1, 4):
+            self.run_engine("basic", f"shard_{index}.json", shard=(index, 3))
+            shard_paths.append(os.path.join(self.temp_dir, f"shard_{index}.json"))
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            report_type = merge_reports(shard_paths, os.path.join(self.temp_dir, "merged.json"))
+
+        self.assertEqual(stdout.getvalue(), expected)
+        self.assertEqual(report_type, "basic")
+
+    def test_merge_exception(self):
+        """
+        Description: test if the reports of different types, the scripts found in more than one report,
+        and an output path overwriting one of the reports are rejected.
+        """
+
+        basic_path = os.path.join(self.temp_dir, "basic.json")
+        detailed_path = os.path.join(self.temp_dir, "detailed.json")
+        merged_path = os.path.join(self.temp_dir, "merged.json")
+
+        write_json([{"script": "a/script.py", "tracers": True}], basic_path)
+        write_json({"a/script.py": {"tracers": []}}, detailed_path)
+
+        with self.assertRaises(ValueError):
+            merge_reports([basic_path, detailed_path], merged_path)
+
+        with self.assertRaises(ValueError):
+            merge_reports([detailed_path, detailed_path], merged_path)
+
+        with self.assertRaises(ValueError):
+            merge_reports([detailed_path], detailed_path)
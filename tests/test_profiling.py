@@ -0,0 +1,100 @@
+# Unitary tests for the timing (and memory accounting) of the phases of a run
+
+import tracemalloc
+
+from unittest import TestCase
+
+from spanalyzer.profiling import MB
+from spanalyzer.profiling import NO_PHASE
+from spanalyzer.profiling import PROCESS_PEAK
+from spanalyzer.profiling import Profiler
+from spanalyzer.profiling import ScriptProfile
+from spanalyzer.profiling import phase
+
+
+class TestProfiling(TestCase):
+    def test_script_profile(self):
+        """
+        Description: test if the time of a phase measured more than once is accumulated, and nothing is
+        measured when the script is not being profiled.
+        """
+
+        profile = ScriptProfile("script.py")
+
+        with profile.measure():
+            for _ in range(2):
+                with phase(profile, "parse"):
+                    sum(range(10000))
+
+        self.assertEqual(list(profile.phases), ["parse"])
+        self.assertGreater(profile.phases["parse"][0], 0)
+        self.assertGreaterEqual(profile.totals[0], profile.phases["parse"][0])
+        self.assertIs(phase(None, "parse"), NO_PHASE)
+
+    def test_profiler_summary(self):
+        """
+        Description: test if the phases of the scripts are summed over the run, listed in the order they
+        take place, and followed by the slowest scripts.
+        """
+
+        profiler = Profiler(top=2)
+
+        for script, wall in [("a.py", 0.5), ("b.py", 0.1), ("c.py", 0.3)]:
+            profile = ScriptProfile(script)
+            profile.totals = [wall, wall]
+            profile.phases = {"detect": [wall / 2, wall / 2], "parse": [wall / 2, wall / 2]}
+            profiler.record(profile)
+
+        profiler.phases["write"] = [0.2, 0.1]
+
+        expected = "\n".join(
+            [
+                "[i] Profile: 3 scripts in 0.000 s (wall), 0.000 s (cpu of this process)",
+                "",
+                "Phase              Wall (s)     CPU (s)",
+                "parse                0.4500      0.4500",
+                "detect               0.4500      0.4500",
+                "write                0.2000      0.1000",
+                "",
+                "Slowest scripts    Wall (s)     CPU (s)",
+                "a.py                 0.5000      0.5000",
+                "c.py                 0.3000      0.3000",
+            ]
+        )
+
+        self.assertEqual(profiler.summary(), expected)
+
+    def test_memory_peaks(self):
+        """
+        Description: test if the peak of memory of each phase is kept on top of the memory already held,
+        along with the memory held by the run and its largest allocations, only while tracing.
+        """
+
+        profiler = Profiler(top=3)
+
+        with profiler.phase("parse"):
+            held = [bytearray(MB)]
+
+        self.assertEqual(profiler.peaks, {})
+
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+
+        with profiler.measure():
+            with profiler.phase("parse"):
+                transient = bytearray(2 * MB)
+                del transient
+
+            with profiler.phase("detect"):
+                held.append(bytearray(MB))
+
+            profiler.take_snapshot()
+
+        summary = profiler.memory_summary()
+
+        self.assertGreaterEqual(profiler.peaks["parse"], 2 * MB)
+        self.assertLess(profiler.peaks["detect"], 2 * MB)
+        self.assertGreaterEqual(profiler.peaks[PROCESS_PEAK], 2 * MB)
+        self.assertGreaterEqual(profiler.retained, MB)
+        self.assertIn("held by the report before writing it", summary)
+        self.assertIn(f"{__file__}:", summary.split("Largest allocations before writing")[1])
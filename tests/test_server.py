@@ -0,0 +1,329 @@
+# Unitary tests for the resident daemon and its client
+
+import os
+import shutil
+import tempfile
+import threading
+
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from spanalyzer import __version__
+
+from spanalyzer.engine import Engine
+from spanalyzer.server import serve
+from spanalyzer.server import AnalysisServer
+from spanalyzer.server import _remove_stale_socket
+from spanalyzer.client import request
+from spanalyzer.client import run_report
+
+from spanalyzer.utils.operations import read_json
+
+load_dotenv()
+
+
+class TestAnalysisServer(TestCase):
+    def setUp(self):
+        """
+        Description: set up the test environment, with the python samples copied into a temporary folder
+        and a daemon listening on a socket of that folder.
+        """
+
+        self.project_path = Path(os.getenv("PROJECT_ROOT_PATH"))
+
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+        self.samples_folder = os.path.join(self.temp_dir, "samples")
+        shutil.copytree(
+            os.path.join(self.project_path, "tests", "samples", "python"),
+            self.samples_folder,
+        )
+
+        self.socket_path = os.path.join(self.temp_dir, "spanalyzer.sock")
+        self.server = AnalysisServer(self.socket_path, jobs=1)
+
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_ping(self):
+        """
+        Description: test if the daemon answers with its version.
+        """
+
+        actual = request({"command": "ping"}, self.socket_path)
+
+        self.assertTrue(actual["ok"])
+        self.assertEqual(actual["version"], __version__)
+
+    def test_invalid_command(self):
+        """
+        Description: test if an unknown command is answered with an error, without stopping the daemon.
+        """
+
+        actual = request({"command": "dance"}, self.socket_path)
+
+        self.assertEqual(actual, {"ok": False, "error": "Invalid command: dance"})
+        self.assertTrue(request({"command": "ping"}, self.socket_path)["ok"])
+
+    def test_run_report_detailed(self):
+        """
+        Description: test if the detailed report generated through the daemon is byte-identical to the one
+        of a local run.
+        """
+
+        daemon_output = os.path.join(self.temp_dir, "daemon.json")
+        local_output = os.path.join(self.temp_dir, "local.json")
+
+        with patch("builtins.print"):
+            self.assertTrue(
+                run_report(
+                    self.samples_folder,
+                    "detailed",
+                    output_path=daemon_output,
+                    socket_path=self.socket_path,
+                )
+            )
+            Engine(self.samples_folder, "detailed", output_path=local_output, jobs=1).run()
+
+        with open(daemon_output, "r") as daemon, open(local_output, "r") as local:
+            self.assertEqual(daemon.read(), local.read())
+
+    def test_run_report_basic(self):
+        """
+        Description: test if the basic report printed through the daemon is the same as the one of a
+        local run.
+        """
+
+        with patch("builtins.print") as print_mock:
+            run_report(self.samples_folder, "basic", socket_path=self.socket_path)
+            Engine(self.samples_folder, "basic", jobs=1).run()
+
+        actual = print_mock.call_args_list[0].args[0]
+        expected = print_mock.call_args_list[2].args[0]
+
+        self.assertEqual(actual, expected)
+
+    def test_report_warm(self):
+        """
+        Description: test if the scripts that didn't change are answered from memory, and if the modified
+        ones are analyzed again.
+        """
+
+        payload = {"command": "report", "path": self.samples_folder, "report_type": "detailed"}
+        first = request(payload, self.socket_path)
+
+        with patch.object(Engine, "_map_scripts", autospec=True, side_effect=Engine._map_scripts) as map_mock:
+            second = request(payload, self.socket_path)
+
+            map_mock.assert_called_once()
+            self.assertEqual(map_mock.call_args.args[1], [])
+
+        self.assertEqual(second["entries"], first["entries"])
+        self.assertEqual(second["cache_hits"], len(first["entries"]))
+
+        modified_script = os.path.join(self.samples_folder, "script_1.py")
+
+        with open(modified_script, "a") as file:
+            file.write("\n\ndef new_function():\n    tracer.start_span('new_span')\n")
+
+        third = request(payload, self.socket_path)
+        entries = dict(third["entries"])
+
+        self.assertEqual(third["cache_hits"], len(first["entries"]) - 1)
+        self.assertIn("new_function", entries[modified_script]["functions"])
+
+    def test_analyze(self):
+        """
+        Description: test if the scripts provided are analyzed, leaving out the ones of other languages.
+        """
+
+        script = os.path.join(self.samples_folder, "script_1.py")
+        other = os.path.join(self.samples_folder, "notes.txt")
+
+        actual = request(
+            {"command": "analyze", "paths": [script, other], "report_type": "basic"},
+            self.socket_path,
+        )
+
+        self.assertTrue(actual["ok"])
+        self.assertEqual(
+            actual["entries"],
+            [
+                [
+                    script,
+                    {
+                        "tracers": True,
+                        "spans": True,
+                        "attributes": True,
+                        "events": False,
+                        "counter": False,
+                    },
+                ]
+            ],
+        )
+
+    def test_analyze_during_report(self):
+        """
+        Description: test if a request over a single script is answered while a report of the whole folder
+        is still parsing, instead of waiting for it.
+        """
+
+        report_started = threading.Event()
+        report_released = threading.Event()
+        map_scripts = Engine._map_scripts
+
+        def slow_map_scripts(engine, scripts_lst):
+            if len(scripts_lst) > 1:
+                report_started.set()
+                report_released.wait(timeout=30)
+
+            return map_scripts(engine, scripts_lst)
+
+        report_responses = []
+        report_thread = threading.Thread(
+            target=lambda: report_responses.append(
+                request({"command": "report", "path": self.samples_folder}, self.socket_path)
+            )
+        )
+
+        with patch.object(Engine, "_map_scripts", autospec=True, side_effect=slow_map_scripts):
+            report_thread.start()
+            self.assertTrue(report_started.wait(timeout=30))
+
+            script = os.path.join(self.samples_folder, "script_1.py")
+            actual = request(
+                {"command": "analyze", "paths": [script], "report_type": "basic"}, self.socket_path
+            )
+
+            # the report is still held back while the single script is answered
+            self.assertTrue(report_thread.is_alive())
+
+            report_released.set()
+            report_thread.join(timeout=30)
+
+        self.assertTrue(actual["ok"])
+        self.assertEqual(actual["cache_misses"], 1)
+        self.assertTrue(report_responses[0]["ok"])
+
+    def test_results_bounded(self):
+        """
+        Description: test if the results of the deleted scripts are dropped along with the next report of
+        their folder, and if the least recently requested results are dropped past the maximum.
+        """
+
+        payload = {"command": "report", "path": self.samples_folder, "report_type": "detailed"}
+        scripts_count = len(request(payload, self.socket_path)["entries"])
+        deleted_script = os.path.join(self.samples_folder, "script_1.py")
+
+        os.remove(deleted_script)
+        request(payload, self.socket_path)
+
+        self.assertEqual(len(self.server.results), scripts_count - 1)
+        self.assertNotIn(deleted_script, {key[0] for key in self.server.results})
+
+        self.server.max_results = 2
+        request(payload, self.socket_path)
+
+        self.assertEqual(len(self.server.results), 2)
+
+    def test_serve_existing_path(self):
+        """
+        Description: test if the daemon refuses to start over a running daemon, a file that isn't a socket or
+        a socket of another user, leaving them untouched, and if it replaces a stale socket of the current
+        user.
+        """
+
+        regular_file = os.path.join(self.temp_dir, "notasock.txt")
+
+        with open(regular_file, "w") as file:
+            file.write("content")
+
+        stale_socket = os.path.join(self.temp_dir, "stale.sock")
+        stale_server = AnalysisServer(stale_socket)
+        stale_server.socket.close()
+
+        with self.assertRaises(ValueError):
+            serve(self.socket_path)
+
+        with self.assertRaises(ValueError):
+            serve(regular_file)
+
+        with patch("spanalyzer.server.os.getuid", return_value=os.getuid() + 1):
+            with self.assertRaises(ValueError):
+                serve(stale_socket)
+
+        with open(regular_file, "r") as file:
+            self.assertEqual(file.read(), "content")
+
+        self.assertTrue(os.path.exists(stale_socket))
+        self.assertTrue(request({"command": "ping"}, self.socket_path)["ok"])
+
+        _remove_stale_socket(stale_socket)
+
+        self.assertFalse(os.path.exists(stale_socket))
+
+    def test_server_close_foreign_file(self):
+        """
+        Description: test if closing the daemon leaves alone a file that replaced its socket in between,
+        as well as the file found at the path of a daemon that couldn't bind it.
+        """
+
+        socket_path = os.path.join(self.temp_dir, "replaced.sock")
+        server = AnalysisServer(socket_path)
+
+        os.remove(socket_path)
+
+        with open(socket_path, "w") as file:
+            file.write("content")
+
+        server.server_close()
+
+        self.assertTrue(os.path.exists(socket_path))
+
+        with self.assertRaises(OSError):
+            AnalysisServer(self.socket_path)
+
+        self.assertTrue(request({"command": "ping"}, self.socket_path)["ok"])
+
+    def test_shutdown(self):
+        """
+        Description: test if the daemon stops serving once asked to.
+        """
+
+        self.assertEqual(request({"command": "shutdown"}, self.socket_path), {"ok": True})
+
+    def test_run_report_without_daemon(self):
+        """
+        Description: test if the client gives up when there's no daemon listening.
+        """
+
+        actual = run_report(
+            self.samples_folder,
+            "basic",
+            socket_path=os.path.join(self.temp_dir, "missing.sock"),
+        )
+
+        self.assertFalse(actual)
+
+    def test_run_report_foreign_daemon(self):
+        """
+        Description: test if the client gives up on a socket that belongs to another user, without sending
+        it any request.
+        """
+
+        with (
+            patch("spanalyzer.client.os.getuid", return_value=os.getuid() + 1),
+            patch("spanalyzer.client.request") as mock_request,
+        ):
+            actual = run_report(self.samples_folder, "basic", socket_path=self.socket_path)
+
+        self.assertFalse(actual)
+        mock_request.assert_not_called()
@@ -0,0 +1,94 @@
+# Unitary tests for the supervised pool of worker processes
+
+import os
+import time
+import types
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from spanalyzer.supervisor import Abandoned
+from spanalyzer.supervisor import SupervisedPool
+
+MB = 1024 * 1024
+
+
+# the tasks are module level functions, so they can be pickled over to the workers
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+
+    return seconds
+
+
+def _allocate(megabytes: int) -> int:
+    return len(bytearray(megabytes * MB))
+
+
+def _exit(code: int) -> int:
+    if code:
+        os._exit(code)
+
+    return code
+
+
+class TestSupervisor(TestCase):
+    def test_map_order(self):
+        """
+        Description: test if the results are yielded in the order of the arguments, regardless of the order
+        in which the workers finish them.
+        """
+
+        with SupervisedPool(_sleep, workers=3) as pool:
+            results = list(pool.map([0.3, 0.0, 0.1, 0.0, 0.2]))
+
+        self.assertEqual(results, [0.3, 0.0, 0.1, 0.0, 0.2])
+
+    def test_map_timeout(self):
+        """
+        Description: test if the tasks overrunning their time budget are abandoned without holding back the
+        other ones, which are run by a fresh worker.
+        """
+
+        start = time.monotonic()
+
+        with SupervisedPool(_sleep, workers=1, timeout=0.5) as pool:
+            results = list(pool.map([0.0, 30.0, 0.0]))
+
+        self.assertEqual(results, [0.0, Abandoned("timeout"), 0.0])
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_map_memory(self):
+        """
+        Description: test if the tasks exhausting the memory limit of their worker are abandoned, and the
+        worker carries on with the next ones.
+        """
+
+        with SupervisedPool(_allocate, workers=1, memory_limit=512 * MB) as pool:
+            results = list(pool.map([1, 4096, 1]))
+
+        self.assertEqual(results, [MB, Abandoned("memory"), MB])
+
+    def test_map_crash(self):
+        """
+        Description: test if the tasks whose worker dies are abandoned, and a fresh worker takes its place.
+        """
+
+        with SupervisedPool(_exit, workers=2) as pool:
+            results = list(pool.map([0, 1, 0, 0]))
+
+        self.assertEqual(results, [0, Abandoned("crashed"), 0, 0])
+
+    def test_map_startup_failure(self):
+        """
+        Description: test if the pool gives up when its workers die before taking any task (here, as they
+        can't import the function, which only exists in the current process), instead of abandoning every
+        task as crashed.
+        """
+
+        func = types.FunctionType(_sleep.__code__, globals(), "_current_process_only")
+        func.__qualname__ = "_current_process_only"
+
+        with patch(f"{__name__}._current_process_only", func, create=True):
+            with self.assertRaisesRegex(RuntimeError, "exited with code 1 before taking any task"):
+                with SupervisedPool(func, workers=2) as pool:
+                    list(pool.map([0.0, 0.0, 0.0]))
@@ -0,0 +1,175 @@
+# Unitary tests for the watch mode
+
+import os
+import shutil
+import tempfile
+
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from spanalyzer.engine import Engine
+from spanalyzer.watch import Watcher
+
+from spanalyzer.utils.operations import read_json
+
+load_dotenv()
+
+
+class TestWatcher(TestCase):
+    def setUp(self):
+        """
+        Description: set up the test environment, with the python samples copied into a temporary folder
+        (the samples live under the tests folder, which is excluded from the analysis by default).
+        """
+
+        self.project_path = Path(os.getenv("PROJECT_ROOT_PATH"))
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+
+        self.samples_folder = os.path.join(temp_dir, "samples")
+        shutil.copytree(
+            os.path.join(self.project_path, "tests", "samples", "python"),
+            self.samples_folder,
+        )
+
+        self.output_path = os.path.join(temp_dir, "watch.json")
+        self.engine = Engine(
+            self.samples_folder, "detailed", output_path=self.output_path, jobs=1
+        )
+
+    def full_report(self) -> dict:
+        """
+        Build the detailed report of the samples folder with a full run.
+        """
+
+        output_path = f"{self.output_path}.full"
+        Engine(self.samples_folder, "detailed", output_path=output_path, jobs=1).run()
+
+        return read_json(output_path)
+
+    def test_poll_first(self):
+        """
+        Description: test if the first poll produces the same report as a full run.
+        """
+
+        watcher = Watcher(self.engine)
+
+        self.assertTrue(watcher.poll())
+        self.assertEqual(read_json(self.output_path), self.full_report())
+
+    def test_poll_unchanged(self):
+        """
+        Description: test if a poll without any change neither analyzes nor rewrites anything.
+        """
+
+        watcher = Watcher(self.engine)
+        watcher.poll()
+
+        with patch.object(self.engine, "_map_scripts") as map_mock:
+            self.assertFalse(watcher.poll())
+
+            map_mock.assert_not_called()
+
+    def test_poll_empty_folder(self):
+        """
+        Description: test if the report of an empty folder is only written by the first poll.
+        """
+
+        empty_folder = os.path.join(os.path.dirname(self.samples_folder), "empty")
+        os.makedirs(empty_folder)
+
+        watcher = Watcher(Engine(empty_folder, "detailed", output_path=self.output_path, jobs=1))
+
+        self.assertTrue(watcher.poll())
+        self.assertEqual(read_json(self.output_path), {})
+        self.assertFalse(watcher.poll())
+
+    def test_poll_prunes_cache(self):
+        """
+        Description: test if the results cache is pruned along with the polls that wrote into it, once the
+        prune interval has elapsed.
+        """
+
+        cache_dir = os.path.join(os.path.dirname(self.samples_folder), "cache")
+        engine = Engine(
+            self.samples_folder, "detailed", output_path=self.output_path, jobs=1, cache_dir=cache_dir
+        )
+        watcher = Watcher(engine)
+
+        with patch.object(engine.cache, "prune") as prune_mock:
+            watcher.poll()
+            prune_mock.assert_not_called()
+
+            with patch("spanalyzer.watch.PRUNE_INTERVAL", 0.0):
+                with open(os.path.join(self.samples_folder, "script_1.py"), "a") as file:
+                    file.write("\n# edited\n")
+
+                watcher.poll()
+                prune_mock.assert_called_once()
+
+                # the script is analyzed again, but its results are found in the cache
+                os.utime(os.path.join(self.samples_folder, "script_1.py"), ns=(0, 0))
+
+                self.assertTrue(watcher.poll())
+                prune_mock.assert_called_once()
+
+    def test_poll_changes(self):
+        """
+        Description: test if only the modified scripts are analyzed again, and if the report follows the
+        modifications and deletions of the scripts.
+        """
+
+        watcher = Watcher(self.engine)
+        watcher.poll()
+
+        modified_script = os.path.join(self.samples_folder, "script_1.py")
+        deleted_script = os.path.join(self.samples_folder, "script_4.py")
+
+        with open(modified_script, "a") as file:
+            file.write("\n\ndef new_function():\n    tracer.start_span('new_span')\n")
+
+        os.remove(deleted_script)
+
+        with patch.object(
+            self.engine, "_map_scripts", wraps=self.engine._map_scripts
+        ) as map_mock:
+            self.assertTrue(watcher.poll())
+
+            map_mock.assert_called_once_with([modified_script])
+
+        actual = read_json(self.output_path)
+        expected = self.full_report()
+
+        self.assertEqual(actual, expected)
+        self.assertNotIn(deleted_script, actual)
+        self.assertIn("new_function", actual[modified_script]["functions"])
+
+    def test_summary(self):
+        """
+        Description: test if the terminal summary matches the basic report of the folder.
+        """
+
+        watcher = Watcher(self.engine)
+        watcher.poll()
+
+        actual = watcher.summary()
+
+        with patch("builtins.print") as print_mock:
+            Engine(self.samples_folder, "basic", jobs=1).run()
+
+        expected = print_mock.call_args_list[0].args[0]
+
+        self.assertEqual(actual, expected)
+
+    def test_invalid_report_type(self):
+        """
+        Description: test if the watcher refuses an engine that doesn't build the detailed report.
+        """
+
+        with self.assertRaises(ValueError):
+            Watcher(Engine(self.samples_folder, "basic"))
@@ -0,0 +1,110 @@
+# Unitary tests to the git operations
+
+import os
+import shutil
+import tempfile
+import subprocess
+
+from unittest import TestCase
+
+from spanalyzer.utils.git import changed_files
+
+
+def git(repo_path: str, *args: str):
+    """
+    Run a git command on the repository provided.
+
+    Args:
+        repo_path [str]: the path to the repository
+        args [str]: arguments of the git command
+    """
+
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@test", "-C", repo_path, *args],
+        check=True,
+        capture_output=True,
+    )
+
+
+def write_file(path: str, content: str):
+    """
+    Write the content provided into the file.
+
+    Args:
+        path [str]: the path to the file
+        content [str]: the content of the file
+    """
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "w") as f:
+        f.write(content)
+
+
+class TestGit(TestCase):
+    def setUp(self):
+        """
+        Description: set up a git repository with a single commit.
+        """
+
+        self.repo_path = os.path.realpath(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.repo_path)
+
+        git(self.repo_path, "init", "-q")
+
+        write_file(os.path.join(self.repo_path, "modified.py"), "a = 1\n")
+        write_file(os.path.join(self.repo_path, "deleted.py"), "b = 2\n")
+        write_file(os.path.join(self.repo_path, "unchanged.py"), "c = 3\n")
+        write_file(
+            os.path.join(self.repo_path, "src", "renamed.py"),
+            "def function():\n    return 'long enough to be detected as a rename'\n",
+        )
+
+        git(self.repo_path, "add", "-A")
+        git(self.repo_path, "commit", "-q", "-m", "initial")
+        git(self.repo_path, "tag", "initial")
+
+    def test_changed_files(self):
+        """
+        Description: test if the added, modified, renamed and deleted files are duly captured.
+        """
+
+        write_file(os.path.join(self.repo_path, "modified.py"), "a = 10\n")
+        write_file(os.path.join(self.repo_path, "added.py"), "d = 4\n")
+        os.remove(os.path.join(self.repo_path, "deleted.py"))
+        git(self.repo_path, "mv", "src/renamed.py", "src/moved.py")
+
+        changed, deleted = changed_files(os.path.join(self.repo_path, "src"), "initial")
+
+        actual = (sorted(changed), sorted(deleted))
+        expected = (
+            [
+                os.path.join(self.repo_path, "added.py"),
+                os.path.join(self.repo_path, "modified.py"),
+                os.path.join(self.repo_path, "src", "moved.py"),
+            ],
+            [
+                os.path.join(self.repo_path, "deleted.py"),
+                os.path.join(self.repo_path, "src", "renamed.py"),
+            ],
+        )
+
+        self.assertEqual(actual, expected)
+
+    def test_changed_files_no_changes(self):
+        """
+        Description: test if nothing is reported when the working tree matches the reference.
+        """
+
+        actual = changed_files(self.repo_path, "initial")
+        expected = ([], [])
+
+        self.assertEqual(actual, expected)
+
+    def test_changed_files_exception(self):
+        """
+        Description: test if an invalid reference is reported as a ValueError.
+        """
+
+        with self.assertRaises(ValueError):
+            changed_files(self.repo_path, "not-a-reference")
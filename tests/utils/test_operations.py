@@ -1,12 +1,23 @@
 # Unitary tests to the operations functions
 
+import os
+import random
+import shutil
+import tempfile
 import unittest
 
+from unittest.mock import patch
+
 from spanalyzer.python.script import FunctionSpecs
 
 from spanalyzer.constants.telemetry import TelemetryCall
 
 from spanalyzer.utils.operations import folder_trim
+from spanalyzer.utils.operations import is_excluded
+from spanalyzer.utils.operations import shard_index
+from spanalyzer.utils.operations import walk_scripts
+from spanalyzer.utils.operations import script_sort_key
+from spanalyzer.utils.operations import contains_keywords
 from spanalyzer.utils.operations import conciliation
 from spanalyzer.utils.operations import filter_empty_dict
 from spanalyzer.utils.operations import remove_call_duplicates
@@ -187,6 +198,110 @@ class TestOperations(unittest.TestCase):
 
         self.assertEqual(actual, expected)
 
+    def test_conciliation_nested(self):
+        """
+        Description: test if the telemetry items of nested functions are assigned to the innermost function.
+        """
+
+        test_functions = [
+            FunctionSpecs(name="outer", start_lineno=1, end_lineno=20, docstring=None),
+            FunctionSpecs(name="inner", start_lineno=5, end_lineno=10, docstring=None),
+            FunctionSpecs(name="innermost", start_lineno=6, end_lineno=8, docstring=None),
+        ]
+
+        test_telemetry = {
+            "spans": [
+                {"func": "outer_span", "line_number": 2, "args": None},
+                {"func": "inner_span", "line_number": 5, "args": None},
+                {"func": "innermost_span", "line_number": 7, "args": None},
+                {"func": "inner_span_after", "line_number": 9, "args": None},
+                {"func": "outer_span_after", "line_number": 15, "args": None},
+                {"func": "script_span", "line_number": 21, "args": None},
+            ],
+        }
+
+        actual = conciliation(test_functions, test_telemetry)
+        expected = {
+            "spans": [{"func": "script_span", "line_number": 21, "args": None}],
+            "functions": {
+                "outer": {
+                    "spans": [
+                        {"func": "outer_span", "line_number": 2, "args": None},
+                        {"func": "outer_span_after", "line_number": 15, "args": None},
+                    ],
+                },
+                "inner": {
+                    "spans": [
+                        {"func": "inner_span", "line_number": 5, "args": None},
+                        {"func": "inner_span_after", "line_number": 9, "args": None},
+                    ],
+                },
+                "innermost": {
+                    "spans": [
+                        {"func": "innermost_span", "line_number": 7, "args": None},
+                    ],
+                },
+            },
+        }
+
+        self.assertEqual(actual, expected)
+
+    def test_conciliation_generated(self):
+        """
+        Description: test the conciliation over a generated script with thousands of (nested) functions,
+        against a brute force assignment of each item to its innermost enclosing function.
+        """
+
+        generator = random.Random(42)
+
+        def generate_functions(start: int, end: int, depth: int, prefix: str):
+            functions, line = [], start
+
+            while line < end - 2:
+                length = generator.randint(2, min(40, end - line))
+                name = f"{prefix}_{line}"
+                functions.append(
+                    FunctionSpecs(name=name, docstring=None, start_lineno=line, end_lineno=line + length)
+                )
+
+                if depth > 0 and length > 6:
+                    functions.extend(generate_functions(line + 1, line + length, depth - 1, name))
+
+                line += length + generator.randint(0, 3)
+
+            return functions
+
+        test_functions = generate_functions(1, 60000, 3, "function")
+        test_telemetry = {
+            "spans": [
+                {"func": f"span_{idx}", "line_number": generator.randint(1, 60010), "args": None}
+                for idx in range(5000)
+            ],
+        }
+
+        def brute_force_innermost(line_number: int):
+            containing = [
+                func
+                for func in test_functions
+                if func.start_lineno <= line_number < func.end_lineno
+            ]
+
+            return max(containing, key=lambda func: func.start_lineno, default=None)
+
+        self.assertGreater(len(test_functions), 3000)
+
+        actual = conciliation(test_functions, test_telemetry)
+
+        for item in test_telemetry["spans"]:
+            func = brute_force_innermost(item["line_number"])
+            items = (
+                actual["functions"][func.name]["spans"]
+                if func is not None
+                else actual["spans"]
+            )
+
+            self.assertIn(item, items)
+
     def test_filter_empty_dict(self):
         """
         Description: test the filtering process with a basic dictionary to filter.
@@ -276,3 +391,154 @@ class TestOperations(unittest.TestCase):
         ]
 
         self.assertEqual(actual, expected)
+
+    def test_is_excluded(self):
+        """
+        Description: test if the excluded paths are matched against whole path components.
+        """
+
+        excluded_paths = {"tests", "venv", "__init__.py"}
+
+        self.assertTrue(is_excluded(os.path.join("tests", "test_engine.py"), excluded_paths))
+        self.assertTrue(is_excluded(os.path.join("src", "venv", "lib.py"), excluded_paths))
+        self.assertTrue(is_excluded(os.path.join("src", "__init__.py"), excluded_paths))
+        self.assertFalse(is_excluded(os.path.join("src", "latests.py"), excluded_paths))
+        self.assertFalse(is_excluded(os.path.join("venvs", "lib.py"), excluded_paths))
+
+    def test_is_excluded_virtual_environments(self):
+        """
+        Description: test if the virtual environments are excluded by default, whether named as usual or
+        not (through their site-packages folder).
+        """
+
+        for relative_path in [
+            os.path.join("venv", "lib", "python3.11", "site-packages", "package", "module.py"),
+            os.path.join(".venv", "bin", "activate_this.py"),
+            os.path.join("virtualenv", "bin", "activate_this.py"),
+            os.path.join(".virtualenv", "bin", "activate_this.py"),
+            os.path.join("py311", "lib", "python3.11", "site-packages", "package", "module.py"),
+        ]:
+            with self.subTest(relative_path=relative_path):
+                self.assertTrue(is_excluded(relative_path))
+
+        self.assertFalse(is_excluded(os.path.join("src", "environment.py")))
+
+    def test_shard_index(self):
+        """
+        Description: test if the scripts are spread across all the shards, each one of them being always
+        assigned to the same shard.
+        """
+
+        paths = [os.path.join("src", f"module_{idx}", f"script_{idx}.py") for idx in range(200)]
+
+        actual = [shard_index(path, 4) for path in paths]
+
+        self.assertEqual(actual, [shard_index(path, 4) for path in paths])
+        self.assertEqual(set(actual), {1, 2, 3, 4})
+        self.assertEqual(shard_index("subfolder/script.py", 4), 2)
+        self.assertEqual({shard_index(path, 1) for path in paths}, {1})
+
+    def test_walk_scripts(self):
+        """
+        Description: test if the scripts are yielded in a deterministic order, skipping the excluded
+        files and without descending into the excluded folders.
+        """
+
+        folder_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder_path)
+
+        for relative_path in [
+            "b.py",
+            "a.py",
+            "latests.py",
+            "__init__.py",
+            "notes.txt",
+            os.path.join("sub", "c.py"),
+            os.path.join("sub", "deeper", "d.py"),
+            os.path.join("another", "e.py"),
+            os.path.join("tests", "test_a.py"),
+            os.path.join("node_modules", "package", "f.py"),
+        ]:
+            path = os.path.join(folder_path, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+
+        with patch("os.scandir", wraps=os.scandir) as scandir_mock:
+            actual = list(walk_scripts(folder_path, ".py"))
+
+        expected = [
+            os.path.join(folder_path, "a.py"),
+            os.path.join(folder_path, "b.py"),
+            os.path.join(folder_path, "latests.py"),
+            os.path.join(folder_path, "another", "e.py"),
+            os.path.join(folder_path, "sub", "c.py"),
+            os.path.join(folder_path, "sub", "deeper", "d.py"),
+        ]
+
+        self.assertEqual(actual, expected)
+        self.assertEqual(sorted(actual, key=script_sort_key), expected)
+
+        scanned_folders = [call.args[0] for call in scandir_mock.call_args_list]
+        self.assertNotIn(os.path.join(folder_path, "node_modules"), scanned_folders)
+        self.assertNotIn(os.path.join(folder_path, "tests"), scanned_folders)
+
+    def test_walk_scripts_exception(self):
+        """
+        Description: test if a folder that doesn't exist yields no scripts.
+        """
+
+        actual = list(walk_scripts(os.path.join("path", "that", "does", "not", "exist"), ".py"))
+        expected = []
+
+        self.assertEqual(actual, expected)
+
+    def test_contains_keywords(self):
+        """
+        Description: test if the keywords are only matched as whole words, and if the scripts that could
+        hide a keyword (non-ascii characters, unicode escapes) are always reported as possible matches.
+        """
+
+        folder_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, folder_path)
+
+        keywords = frozenset({"add", "start_span"})
+        test_scripts = {
+            "with_keyword.py": b"span = tracer.start_span('test')\n",
+            "with_counter.py": b"counter.add(1)\n",
+            "without_keyword.py": b"address = padding + start_spans\n",
+            "with_non_ascii.py": "nome = 'jo\u00e3o'\n".encode("utf-8"),
+            "with_unicode_escape.java": b"counter.\\u0061dd(1);\n",
+            "empty.py": b"",
+        }
+
+        actual = {}
+
+        for name, content in test_scripts.items():
+            path = os.path.join(folder_path, name)
+
+            with open(path, "wb") as f:
+                f.write(content)
+
+            actual[name] = contains_keywords(path, keywords)
+
+        expected = {
+            "with_keyword.py": True,
+            "with_counter.py": True,
+            "without_keyword.py": False,
+            "with_non_ascii.py": True,
+            "with_unicode_escape.java": True,
+            "empty.py": False,
+        }
+
+        self.assertEqual(actual, expected)
+
+    def test_contains_keywords_exception(self):
+        """
+        Description: test if a script that can't be read is reported as a possible match (to be handled
+        by the full parse).
+        """
+
+        actual = contains_keywords(os.path.join("path", "that", "does", "not", "exist.py"), frozenset({"add"}))
+        expected = True
+
+        self.assertEqual(actual, expected)
@@ -0,0 +1,192 @@
+# Unitary tests to the streaming readers and writers
+
+import os
+import shutil
+import tempfile
+
+from unittest import TestCase
+
+from spanalyzer.utils.streams import JsonWriter
+from spanalyzer.utils.streams import JsonlWriter
+from spanalyzer.utils.streams import iter_jsonl
+from spanalyzer.utils.streams import jsonl_to_report
+from spanalyzer.utils.streams import is_jsonl
+from spanalyzer.utils.streams import is_basic_report
+from spanalyzer.utils.streams import iter_json_records
+from spanalyzer.utils.streams import iter_report_records
+
+from spanalyzer.utils.operations import write_json
+
+
+class TestStreams(TestCase):
+    def setUp(self):
+        """
+        Description: set up the test environment.
+        """
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+
+        self.path = os.path.join(temp_dir, "report.jsonl")
+        self.records = [
+            {
+                "script": "path/to/script_1.py",
+                "tracers": [{"func": "tracer", "line_number": 1, "args": None}],
+            },
+            {
+                "script": "path/to/script_2.py",
+                "functions": {"function_1": {"docstring": "This is a test function"}},
+            },
+        ]
+
+    def test_jsonl_writer(self):
+        """
+        Description: test if each record is written into its own line, and is available right away.
+        """
+
+        with JsonlWriter(self.path) as writer:
+            writer.write(self.records[0])
+
+            with open(self.path, "r") as f:
+                self.assertEqual(len(f.readlines()), 1)
+
+            writer.write(self.records[1])
+
+        actual = list(iter_jsonl(self.path))
+        expected = self.records
+
+        self.assertEqual(actual, expected)
+
+    def test_jsonl_to_report(self):
+        """
+        Description: test if the classic layout of the detailed report is rebuilt from the records.
+        """
+
+        with JsonlWriter(self.path) as writer:
+            for record in self.records:
+                writer.write(record)
+
+        actual = jsonl_to_report(self.path)
+        expected = {
+            "path/to/script_1.py": {
+                "tracers": [{"func": "tracer", "line_number": 1, "args": None}],
+            },
+            "path/to/script_2.py": {
+                "functions": {"function_1": {"docstring": "This is a test function"}},
+            },
+        }
+
+        self.assertEqual(actual, expected)
+
+    def test_jsonl_to_report_exception(self):
+        """
+        Description: test if an empty file is rebuilt into an empty report.
+        """
+
+        with JsonlWriter(self.path):
+            pass
+
+        actual = jsonl_to_report(self.path)
+        expected = {}
+
+        self.assertEqual(actual, expected)
+
+    def test_json_writer(self):
+        """
+        Description: test if the json document streamed is the same as the one written at once, for both
+        the report keyed by script and the array of records (including the empty ones).
+        """
+
+        expected_path = os.path.join(os.path.dirname(self.path), "expected.json")
+        report_by_script = {
+            record["script"]: {k: v for k, v in record.items() if k != "script"}
+            for record in self.records
+        }
+
+        for script_key, report in (
+            ("script", report_by_script),
+            (None, self.records),
+            ("script", {}),
+            (None, []),
+        ):
+            with self.subTest(script_key=script_key, report=report):
+                with JsonWriter(self.path, script_key=script_key) as writer:
+                    for record in self.records if report else []:
+                        writer.write(record)
+
+                write_json(report, expected_path)
+
+                with open(self.path, "r") as actual, open(expected_path, "r") as expected:
+                    self.assertEqual(actual.read(), expected.read())
+
+    def test_iter_json_records(self):
+        """
+        Description: test if the records of a json report are read one at a time, regardless of where the
+        chunks read end, for both the report keyed by script and the array of records.
+        """
+
+        report = {
+            record["script"]: {k: v for k, v in record.items() if k != "script"}
+            for record in self.records
+        }
+        report["path/to/script_3.py"] = {"counter": [{"func": "add", "line_number": 12345}]}
+
+        expected = [{"script": script, **entry} for script, entry in report.items()]
+
+        for data in (report, expected):
+            write_json(data, self.path)
+
+            for chunk_size in (1, 7, 64 * 1024):
+                with self.subTest(keyed=isinstance(data, dict), chunk_size=chunk_size):
+                    actual = list(iter_json_records(self.path, chunk_size=chunk_size))
+
+                    self.assertEqual(actual, expected)
+
+    def test_iter_json_records_exception(self):
+        """
+        Description: test if an empty report yields no records, and a truncated one is rejected.
+        """
+
+        write_json({}, self.path)
+
+        self.assertEqual(list(iter_json_records(self.path)), [])
+
+        with open(self.path, "w") as f:
+            f.write('{"path/to/script_1.py": {"tracers": []}, "path/to/')
+
+        with self.assertRaises(ValueError):
+            list(iter_json_records(self.path, chunk_size=8))
+
+    def test_iter_report_records(self):
+        """
+        Description: test if the records of a report are read in the same way whether it's a json or a
+        jsonl file, and if the basic rows are told apart from the detailed report.
+        """
+
+        json_path = os.path.join(os.path.dirname(self.path), "report.json")
+        rows_path = os.path.join(os.path.dirname(self.path), "rows.json")
+
+        with JsonWriter(json_path) as writer, JsonlWriter(self.path) as jsonl_writer:
+            for record in self.records:
+                writer.write(record)
+                jsonl_writer.write(record)
+
+        write_json([{"script": "path/to/script_1.py", "tracers": True}], rows_path)
+
+        self.assertEqual(list(iter_report_records(json_path)), self.records)
+        self.assertEqual(list(iter_report_records(self.path)), self.records)
+        self.assertFalse(is_basic_report(json_path))
+        self.assertFalse(is_basic_report(self.path))
+        self.assertTrue(is_basic_report(rows_path))
+
+    def test_iter_report_records_empty(self):
+        """
+        Description: test if an empty report is read as an empty jsonl file, rather than as a truncated json
+        document.
+        """
+
+        open(self.path, "w").close()
+
+        self.assertTrue(is_jsonl(self.path))
+        self.assertFalse(is_basic_report(self.path))
+        self.assertEqual(list(iter_report_records(self.path)), [])